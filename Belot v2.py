@@ -165,4 +165,5 @@ def play_game():
 
 
 # Run the game
-play_game()
+if __name__ == "__main__":
+    play_game()
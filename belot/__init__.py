@@ -0,0 +1,6 @@
+"""
+Importable Belot engine and tooling.
+
+The `Belot vN.py` scripts remain the human-readable entry points; the modules
+in this package hold the fast, side-effect-free implementations they build on.
+"""
@@ -0,0 +1,27 @@
+"""
+Command line entry point: `python -m belot <command> ...`.
+"""
+
+import argparse
+import sys
+
+from belot import arena, bench, bidtable, records, scoring, server, simulate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="belot")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    simulate.add_parser(subparsers)
+    records.add_parser(subparsers)
+    bench.add_parser(subparsers)
+    bidtable.add_parser(subparsers)
+    arena.add_parser(subparsers)
+    server.add_parser(subparsers)
+    scoring.add_parser(subparsers)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
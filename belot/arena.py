@@ -0,0 +1,294 @@
+"""
+Duplicate-deal arena for comparing two agents.
+
+Every deal is played twice from the same shuffled deck and the same bid:
+once with agent A in seats 0 and 2, once with A in seats 1 and 3. Both
+agents hold the same cards in turn, so card luck cancels out of the
+per-pair score
+
+    diff = (A's points over both games - 152)
+
+which is A's average point margin per game. Its variance is typically
+several times smaller than that of independent deals, and the summary
+reports that factor as `variance_reduction`.
+
+Pairs are played in chunks over a process pool, each chunk with its own
+seeds spawned from one root seed. Chunks are consumed in order, so results
+do not depend on the number of workers. After each chunk, once `min_pairs`
+are played, the arena runs a group-sequential test: the error rate
+`1 - confidence` is spent over the looks along an O'Brien-Fleming-type
+(Lan-DeMets) spending function of the fraction of `max_pairs` played, and
+the match stops as significant when the mean difference clears that look's
+boundary. The boundaries are computed jointly over the looks, so the chance
+of a false "significant" over the whole match is `1 - confidence`. Early
+looks spend almost nothing; most of it is left for the end. The match also
+stops once the confidence interval is narrower than `margin`.
+
+Agents are given as specs: `random`, `greedy` (richest legal card),
+`mlp:PATH[:TEMPERATURE]` for a `belot.mlp` weights file, or
+`pimc[:BUDGET_MS]` for the `belot.pimc` search agent.
+
+    python -m belot arena mlp:policy.bin random --max-pairs 20000 --workers 8 --seed 1
+"""
+
+import json
+import math
+import multiprocessing
+import os
+import statistics
+
+import numpy as np
+
+from belot import engine, inference, mlp, parallel, pimc
+
+
+CHUNK_SIZE = 100
+
+# Columns of the per-pair result arrays: A's points in each of the two games
+TRUMP, BIDDER, A_POINTS_1, A_POINTS_2 = range(4)
+
+
+def random_agent(argument, rng, info):
+    return lambda valid_mask, *_: engine.random_card(valid_mask, rng)
+
+
+def greedy_agent(argument, rng, info):
+    def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+        return max(engine.mask_to_cards(valid_mask), key=engine.CARD_POINTS[trump_suit].__getitem__)
+    return select
+
+
+def mlp_agent(argument, rng, info):
+    path, _, temperature = argument.partition(":")
+    policy = mlp.MLPPolicy(path, float(temperature or 0), seed=rng.getrandbits(32))
+    return inference.policy_select(policy, info)
+
+
+# Time-budgeted search; without a fixed budget the moves depend on timing, so results are not reproducible
+def pimc_agent(argument, rng, info):
+    return pimc.PIMCAgent(budget=float(argument or pimc.BUDGET * 1000) / 1000, seed=rng.getrandbits(64))
+
+
+# Agent factories by spec name: factory(argument, rng, info) returns a `play_trick` select callback.
+# `info` is the `engine.DealInfo` the games will be played with, for agents that read the bidder or scores.
+AGENTS = {
+    "random": random_agent,
+    "greedy": greedy_agent,
+    "mlp": mlp_agent,
+    "pimc": pimc_agent,
+}
+
+
+def make_agent(spec, rng, info=None):
+    name, _, argument = spec.partition(":")
+    if name not in AGENTS:
+        raise ValueError(f"unknown agent {name!r}; expected one of {', '.join(AGENTS)}")
+    return AGENTS[name](argument, rng, engine.DealInfo() if info is None else info)
+
+
+# Select callback that lets `even` play seats 0 and 2 and `odd` seats 1 and 3.
+def seat_select(even, odd):
+    def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+        return (odd if seat & 1 else even)(valid_mask, seat, players_hands, trick, trump_suit, lead_suit)
+    return select
+
+
+# A's points in the two games of one duplicate pair.
+def play_pair(deck, bidder, trump_suit, agent_a, agent_b, rng, info=None):
+    first = engine.play_deal(deck, bidder, trump_suit, rng, seat_select(agent_a, agent_b), info)
+    second = engine.play_deal(deck, bidder, trump_suit, rng, seat_select(agent_b, agent_a), info)
+    return first.scores[0], second.scores[1]
+
+
+# Plays one chunk of duplicate pairs and returns an (n, 4) array of trump, bidder and A's points.
+def play_chunk(task):
+    seed_seq, pairs, spec_a, spec_b = task
+    deal_seed, play_seed = seed_seq.spawn(2)
+    deal_rng, rng = parallel.chunk_rng(deal_seed), parallel.chunk_rng(play_seed)
+    info = engine.DealInfo()
+    agent_a, agent_b = make_agent(spec_a, rng, info), make_agent(spec_b, rng, info)
+
+    results = np.empty((pairs, 4), dtype=np.int16)
+    for i in range(pairs):
+        bidder = None
+        while bidder is None:
+            deck = engine.generate_deck()
+            deal_rng.shuffle(deck)
+            bidder, trump_suit = engine.bidding_phase(deal_rng)
+        results[i] = (trump_suit, bidder, *play_pair(deck, bidder, trump_suit, agent_a, agent_b, rng, info))
+    return results
+
+
+def _interval(values, z):
+    n = len(values)
+    mean = float(values.mean()) if n else 0.0
+    std = float(values.std(ddof=1)) if n > 1 else 0.0
+    half = z * std / np.sqrt(n) if n else float("inf")
+    return {"pairs": n, "mean": mean, "std": std, "ci": [mean - half, mean + half]}
+
+
+# Mean per-game point margin of A with its confidence interval, overall and by trump suit.
+def summarize(results, confidence=0.95):
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    a_points = results[:, [A_POINTS_1, A_POINTS_2]].astype(np.float64)
+    diff = a_points.sum(axis=1) - engine.DEAL_POINTS
+
+    summary = _interval(diff, z)
+    summary["confidence"] = confidence
+    summary["a_pair_win_rate"] = float((diff > 0).mean()) if len(diff) else 0.0
+    summary["a_points_per_game"] = float(a_points.mean()) if len(diff) else 0.0
+    # Variance of a two-game average of independent deals over that of a duplicate pair
+    single = 2 * a_points[:, 0] - engine.DEAL_POINTS
+    if len(diff) > 1 and diff.var() > 0:
+        summary["variance_reduction"] = float(single.var(ddof=1) / 2 / diff.var(ddof=1))
+    summary["by_trump"] = {name: _interval(diff[results[:, TRUMP] == suit], z)
+                           for suit, name in enumerate(engine.SUITS)}
+    return summary
+
+
+# O'Brien-Fleming-type spending function: the two-sided error rate that may be spent by information fraction `t`.
+def obf_spent(alpha, t):
+    if t <= 0:
+        return 0.0
+    normal = statistics.NormalDist()
+    return 2 - 2 * normal.cdf(-normal.inv_cdf(alpha / 2) / math.sqrt(min(t, 1.0)))
+
+
+class SequentialTest:
+    """
+    Lan-DeMets group-sequential test spending `alpha` along `obf_spent`.
+    `look(t)` gives the two-sided z boundary of a look at information
+    fraction `t` (looks come in increasing `t`). It is chosen so that, with no
+    real difference, the chance of having crossed any boundary so far is
+    `obf_spent(alpha, t)`. The distribution of the running sum among matches
+    still going is tracked on a grid (in units of its final standard
+    deviation) and diffused from look to look.
+    """
+
+    GRID_STEP = 0.01
+    GRID_LIMIT = 8.0
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.spent = 0.0
+        self.t = 0.0
+        self.grid = np.arange(-self.GRID_LIMIT, self.GRID_LIMIT + self.GRID_STEP / 2, self.GRID_STEP)
+        self.weights = np.zeros(len(self.grid))
+        self.weights[len(self.grid) // 2] = 1.0
+
+    # Adds a normal increment of `variance` to the running sum (mass carried off the grid is negligible).
+    def _diffuse(self, variance):
+        if variance <= 0:
+            return
+        half = min(int(6 * math.sqrt(variance) / self.GRID_STEP) + 1, len(self.grid) // 2)
+        offsets = np.arange(-half, half + 1) * self.GRID_STEP
+        kernel = np.exp(-offsets ** 2 / (2 * variance))
+        self.weights = np.convolve(self.weights, kernel / kernel.sum(), mode="same")
+
+    def look(self, t):
+        t = min(t, 1.0)
+        self._diffuse(t - self.t)
+        self.t = t
+        target = obf_spent(self.alpha, t) - self.spent
+        if target <= 0:
+            return float("inf")
+
+        # Smallest |w| boundary whose outer mass is the error this look may spend
+        order = np.argsort(-np.abs(self.grid), kind="stable")
+        outer = np.cumsum(self.weights[order])
+        k = int(np.searchsorted(outer, target))
+        if k >= len(order):
+            boundary = 0.0
+        else:
+            boundary = float(abs(self.grid[order[k]]))
+        crossed = np.abs(self.grid) >= boundary
+        self.spent += float(self.weights[crossed].sum())
+        self.weights[crossed] = 0
+        return boundary / math.sqrt(t)
+
+
+def _decided(summary, min_pairs, margin, z):
+    if summary["pairs"] < min_pairs:
+        return None
+    mean, std = summary["mean"], summary["std"]
+    if std > 0 and abs(mean) * math.sqrt(summary["pairs"]) / std >= z:
+        return "significant"
+    low, high = summary["ci"]
+    if margin is not None and (high - low) / 2 <= margin:
+        return "margin"
+    return None
+
+
+# Plays duplicate pairs of `spec_a` against `spec_b` until the result is decided or `max_pairs` are played.
+def run_match(spec_a, spec_b, max_pairs=10000, min_pairs=200, workers=1, seed=None, confidence=0.95,
+              margin=None, chunk_size=CHUNK_SIZE, progress=None):
+    root = np.random.SeedSequence(seed)
+    sizes = [min(chunk_size, max_pairs - start) for start in range(0, max_pairs, chunk_size)]
+    tasks = [(seed_seq, size, spec_a, spec_b) for seed_seq, size in zip(root.spawn(len(sizes)), sizes)]
+
+    chunks = []
+    stopped = "max_pairs"
+    test = SequentialTest(1 - confidence)
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    try:
+        for results in (pool.imap(play_chunk, tasks) if pool else map(play_chunk, tasks)):
+            chunks.append(results)
+            summary = summarize(np.concatenate(chunks), confidence)
+            if progress:
+                progress(summary)
+            if summary["pairs"] < min_pairs:
+                continue
+            reason = _decided(summary, min_pairs, margin, test.look(summary["pairs"] / max_pairs))
+            if reason:
+                stopped = reason
+                break
+    finally:
+        if pool:
+            pool.terminate()
+
+    results = np.concatenate(chunks) if chunks else np.empty((0, 4), dtype=np.int16)
+    summary = summarize(results, confidence)
+    summary.update({"agent_a": spec_a, "agent_b": spec_b, "stopped": stopped, "alpha_spent": test.spent,
+                    "seed": root.entropy})
+    return summary, results
+
+
+def format_summary(summary):
+    low, high = summary["ci"]
+    lines = [
+        f"{summary['agent_a']} vs {summary['agent_b']}: {summary['pairs']} duplicate pairs "
+        f"(stopped: {summary['stopped']}, seed {summary['seed']})",
+        f"Point margin per game for A: {summary['mean']:+.2f} "
+        f"({summary['confidence']:.0%} CI {low:+.2f} .. {high:+.2f})",
+        f"A wins {summary['a_pair_win_rate']:.1%} of pairs, {summary['a_points_per_game']:.1f} points per game",
+    ]
+    if "variance_reduction" in summary:
+        lines.append(f"Variance reduction over independent deals: {summary['variance_reduction']:.1f}x")
+    for name, part in summary["by_trump"].items():
+        if part["pairs"]:
+            lines.append(f"  {name}: {part['mean']:+.2f} ({part['ci'][0]:+.2f} .. {part['ci'][1]:+.2f}), "
+                         f"{part['pairs']} pairs")
+    return "\n".join(lines)
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("arena", help="compare two agents on duplicate deals")
+    parser.add_argument("agent_a", help="agent spec: random, greedy, mlp:PATH[:TEMPERATURE] or pimc[:BUDGET_MS]")
+    parser.add_argument("agent_b", help="agent spec for the opponents")
+    parser.add_argument("--max-pairs", type=int, default=10000, help="stop after this many duplicate pairs")
+    parser.add_argument("--min-pairs", type=int, default=200, help="never stop before this many pairs")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence level of the interval")
+    parser.add_argument("--margin", type=float, default=None, help="also stop once the CI half-width is this small")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--seed", type=int, default=None, help="root seed (random if omitted)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="pairs per task")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.set_defaults(func=run_cli)
+    return parser
+
+
+def run_cli(args):
+    summary, _ = run_match(args.agent_a, args.agent_b, args.max_pairs, args.min_pairs, args.workers, args.seed,
+                           args.confidence, args.margin, args.chunk_size)
+    print(json.dumps(summary) if args.json else format_summary(summary))
+    return 0
@@ -0,0 +1,259 @@
+"""
+Belief tracking and consistent deal sampling for the hidden cards.
+
+A player sees its own hand and every card played. `BeliefTracker` follows
+the play from one seat's point of view and keeps, per seat, a mask of the
+cards that seat can no longer hold:
+
+- a player who does not follow the lead suit is void in it;
+- a player who cannot follow while the opponents win the trick must trump
+  (`engine.legal_mask`), so discarding a non-trump means no trumps are left,
+  and playing a trump below the one winning the trick means no higher trump
+  (the `TSAKANE_MASK` cards) is left.
+
+Each update is a few mask operations per card.
+
+`WorldSampler` draws full assignments of the unseen cards to the other three
+seats that respect these masks and each seat's card count, uniformly over
+all consistent assignments. Cards are grouped by the set of seats that may
+hold them. The sampler counts the assignments for every way of splitting
+each group's size among its seats (there are at most a few thousand splits),
+picks a split in proportion to its count, and then shuffles the cards
+within each group. No draw is ever rejected, so sampling costs the same late
+in the hand as early. `sample_batch` draws thousands of worlds at once with
+NumPy, and `marginals` gives the exact probability of every card being in
+every hand.
+
+    tracker = BeliefTracker(viewer=1, hand=players_hands[1], trump_suit=trump)
+    tracker.observe(seat, card)            # every card played, in order
+    sampler = tracker.sampler()
+    worlds = sampler.sample_batch(5000, rng)   # (5000, 4) hand masks
+"""
+
+import random
+from collections import namedtuple
+from math import comb, factorial
+
+import numpy as np
+
+from belot import engine
+from belot.engine import CARD_BIT, CARD_SUIT, FULL_DECK, NO_SUIT, SUIT_MASKS, TSAKANE_MASK, WIN_KEY
+
+
+# Hidden-card constraints from one seat's view: the viewer's hand, the cards every seat may
+# still hold (the viewer's entry is its hand) and how many cards each seat still holds
+Constraints = namedtuple("Constraints", ["viewer", "hand", "possible", "counts"])
+
+
+class BeliefTracker:
+    """
+    What `viewer` knows about the other hands, updated one played card at a
+    time. `excluded[seat]` holds the cards `seat` is known not to have.
+    """
+
+    def __init__(self, viewer, hand, trump_suit, leader=0, cards_per_hand=engine.NUM_TRICKS):
+        self.viewer = viewer
+        self.hand = hand
+        self.trump_suit = trump_suit
+        self.leader = leader
+        self.trick = []
+        self.lead_suit = NO_SUIT
+        self.win_seat = None
+        self.win_card = None
+        self.played = 0
+        self.excluded = [0] * engine.NUM_PLAYERS
+        self.counts = [cards_per_hand] * engine.NUM_PLAYERS
+
+    def copy(self):
+        other = BeliefTracker.__new__(BeliefTracker)
+        other.__dict__.update(self.__dict__)
+        other.trick = list(self.trick)
+        other.excluded = list(self.excluded)
+        other.counts = list(self.counts)
+        return other
+
+    def to_play(self):
+        return (self.leader + len(self.trick)) & 3
+
+    # Cards not yet seen by the viewer: neither played nor in its hand.
+    def unseen(self):
+        return FULL_DECK & ~self.played & ~self.hand
+
+    def possible(self, seat):
+        if seat == self.viewer:
+            return self.hand
+        return self.unseen() & ~self.excluded[seat]
+
+    # Suits `seat` is known to be out of.
+    def void_suits(self, seat):
+        possible = self.possible(seat)
+        return [suit for suit in range(4) if not possible & SUIT_MASKS[suit]]
+
+    def observe(self, seat, card):
+        if seat != self.to_play():
+            raise ValueError(f"seat {seat} played out of turn, expected seat {self.to_play()}")
+        bit = CARD_BIT[card]
+        if not self.possible(seat) & bit:
+            raise ValueError(f"seat {seat} cannot hold {engine.card_name(card)}")
+
+        trump_suit = self.trump_suit
+        if not self.trick:
+            self.lead_suit = CARD_SUIT[card]
+            self.win_seat, self.win_card = seat, card
+        else:
+            if CARD_SUIT[card] != self.lead_suit:
+                self.excluded[seat] |= SUIT_MASKS[self.lead_suit]
+                # Opponents winning: the Tsakane rule forced a trump, over-trumping when possible
+                if (seat ^ self.win_seat) & 1:
+                    required = TSAKANE_MASK[trump_suit][self.win_card]
+                    if CARD_SUIT[card] != trump_suit:
+                        self.excluded[seat] |= SUIT_MASKS[trump_suit]
+                    elif not bit & required:
+                        self.excluded[seat] |= required
+            keys = WIN_KEY[trump_suit][self.lead_suit]
+            if keys[card] > keys[self.win_card]:
+                self.win_seat, self.win_card = seat, card
+
+        self.trick.append(card)
+        self.played |= bit
+        self.counts[seat] -= 1
+        if seat == self.viewer:
+            self.hand &= ~bit
+        if len(self.trick) == engine.NUM_PLAYERS:
+            self.leader = self.win_seat
+            self.trick = []
+            self.lead_suit = NO_SUIT
+
+    def constraints(self):
+        possible = tuple(self.possible(seat) for seat in range(engine.NUM_PLAYERS))
+        return Constraints(self.viewer, self.hand, possible, tuple(self.counts))
+
+    def sampler(self):
+        return WorldSampler(self.constraints())
+
+
+class WorldSampler:
+    """
+    Uniform sampler of the hidden hands allowed by `Constraints`. Raises
+    ValueError if no assignment satisfies them.
+    """
+
+    def __init__(self, constraints):
+        self.constraints = constraints
+        self.viewer = constraints.viewer
+        self.seats = [seat for seat in range(engine.NUM_PLAYERS) if seat != self.viewer]
+        possible = [constraints.possible[seat] for seat in self.seats]
+        need = [constraints.counts[seat] for seat in self.seats]
+
+        # Cards grouped by the set of hidden seats (bits 0..2) that may hold them
+        unseen = FULL_DECK & ~constraints.hand
+        unseen &= possible[0] | possible[1] | possible[2]
+        self.groups = [[] for _ in range(8)]
+        for card in engine.mask_to_cards(unseen):
+            bit = CARD_BIT[card]
+            self.groups[sum(1 << j for j in range(3) if possible[j] & bit)].append(card)
+
+        # Single-seat groups are forced
+        self.forced = [sum(CARD_BIT[card] for card in self.groups[1 << j]) for j in range(3)]
+        need = [need[j] - len(self.groups[1 << j]) for j in range(3)]
+        if sum(need) != len(self.groups[3]) + len(self.groups[5]) + len(self.groups[6]) + len(self.groups[7]):
+            raise ValueError("unseen cards do not match the hand sizes")
+
+        # Splits (x3, x5, x6, r0, r1, r2): x3 of the {0,1} cards go to seat 0, x5 of the {0,2} cards
+        # to seat 0, x6 of the {1,2} cards to seat 1, and the {0,1,2} cards are split r0 / r1 / r2
+        n3, n5, n6, n7 = (len(self.groups[t]) for t in (3, 5, 6, 7))
+        splits = []
+        weights = []
+        for x3 in range(n3 + 1):
+            for x5 in range(n5 + 1):
+                r0 = need[0] - x3 - x5
+                if r0 < 0:
+                    break
+                for x6 in range(n6 + 1):
+                    r1 = need[1] - (n3 - x3) - x6
+                    if r1 < 0:
+                        break
+                    r2 = n7 - r0 - r1
+                    if r0 > n7 or r2 < 0 or r2 != need[2] - (n5 - x5) - (n6 - x6):
+                        continue
+                    splits.append((x3, x5, x6, r0, r1, r2))
+                    weights.append(comb(n3, x3) * comb(n5, x5) * comb(n6, x6)
+                                   * factorial(n7) // (factorial(r0) * factorial(r1) * factorial(r2)))
+        if not splits:
+            raise ValueError("no deal is consistent with the constraints")
+
+        self.worlds = sum(weights)
+        self.splits = np.array(splits, dtype=np.int64)
+        self.probabilities = np.array([weight / self.worlds for weight in weights])
+        self._cumulative = np.cumsum(self.probabilities)
+
+    def _assemble(self, hidden):
+        players_hands = [0] * engine.NUM_PLAYERS
+        players_hands[self.viewer] = self.constraints.hand
+        for j, seat in enumerate(self.seats):
+            players_hands[seat] = hidden[j]
+        return players_hands
+
+    # One consistent deal as a list of four hand masks (the viewer's own hand included).
+    def sample(self, rng=random):
+        index = min(int(np.searchsorted(self._cumulative, rng.random(), side="right")), len(self.splits) - 1)
+        x3, x5, x6, r0, r1, _ = self.splits[index].tolist()
+        hidden = list(self.forced)
+        for group, seat_a, seat_b, count in ((3, 0, 1, x3), (5, 0, 2, x5), (6, 1, 2, x6)):
+            cards = rng.sample(self.groups[group], len(self.groups[group]))
+            hidden[seat_a] |= engine.cards_to_mask(cards[:count])
+            hidden[seat_b] |= engine.cards_to_mask(cards[count:])
+        cards = rng.sample(self.groups[7], len(self.groups[7]))
+        hidden[0] |= engine.cards_to_mask(cards[:r0])
+        hidden[1] |= engine.cards_to_mask(cards[r0:r0 + r1])
+        hidden[2] |= engine.cards_to_mask(cards[r0 + r1:])
+        return self._assemble(hidden)
+
+    # `n` consistent deals as an (n, 4) int64 array of hand masks; `rng` is a NumPy Generator or a seed.
+    def sample_batch(self, n, rng=None):
+        rng = np.random.default_rng(rng)
+        splits = self.splits[rng.choice(len(self.splits), size=n, p=self.probabilities)]
+        hidden = np.tile(np.array(self.forced, dtype=np.int64), (n, 1))
+
+        def deal(group, counts, seats):
+            cards = self.groups[group]
+            if not cards:
+                return
+            # Position of each card in a random shuffle of the group, per world; seats take consecutive runs
+            order = rng.random((n, len(cards))).argsort(axis=1).argsort(axis=1)
+            bits = np.array([CARD_BIT[card] for card in cards], dtype=np.int64)
+            low = np.zeros(n, dtype=np.int64)
+            for count, seat in zip(counts, seats):
+                high = low + count
+                taken = (order >= low[:, None]) & (order < high[:, None])
+                hidden[:, seat] |= (taken * bits).sum(axis=1)
+                low = high
+
+        x3, x5, x6, r0, r1, r2 = splits.T
+        n3, n5, n6 = (len(self.groups[t]) for t in (3, 5, 6))
+        deal(3, (x3, n3 - x3), (0, 1))
+        deal(5, (x5, n5 - x5), (0, 2))
+        deal(6, (x6, n6 - x6), (1, 2))
+        deal(7, (r0, r1, r2), (0, 1, 2))
+
+        hands = np.empty((n, engine.NUM_PLAYERS), dtype=np.int64)
+        hands[:, self.viewer] = self.constraints.hand
+        hands[:, self.seats] = hidden
+        return hands
+
+    # Exact probability of each card being in each hand, as a (4, 32) array.
+    def marginals(self):
+        result = np.zeros((engine.NUM_PLAYERS, engine.NUM_CARDS))
+        result[self.viewer] = engine.action_mask(self.constraints.hand)
+        hidden = np.zeros((3, engine.NUM_CARDS))
+        for j in range(3):
+            hidden[j] = engine.action_mask(self.forced[j])
+        x3, x5, x6, r0, r1, r2 = self.probabilities @ self.splits
+        n3, n5, n6 = (len(self.groups[t]) for t in (3, 5, 6))
+        for group, seat, expected in ((3, 0, x3), (3, 1, n3 - x3), (5, 0, x5), (5, 2, n5 - x5),
+                                      (6, 1, x6), (6, 2, n6 - x6), (7, 0, r0), (7, 1, r1), (7, 2, r2)):
+            cards = self.groups[group]
+            if cards:
+                hidden[seat, cards] = expected / len(cards)
+        result[self.seats] = hidden
+        return result
@@ -0,0 +1,429 @@
+"""
+Micro and end-to-end benchmarks for the Belot scripts and engines.
+
+Every target implements some of the same cases, so the numbers line up
+across implementations:
+
+    generate_deck            build a fresh deck
+    deal                     shuffle and deal 5 + 3 cards to four players
+    play_trick               play one trick from a full 8-card deal
+    determine_winning_card   find the winner of a 4-card trick
+    encode_state             encode one decision point for the agent
+    bidding_phase            one round of bidding
+    play_game                a full deal, reported as games/sec
+
+Targets are `Belot v1.py`, `Belot v2.py` and `Belot v3.py` (loaded from the
+repository root, their printing sent to /dev/null), the headless
+`belot.engine` and the batched `belot.vecenv`. New engines register a
+function in `TARGETS` that returns their cases.
+
+Each case is seeded, warmed up, calibrated so one trial lasts at least
+`min_time`, then timed over `trials` trials. Results are written as JSON and
+`bench-compare` flags cases whose median time per op regressed against a
+stored baseline.
+
+    python -m belot bench --output baseline.json
+    python -m belot bench --output current.json
+    python -m belot bench-compare baseline.json current.json --threshold 0.1
+"""
+
+import contextlib
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from belot import encoding, engine
+from belot.vecenv import BelotVecEnv
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = {"v1": "Belot v1.py", "v2": "Belot v2.py", "v3": "Belot v3.py"}
+CASES = ("generate_deck", "deal", "play_trick", "determine_winning_card", "encode_state", "bidding_phase", "play_game")
+POOL_SIZE = 256
+VECENV_SIZE = 256
+
+
+# Imports one of the numbered scripts as a module, discarding anything it prints.
+def load_script(version):
+    path = os.path.join(ROOT, SCRIPTS[version])
+    spec = importlib.util.spec_from_file_location(f"belot_{version}", path)
+    module = importlib.util.module_from_spec(spec)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        spec.loader.exec_module(module)
+    return module
+
+
+# Random 4-card tricks as (trick, lead_suit, trump_suit) with card ids.
+def random_tricks(rng, n=POOL_SIZE):
+    tricks = []
+    for _ in range(n):
+        trick = rng.sample(range(engine.NUM_CARDS), 4)
+        tricks.append((trick, engine.CARD_SUIT[trick[0]], rng.randrange(4)))
+    return tricks
+
+
+# Random full deals as lists of four 8-card lists of card ids.
+def random_deals(rng, n=POOL_SIZE):
+    deals = []
+    for _ in range(n):
+        deck = list(range(engine.NUM_CARDS))
+        rng.shuffle(deck)
+        deals.append([deck[i * 8:(i + 1) * 8] for i in range(4)])
+    return deals
+
+
+def cycle(pool):
+    state = {"i": 0}
+
+    def next_item():
+        i = state["i"]
+        state["i"] = (i + 1) % len(pool)
+        return pool[i]
+    return next_item
+
+
+# Each target takes a seeded random.Random and returns {case: (op, items per op call)}.
+
+def _string_cases(module, rng):
+    names = engine.CARD_NAMES
+    suits = engine.SUITS
+    tricks = [([names[card] for card in trick], suits[lead], suits[trump]) for trick, lead, trump in random_tricks(rng)]
+    deals = [([[names[card] for card in hand] for hand in deal], suits[rng.randrange(4)]) for deal in random_deals(rng)]
+    next_trick, next_deal = cycle(tricks), cycle(deals)
+
+    def determine_winning_card():
+        trick, lead, trump = next_trick()
+        module.determine_winning_card(trick, lead, trump)
+
+    def play_trick():
+        hands, trump = next_deal()
+        module.play_trick([list(hand) for hand in hands], trump)
+
+    return {
+        "generate_deck": (module.generate_deck, 1),
+        "play_trick": (play_trick, 1),
+        "determine_winning_card": (determine_winning_card, 1),
+        "bidding_phase": (module.bidding_phase, 1),
+        "play_game": (module.play_game, 1),
+    }
+
+
+def v1_cases(rng):
+    module = load_script("v1")
+    cases = _string_cases(module, rng)
+    deals = random_deals(rng)
+    next_deal = cycle(deals)
+    state = module.initialize_state()
+
+    def encode_state():
+        hands = next_deal()
+        module.update_cards_in_hand(state, hands[0])
+        module.update_cards_played(state, hands[1][0])
+        module.set_trump_suit(state, "hearts")
+        module.update_current_trick(state, [hands[1][0], hands[2][0]])
+        module.get_state_vector(state)
+
+    cases["deal"] = (module.generate_hands, 1)
+    cases["encode_state"] = (encode_state, 1)
+    return cases
+
+
+def v2_cases(rng):
+    module = load_script("v2")
+    cases = _string_cases(module, rng)
+
+    def deal():
+        deck = module.generate_deck()
+        random.shuffle(deck)
+        players_hands, remaining = module.generate_initial_hands(deck)
+        module.deal_additional_cards(players_hands, remaining)
+
+    # v2's play_game fails on the rare deal where everyone passes (winner is None), so the game's own
+    # bidding is repeated until someone bids; any other error propagates
+    bidding_phase = module.bidding_phase
+
+    def bid_until_taken():
+        while True:
+            winner, trump_suit = bidding_phase()
+            if winner is not None:
+                return winner, trump_suit
+
+    module.bidding_phase = bid_until_taken
+    cases["deal"] = (deal, 1)
+    return cases
+
+
+def _mask_deals(rng):
+    return [([engine.cards_to_mask(hand) for hand in deal], rng.randrange(4)) for deal in random_deals(rng)]
+
+
+def v3_cases(rng):
+    module = load_script("v3")
+    tricks = random_tricks(rng)
+    deals = _mask_deals(rng)
+    next_trick, next_deal = cycle(tricks), cycle(deals)
+
+    def deal():
+        deck = module.generate_deck()
+        random.shuffle(deck)
+        players_hands, remaining = module.generate_initial_hands(deck)
+        module.deal_additional_cards(players_hands, remaining)
+
+    def play_trick():
+        hands, trump = next_deal()
+        module.play_trick(list(hands), trump)
+
+    def determine_winning_card():
+        trick, lead, trump = next_trick()
+        module.determine_winning_card(trick, lead, trump)
+
+    def encode_state():
+        trick, lead, trump = next_trick()
+        hands, _ = next_deal()
+        module.encode_state(hands, 2, trick[:2], trump, lead)
+
+    return {
+        "generate_deck": (module.generate_deck, 1),
+        "deal": (deal, 1),
+        "play_trick": (play_trick, 1),
+        "determine_winning_card": (determine_winning_card, 1),
+        "encode_state": (encode_state, 1),
+        "bidding_phase": (module.bidding_phase, 1),
+        "play_game": (module.play_game, 1),
+    }
+
+
+def engine_cases(rng):
+    tricks = random_tricks(rng)
+    deals = _mask_deals(rng)
+    next_trick, next_deal = cycle(tricks), cycle(deals)
+    out = encoding.new_buffer()
+
+    def deal():
+        deck = engine.generate_deck()
+        rng.shuffle(deck)
+        players_hands, remaining = engine.generate_initial_hands(deck)
+        engine.deal_additional_cards(players_hands, remaining)
+
+    def play_trick():
+        hands, trump = next_deal()
+        engine.play_trick(list(hands), trump, 0, None, rng)
+
+    def determine_winning_card():
+        trick, lead, trump = next_trick()
+        engine.determine_winning_card(trick, lead, trump)
+
+    def encode_state():
+        trick, lead, trump = next_trick()
+        hands, _ = next_deal()
+        encoding.encode_state(out, hands[2], encoding.played_mask(hands), trick[:2], 0, 2, trump, lead)
+
+    return {
+        "generate_deck": (engine.generate_deck, 1),
+        "deal": (deal, 1),
+        "play_trick": (play_trick, 1),
+        "determine_winning_card": (determine_winning_card, 1),
+        "encode_state": (encode_state, 1),
+        "bidding_phase": (lambda: engine.bidding_phase(rng), 1),
+        "play_game": (lambda: engine.play_game(rng), 1),
+    }
+
+
+def vecenv_cases(rng):
+    env = BelotVecEnv(VECENV_SIZE, seed=rng.getrandbits(32))
+    out = encoding.new_buffer(VECENV_SIZE)
+
+    # All rows are dealt together, so 32 steps finish every game at once
+    def play_game():
+        env.reset()
+        for _ in range(engine.NUM_CARDS):
+            env.step(env.sample_actions(env.legal_actions()))
+
+    def deal():
+        env.reset()
+
+    def encode_state():
+        encoding.encode_env(env, out)
+
+    env.reset()
+    return {
+        "deal": (deal, VECENV_SIZE),
+        "encode_state": (encode_state, VECENV_SIZE),
+        "play_game": (play_game, VECENV_SIZE),
+    }
+
+
+TARGETS = {
+    "v1": v1_cases,
+    "v2": v2_cases,
+    "v3": v3_cases,
+    "engine": engine_cases,
+    "vecenv": vecenv_cases,
+}
+
+
+def seed_all(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    return random.Random(seed)
+
+
+# Number of op calls that makes one trial last at least `min_time`, as in timeit's autorange.
+def calibrate(op, min_time):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        if time.perf_counter() - start >= min_time:
+            return number
+        number *= 2
+
+
+# Times `op` over `trials` trials after `warmup` untimed ones and returns per-item statistics.
+def time_case(op, items, trials=5, warmup=1, min_time=0.2):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        number = calibrate(op, min_time)
+        for _ in range(warmup):
+            for _ in range(number):
+                op()
+        samples = []
+        for _ in range(trials):
+            start = time.perf_counter()
+            for _ in range(number):
+                op()
+            samples.append((time.perf_counter() - start) / (number * items))
+
+    median = statistics.median(samples)
+    return {
+        "number": number,
+        "items_per_op": items,
+        "trials": trials,
+        "samples": samples,
+        "median": median,
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if trials > 1 else 0.0,
+        "min": min(samples),
+        "max": max(samples),
+        "per_sec": 1 / median if median else None,
+    }
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+# Runs the selected cases of the selected targets and returns the JSON-ready report.
+def run(targets=None, cases=None, trials=5, warmup=1, min_time=0.2, seed=0, progress=None):
+    report = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "settings": {"trials": trials, "warmup": warmup, "min_time": min_time, "seed": seed},
+        "results": {},
+    }
+    for target in targets or TARGETS:
+        available = TARGETS[target](seed_all(seed))
+        for case in cases or CASES:
+            if case not in available:
+                continue
+            op, items = available[case]
+            seed_all(seed)
+            result = time_case(op, items, trials, warmup, min_time)
+            report["results"][f"{target}/{case}"] = result
+            if progress:
+                progress(f"{target}/{case}", result)
+    return report
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def format_result(name, result):
+    return (f"{name:32s} {format_time(result['median']):>10s} +- {format_time(result['stdev']):>10s}"
+            f"  {result['per_sec']:>12,.0f}/s")
+
+
+# Cases present in both reports whose median time per item grew by more than `threshold`.
+def compare(baseline, current, threshold=0.1):
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["median"] / before["median"]
+        rows.append((name, before["median"], result["median"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("bench", help="time the scripts and engines")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=None, help="targets to run")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=None, help="cases to run")
+    parser.add_argument("--trials", type=int, default=5, help="timed trials per case")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed trials per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per trial")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    parser.set_defaults(func=run_cli)
+
+    parser = subparsers.add_parser("bench-compare", help="flag regressions between two benchmark reports")
+    parser.add_argument("baseline", help="stored baseline report")
+    parser.add_argument("current", nargs="?", default=None, help="new report (runs the benchmarks if omitted)")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown, as a fraction")
+    parser.set_defaults(func=run_compare_cli)
+    return parser
+
+
+def run_cli(args):
+    report = run(args.targets, args.cases, args.trials, args.warmup, args.min_time, args.seed,
+                 progress=lambda name, result: print(format_result(name, result), flush=True))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+def run_compare_cli(args):
+    baseline = load_report(args.baseline)
+    if args.current:
+        current = load_report(args.current)
+    else:
+        settings = baseline["settings"]
+        names = list(baseline["results"])
+        targets = list(dict.fromkeys(name.split("/")[0] for name in names if name.split("/")[0] in TARGETS))
+        cases = list(dict.fromkeys(name.split("/")[1] for name in names if name.split("/")[1] in CASES))
+        current = run(targets, cases, settings["trials"], settings["warmup"], settings["min_time"], settings["seed"])
+
+    regressions = 0
+    for name, before, after, ratio, regressed in compare(baseline, current, args.threshold):
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:32s} {format_time(before):>10s} -> {format_time(after):>10s}  {ratio:6.2f}x  {flag}")
+        regressions += regressed
+    if regressions:
+        print(f"{regressions} case(s) slower than the baseline by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
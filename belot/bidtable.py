@@ -0,0 +1,257 @@
+"""
+Precomputed bidding table: expected points of every 5-card opening hand.
+
+For each 5-card hand from `generate_initial_hands`, each trump suit and each
+bidder seat, the table stores the mean and variance of the bidding team's
+card points over random continuations. In each continuation the other
+27 cards are dealt at random (5 + 3 as in `deal_additional_cards`) and the
+deal is played out with `engine.play_trick` random play, player 0 leading.
+
+Suit symmetry shrinks the table. Only the trump suit's cards and the sorted
+contents of the other three suits matter, so the 201,376 hands x 4 trumps
+collapse to 38,304 classes. A class key is the 32-bit mask with trump as
+suit 0 and the other suit bytes in ascending order, which matches what
+`belot.canonical` does for a lone hand.
+
+The table is a directory of memory-mapped `.npy` files:
+
+    keys    (classes,)    uint32   class keys, ascending
+    mean    (classes, 4)  float32  bidding team points by bidder seat
+    var     (classes, 4)  float32
+    count   (classes,)    int32    rollouts per seat behind each row (0 = not built)
+    meta.json                      rollouts, seed, chunk size
+
+Building runs chunks of classes over worker processes, each chunk with its
+own seed spawned from one root seed. A chunk is written and flushed as soon
+as it finishes, so an interrupted build resumes where it stopped.
+
+    python -m belot bidtable tables/bids --rollouts 256 --workers 8 --seed 1
+
+    table = BidTable("tables/bids")
+    mean, var = table.lookup(hand, trump_suit, seat)
+    seat, trump_suit = table.bidding_phase(players_hands)
+"""
+
+import itertools
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from belot import engine, parallel
+from belot.engine import DEAL_POINTS, NUM_CARDS, NUM_PLAYERS, NUM_TRICKS
+
+
+HAND_SIZE = 5
+CHUNK_SIZE = 64
+DEFAULT_ROLLOUTS = 256
+# Half of a deal's card points, the unit the table is built in
+DEFAULT_THRESHOLD = DEAL_POINTS / 2
+
+
+# Class key of `hand` with `trump_suit`: trump byte first, other suit bytes ascending.
+def class_key(hand, trump_suit):
+    suits = [hand >> 8 * suit & 0xFF for suit in range(4)]
+    trump = suits.pop(trump_suit)
+    suits.sort()
+    return trump | suits[0] << 8 | suits[1] << 16 | suits[2] << 24
+
+
+# Every class key, ascending.
+def all_class_keys():
+    keys = set()
+    for cards in itertools.combinations(range(NUM_CARDS), HAND_SIZE):
+        hand = engine.cards_to_mask(cards)
+        for trump in range(4):
+            keys.add(class_key(hand, trump))
+    return np.array(sorted(keys), dtype=np.uint32)
+
+
+# Bidding team points of one random continuation of `hand` held by `seat`, trump being suit 0.
+def rollout(hand, seat, rng):
+    rest = engine.mask_to_cards(engine.FULL_DECK & ~hand)
+    rng.shuffle(rest)
+    players_hands = [0] * NUM_PLAYERS
+    position = 0
+    for player in range(NUM_PLAYERS):
+        if player == seat:
+            players_hands[player] = hand
+        else:
+            players_hands[player] = engine.cards_to_mask(rest[position:position + HAND_SIZE])
+            position += HAND_SIZE
+    for player in range(NUM_PLAYERS):
+        players_hands[player] |= engine.cards_to_mask(rest[position:position + 3])
+        position += 3
+
+    points = engine.CARD_POINTS[0]
+    team_points = 0
+    leader = 0
+    for _ in range(NUM_TRICKS):
+        leader, trick = engine.play_trick(players_hands, 0, leader, None, rng)
+        if not (leader ^ seat) & 1:
+            team_points += points[trick[0]] + points[trick[1]] + points[trick[2]] + points[trick[3]]
+    return team_points
+
+
+# Rolls out one chunk of class keys; returns (start, mean, var) arrays of shape (n, 4).
+def build_chunk(task):
+    start, keys, rollouts, seed_seq = task
+    rng = parallel.chunk_rng(seed_seq)
+    mean = np.empty((len(keys), NUM_PLAYERS), dtype=np.float32)
+    var = np.empty((len(keys), NUM_PLAYERS), dtype=np.float32)
+    samples = np.empty(rollouts, dtype=np.float64)
+    for row, key in enumerate(keys):
+        for seat in range(NUM_PLAYERS):
+            for i in range(rollouts):
+                samples[i] = rollout(int(key), seat, rng)
+            mean[row, seat] = samples.mean()
+            var[row, seat] = samples.var()
+    return start, mean, var
+
+
+def _open_columns(path, mode, classes=None):
+    shapes = {
+        "keys": ((classes,), np.uint32),
+        "mean": ((classes, NUM_PLAYERS), np.float32),
+        "var": ((classes, NUM_PLAYERS), np.float32),
+        "count": ((classes,), np.int32),
+    }
+    columns = {}
+    for name, (shape, dtype) in shapes.items():
+        file = os.path.join(path, f"{name}.npy")
+        if mode == "w+":
+            columns[name] = open_memmap(file, mode="w+", dtype=dtype, shape=shape)
+        else:
+            columns[name] = open_memmap(file, mode=mode)
+    return columns
+
+
+# Builds the table at `path`, or finishes an interrupted build there.
+def build(path, rollouts=DEFAULT_ROLLOUTS, workers=1, seed=None, chunk_size=CHUNK_SIZE, progress=None):
+    meta_path = os.path.join(path, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        # A resumed build keeps its settings; mixing rollout counts or chunk seeds would skew the table
+        for name, value in (("rollouts", rollouts), ("chunk_size", chunk_size), ("seed", seed)):
+            if value is not None and value != meta[name]:
+                raise ValueError(f"{path} is being built with {name}={meta[name]}, not {value}")
+        columns = _open_columns(path, "r+")
+    else:
+        keys = all_class_keys()
+        meta = {"rollouts": rollouts, "seed": np.random.SeedSequence(seed).entropy, "chunk_size": chunk_size,
+                "classes": len(keys)}
+        os.makedirs(path, exist_ok=True)
+        columns = _open_columns(path, "w+", len(keys))
+        columns["keys"][:] = keys
+        columns["count"][:] = 0
+        columns["keys"].flush()
+        columns["count"].flush()
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+    # Seeds depend only on the chunk number, so a resumed build matches an uninterrupted one
+    keys = columns["keys"]
+    chunk_size = meta["chunk_size"]
+    starts = range(0, len(keys), chunk_size)
+    seeds = np.random.SeedSequence(meta["seed"]).spawn(len(starts))
+    tasks = [(start, np.array(keys[start:start + chunk_size]), meta["rollouts"], seed_seq)
+             for start, seed_seq in zip(starts, seeds) if not columns["count"][start:start + chunk_size].all()]
+
+    done = len(starts) - len(tasks)
+    begin = time.perf_counter()
+    with multiprocessing.Pool(workers) if workers > 1 else _Serial() as pool:
+        for start, mean, var in pool.imap_unordered(build_chunk, tasks):
+            end = start + len(mean)
+            columns["mean"][start:end] = mean
+            columns["var"][start:end] = var
+            columns["mean"].flush()
+            columns["var"].flush()
+            # Marked built only once its values are on disk
+            columns["count"][start:end] = meta["rollouts"]
+            columns["count"].flush()
+            done += 1
+            if progress:
+                progress(done, len(starts), time.perf_counter() - begin)
+    return BidTable(path)
+
+
+class _Serial:
+    """Stand-in for a Pool that runs tasks in this process."""
+
+    def imap_unordered(self, func, tasks):
+        return map(func, tasks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class BidTable:
+    """Read-only view of a built table with O(1) lookups."""
+
+    def __init__(self, path):
+        self.path = path
+        columns = _open_columns(path, "r")
+        self.keys = columns["keys"]
+        self.mean = columns["mean"]
+        self.var = columns["var"]
+        self.count = columns["count"]
+        self.rows = {key: row for row, key in enumerate(self.keys.tolist())}
+
+    def complete(self):
+        return bool(self.count.all())
+
+    def row(self, hand, trump_suit):
+        return self.rows[class_key(hand, trump_suit)]
+
+    # Mean and variance of the bidding team's points for `hand` held by `seat` with `trump_suit`.
+    def lookup(self, hand, trump_suit, seat=0):
+        row = self.rows[class_key(hand, trump_suit)]
+        return float(self.mean[row, seat]), float(self.var[row, seat])
+
+    # Expected points for each of the four trump suits.
+    def suit_values(self, hand, seat=0):
+        return [float(self.mean[self.rows[class_key(hand, trump)], seat]) for trump in range(4)]
+
+    # The best trump for `hand` and its expected points.
+    def best_trump(self, hand, seat=0):
+        values = self.suit_values(hand, seat)
+        trump = max(range(4), key=values.__getitem__)
+        return trump, values[trump]
+
+    # Bidding with the same outcome shape as `engine.bidding_phase`: each player in turn names its
+    # best trump if it expects at least `threshold` points and more than the standing bid.
+    # Returns the winning seat and trump suit, or (None, None) if everyone passes.
+    def bidding_phase(self, players_hands, threshold=DEFAULT_THRESHOLD):
+        winner, current_bid, best = None, None, None
+        for seat in range(NUM_PLAYERS):
+            trump, value = self.best_trump(players_hands[seat], seat)
+            if value >= threshold and (best is None or value > best):
+                winner, current_bid, best = seat, trump, value
+        return winner, current_bid
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("bidtable", help="build or resume the 5-card bidding table")
+    parser.add_argument("path", help="table directory")
+    parser.add_argument("--rollouts", type=int, default=DEFAULT_ROLLOUTS, help="continuations per hand, trump and seat")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--seed", type=int, default=None, help="root seed (random if omitted)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="classes per task")
+    parser.set_defaults(func=run_cli)
+    return parser
+
+
+def run_cli(args):
+    def progress(done, total, elapsed):
+        print(f"\r{done}/{total} chunks, {elapsed:.0f}s", end="", flush=True)
+
+    table = build(args.path, args.rollouts, args.workers, args.seed, args.chunk_size, progress)
+    print(f"\n{args.path}: {len(table.keys)} hand classes, complete: {table.complete()}")
+    return 0
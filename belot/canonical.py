@@ -0,0 +1,178 @@
+"""
+Suit-isomorphism canonicalization.
+
+Renaming suits does not change a Belot position: once trump is known any
+permutation of the three other suits gives an equivalent position (and the
+trump suit itself can be renamed along with the rest), and before trump is
+known all four suits are interchangeable. Evaluators such as the solver only
+need to see one member of each class.
+
+`canonicalize` maps a `Position` to its canonical member and returns the
+permutation used. The canonical position has trump as suit 0 (hearts) and
+the remaining suits ordered by their contents, so it is found by sorting
+four suit signatures rather than trying all 24 permutations. A permutation
+is a tuple `perm` with `perm[old_suit] == new_suit`.
+
+    canonical, perm = canonicalize(Position(hands, trick, leader, trump, lead_suit))
+    best = solve(canonical)                      # any evaluator
+    best_move = permute_card(best, invert(perm)) # back to the original suits
+
+`DedupFilter` drops isomorphic duplicates from a stream of positions and
+`IsomorphicCache` memoizes an evaluator on the canonical key.
+"""
+
+from collections import namedtuple
+
+from belot.engine import CARD_RANK, CARD_SUIT, NO_SUIT
+
+
+# A position: four hand masks, cards played to the current trick, the seat that led it,
+# the trump suit (None before bidding ends) and the lead suit (NO_SUIT with an empty trick)
+Position = namedtuple("Position", ["hands", "trick", "leader", "trump", "lead_suit"])
+
+IDENTITY = (0, 1, 2, 3)
+
+
+def deal_position(players_hands, trump=None, leader=0):
+    return Position(tuple(players_hands), (), leader, trump, NO_SUIT)
+
+
+def invert(perm):
+    inverse = [0] * 4
+    for old, new in enumerate(perm):
+        inverse[new] = old
+    return tuple(inverse)
+
+
+def compose(first, second):
+    return tuple(second[first[suit]] for suit in range(4))
+
+
+def permute_card(card, perm):
+    return perm[CARD_SUIT[card]] << 3 | CARD_RANK[card]
+
+
+def permute_mask(mask, perm):
+    return ((mask & 0xFF) << 8 * perm[0] | (mask >> 8 & 0xFF) << 8 * perm[1]
+            | (mask >> 16 & 0xFF) << 8 * perm[2] | (mask >> 24 & 0xFF) << 8 * perm[3])
+
+
+def permute_position(position, perm):
+    hands, trick, leader, trump, lead_suit = position
+    return Position(
+        tuple(permute_mask(hand, perm) for hand in hands),
+        tuple(permute_card(card, perm) for card in trick),
+        leader,
+        None if trump is None else perm[trump],
+        NO_SUIT if lead_suit == NO_SUIT else perm[lead_suit],
+    )
+
+
+# Everything about `suit` in the position that a renaming must preserve.
+def _signature(position, suit):
+    hands, trick, _, _, lead_suit = position
+    shift = 8 * suit
+    return (
+        suit == lead_suit,
+        hands[0] >> shift & 0xFF, hands[1] >> shift & 0xFF,
+        hands[2] >> shift & 0xFF, hands[3] >> shift & 0xFF,
+        tuple(CARD_RANK[card] if CARD_SUIT[card] == suit else -1 for card in trick),
+    )
+
+
+# Permutation taking `position` to its canonical form: trump first, then the other suits by signature.
+def canonical_permutation(position):
+    trump = position.trump
+    suits = sorted((suit for suit in range(4) if suit != trump), key=lambda suit: _signature(position, suit))
+    if trump is not None:
+        suits.insert(0, trump)
+    perm = [0] * 4
+    for new, old in enumerate(suits):
+        perm[old] = new
+    return tuple(perm)
+
+
+# Returns (canonical position, permutation from the original suits to the canonical ones).
+def canonicalize(position):
+    perm = canonical_permutation(position)
+    return permute_position(position, perm), perm
+
+
+# Hashable key of a position; equal for isomorphic positions after canonicalization.
+def position_key(position):
+    hands, trick, leader, trump, lead_suit = position
+    key = hands[0] | hands[1] << 32 | hands[2] << 64 | hands[3] << 96
+    for card in trick:
+        key = key << 5 | card
+    return key, len(trick), leader, trump, lead_suit
+
+
+def canonical_key(position):
+    return position_key(canonicalize(position)[0])
+
+
+class DedupFilter:
+    """Keeps the first position of every isomorphism class seen so far."""
+
+    def __init__(self):
+        self.seen = set()
+        self.dropped = 0
+
+    # True if `position` is new up to suit renaming (and records it).
+    def add(self, position):
+        key = canonical_key(position)
+        if key in self.seen:
+            self.dropped += 1
+            return False
+        self.seen.add(key)
+        return True
+
+    # Yields the items whose position (`key(item)`, default the item itself) is new.
+    def filter(self, items, key=None):
+        for item in items:
+            if self.add(item if key is None else key(item)):
+                yield item
+
+    def __len__(self):
+        return len(self.seen)
+
+
+class IsomorphicCache:
+    """
+    Memoizes `evaluator(canonical_position)` on the canonical key.
+
+    Results are computed in canonical suits. `restore(result, inverse_perm)`
+    maps a cached result back to the caller's suits; the default returns it
+    unchanged, which suits suit-independent values such as team points.
+    """
+
+    def __init__(self, evaluator, restore=None, maxsize=None):
+        self.evaluator = evaluator
+        self.restore = restore
+        self.maxsize = maxsize
+        self.table = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, position):
+        canonical, perm = canonicalize(position)
+        key = position_key(canonical)
+        result = self.table.get(key)
+        if result is None:
+            self.misses += 1
+            result = self.evaluator(canonical)
+            if self.maxsize is not None and len(self.table) >= self.maxsize:
+                del self.table[next(iter(self.table))]  # oldest entry
+            self.table[key] = result
+        else:
+            self.hits += 1
+        return result if self.restore is None else self.restore(result, invert(perm))
+
+    def clear(self):
+        self.table.clear()
+        self.hits = self.misses = 0
+
+
+# `restore` for evaluators that return a card, such as a best move.
+def restore_card(card, inverse_perm):
+    return card if card < 0 else permute_card(card, inverse_perm)
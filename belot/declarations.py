@@ -0,0 +1,162 @@
+"""
+Declarations (belot, sequences, four of a kind) on the 8-card hands.
+
+Scored as in Bulgarian Belot:
+
+    belot      K + Q of trump                                    20
+    tierce     3 cards in a row of one suit                      20
+    quarte     4 in a row                                        50
+    quint      5 or more in a row (a run of 8 is quint + tierce) 100
+    carre      four of a kind: jacks 200, nines 150,
+               aces / tens / kings / queens 100 (sevens and eights do not count)
+
+Sequences follow the natural rank order 7 8 9 10 J Q K A, which is the bit
+order of a suit byte in a hand mask, so every suit's runs come from one
+256-entry table. Four of a kind is the AND of the four suit bytes. A card in
+a scoring carre cannot also count in a sequence, so those ranks are cleared
+before the run lookups. Belot counts regardless of other declarations.
+
+Between teams, the team holding the best sequence (by category, then top
+card) scores all of its sequences and the other team none; if the best
+sequences are equal, neither team scores sequences. Carres work the same
+way, ranked J 9 A 10 K Q. Each team scores its own belots.
+
+    hand_declarations(hand, trump_suit)             # one hand, a handful of lookups
+    deal_declarations(players_hands, trump_suit)    # team points for a deal
+    deal_declarations_batch(hands, trump)           # (N, 4) hands -> (N, 2) team points
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from belot.engine import RANKS
+
+
+TIERCE, QUARTE, QUINT = 20, 50, 100
+BELOT = 20
+CARRE_POINTS_BY_RANK = {"J": 200, "9": 150, "A": 100, "10": 100, "K": 100, "Q": 100}
+CARRE_ORDER = ("Q", "K", "10", "A", "9", "J")  # weakest first
+
+# Rank bits (within a suit byte) of the carres that score, and of the belot pair
+CARRE_RANKS = sum(1 << RANKS.index(rank) for rank in CARRE_POINTS_BY_RANK)
+BELOT_RANKS = 1 << RANKS.index("K") | 1 << RANKS.index("Q")
+
+
+# Sequences in one suit byte as (points, top rank), runs of 8 split into a quint and a tierce.
+def _runs(byte):
+    runs = []
+    rank = 0
+    while rank < 8:
+        if not byte >> rank & 1:
+            rank += 1
+            continue
+        start = rank
+        while rank < 8 and byte >> rank & 1:
+            rank += 1
+        length = rank - start
+        if length == 8:
+            runs += [(QUINT, 7), (TIERCE, 2)]
+        elif length >= 5:
+            runs.append((QUINT, rank - 1))
+        elif length == 4:
+            runs.append((QUARTE, rank - 1))
+        elif length == 3:
+            runs.append((TIERCE, rank - 1))
+    return runs
+
+
+def _sequence_key(points, top):
+    return {TIERCE: 1, QUARTE: 2, QUINT: 3}[points] * 8 + top + 1
+
+
+# Per suit byte: total sequence points and the key of the best sequence (0 = none)
+RUN_POINTS = tuple(sum(points for points, _ in _runs(byte)) for byte in range(256))
+RUN_BEST = tuple(max((_sequence_key(*run) for run in _runs(byte)), default=0) for byte in range(256))
+
+# Per byte of ranks held in all four suits: carre points and the key of the best carre (0 = none)
+CARRE_POINTS = tuple(sum(points for rank, points in CARRE_POINTS_BY_RANK.items() if quads >> RANKS.index(rank) & 1)
+                     for quads in range(256))
+CARRE_BEST = tuple(max((CARRE_ORDER.index(rank) + 1 for rank in CARRE_POINTS_BY_RANK
+                        if quads >> RANKS.index(rank) & 1), default=0)
+                   for quads in range(256))
+
+_RUN_POINTS = np.array(RUN_POINTS, dtype=np.int16)
+_RUN_BEST = np.array(RUN_BEST, dtype=np.int16)
+_CARRE_POINTS = np.array(CARRE_POINTS, dtype=np.int16)
+_CARRE_BEST = np.array(CARRE_BEST, dtype=np.int16)
+
+
+# One hand's declarations; the *_best fields are comparison keys, higher is better
+HandDeclarations = namedtuple("HandDeclarations", ["belot", "sequences", "sequence_best", "carres", "carre_best"])
+
+# Team totals for a deal after comparing the teams' best sequences and carres
+DealDeclarations = namedtuple("DealDeclarations", ["points", "belots", "sequences", "carres"])
+
+
+def hand_declarations(hand, trump_suit):
+    quads = hand & hand >> 8 & hand >> 16 & hand >> 24 & CARRE_RANKS
+    free = hand & ~(quads * 0x01010101)
+    b0, b1, b2, b3 = free & 0xFF, free >> 8 & 0xFF, free >> 16 & 0xFF, free >> 24
+    return HandDeclarations(
+        BELOT if hand >> 8 * trump_suit & BELOT_RANKS == BELOT_RANKS else 0,
+        RUN_POINTS[b0] + RUN_POINTS[b1] + RUN_POINTS[b2] + RUN_POINTS[b3],
+        max(RUN_BEST[b0], RUN_BEST[b1], RUN_BEST[b2], RUN_BEST[b3]),
+        CARRE_POINTS[quads],
+        CARRE_BEST[quads],
+    )
+
+
+# Points of the team with the strictly better `best` key; nothing for either team on a tie.
+def _award(points, best):
+    if best[0] > best[1]:
+        return points[0], 0
+    if best[1] > best[0]:
+        return 0, points[1]
+    return 0, 0
+
+
+def deal_declarations(players_hands, trump_suit):
+    hands = [hand_declarations(hand, trump_suit) for hand in players_hands]
+    teams = ((hands[0], hands[2]), (hands[1], hands[3]))
+    belots = tuple(a.belot + b.belot for a, b in teams)
+    sequences = _award([a.sequences + b.sequences for a, b in teams],
+                       [max(a.sequence_best, b.sequence_best) for a, b in teams])
+    carres = _award([a.carres + b.carres for a, b in teams], [max(a.carre_best, b.carre_best) for a, b in teams])
+    points = tuple(belots[team] + sequences[team] + carres[team] for team in range(2))
+    return DealDeclarations(points, belots, sequences, carres)
+
+
+# Per-hand declarations of an array of hand masks, as int16 arrays of the hands' shape.
+def hand_declarations_batch(hands, trump):
+    hands = np.asarray(hands, dtype=np.int64)
+    trump = np.asarray(trump, dtype=np.int64)
+    quads = hands & hands >> 8 & hands >> 16 & hands >> 24 & CARRE_RANKS
+    free = hands & ~(quads * 0x01010101)
+    suits = [free >> shift & 0xFF for shift in (0, 8, 16, 24)]
+    return HandDeclarations(
+        np.where(hands >> 8 * trump & BELOT_RANKS == BELOT_RANKS, BELOT, 0).astype(np.int16),
+        sum(_RUN_POINTS[suit] for suit in suits),
+        np.maximum.reduce([_RUN_BEST[suit] for suit in suits]),
+        _CARRE_POINTS[quads],
+        _CARRE_BEST[quads],
+    )
+
+
+# `deal_declarations` for N deals: `hands` is (N, 4) hand masks, `trump` (N,); returns (N, 2) team points.
+def deal_declarations_batch(hands, trump):
+    hands = np.asarray(hands, dtype=np.int64)
+    declared = hand_declarations_batch(hands, np.asarray(trump)[:, None])
+
+    def by_team(values, reduce):
+        return np.stack([reduce(values[:, 0], values[:, 2]), reduce(values[:, 1], values[:, 3])], axis=1)
+
+    def award(points, best):
+        points = by_team(points, np.add)
+        best = by_team(best, np.maximum)
+        wins = np.stack([best[:, 0] > best[:, 1], best[:, 1] > best[:, 0]], axis=1)
+        return points * wins
+
+    belots = by_team(declared.belot, np.add)
+    return (belots + award(declared.sequences, declared.sequence_best)
+            + award(declared.carres, declared.carre_best)).astype(np.int16)
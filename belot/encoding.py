@@ -0,0 +1,142 @@
+"""
+Fixed-width state encoder for the RL agent.
+
+Every state is encoded into the same `STATE_SIZE` layout, extending the
+32-slot card vectors sketched in `Belot v1.py` (`initialize_state` /
+`get_state_vector`). Seats are relative to the player to act, so slot 0 of
+the trick block is always "me", 1 the next player, 2 the partner, 3 the
+previous player.
+
+    HAND     32  cards in the player's hand
+    PLAYED   32  cards played so far in the deal, current trick included
+    TRICK   128  current trick, one 32-card block per relative seat
+    TRUMP     4  one-hot trump suit
+    LEAD      4  one-hot lead suit (all zero before the first card of a trick)
+    BIDDER    4  one-hot relative seat of the player who chose trump
+    SCORES    2  own team / opponent points so far, divided by MAX_POINTS
+
+`encode_state` writes one state into a caller-provided row without
+allocating, and `encode_batch` fills an (M, STATE_SIZE) array at once.
+`pack_states` / `unpack_states` convert to and from a compact storage form:
+every slot before SCORES is 0/1 and is bit-packed, and the two scores are
+kept as whole points in uint8.
+"""
+
+import numpy as np
+
+from belot import engine
+from belot.engine import NO_SUIT, NUM_CARDS, action_mask
+
+
+# Card points in a deal, the most either team can have from `engine.play_deal`
+MAX_POINTS = float(engine.DEAL_POINTS)
+
+HAND = slice(0, 32)
+PLAYED = slice(32, 64)
+TRICK = slice(64, 192)
+TRUMP = slice(192, 196)
+LEAD = slice(196, 200)
+BIDDER = slice(200, 204)
+SCORES = slice(204, 206)
+STATE_SIZE = 206
+
+BINARY_SIZE = SCORES.start
+PACKED_SIZE = (BINARY_SIZE + 7) // 8
+
+_CARD_SLOTS = np.arange(NUM_CARDS, dtype=np.uint64)
+
+
+def new_buffer(rows=None, dtype=np.float32):
+    return np.zeros(STATE_SIZE if rows is None else (rows, STATE_SIZE), dtype=dtype)
+
+
+# Unpacks int card masks into an (M, 32) boolean array.
+def mask_bits(masks):
+    masks = np.asarray(masks, dtype=np.uint64)
+    return ((masks[:, None] >> _CARD_SLOTS) & 1).astype(bool)
+
+
+# Encodes one state into `out` (a STATE_SIZE row) in place and returns it.
+# `hand` and `played` are card masks, `trick` the cards of the current trick in play order
+# starting from `leader`, and `scores` the points of team 1 (seats 0, 2) and team 2 (seats 1, 3).
+def encode_state(out, hand, played, trick, leader, player, trump_suit, lead_suit=NO_SUIT, bidder=None, scores=None):
+    out[:] = 0
+    action_mask(hand, out[HAND])
+    action_mask(played, out[PLAYED])
+    for k, card in enumerate(trick):
+        out[TRICK.start + ((leader + k - player) & 3) * NUM_CARDS + card] = 1
+    out[TRUMP.start + trump_suit] = 1
+    if lead_suit != NO_SUIT:
+        out[LEAD.start + lead_suit] = 1
+    if bidder is not None:
+        out[BIDDER.start + ((bidder - player) & 3)] = 1
+    if scores is not None:
+        team = player & 1
+        out[SCORES.start] = scores[team] / MAX_POINTS
+        out[SCORES.start + 1] = scores[1 - team] / MAX_POINTS
+    return out
+
+
+# Encodes M states into `out` (M, STATE_SIZE).
+# `hands` and `played` are (M, 32) booleans, `trick` is (M, 4) cards by absolute seat with -1
+# for seats that have not played yet, and the remaining arguments are (M,) arrays
+# (`scores` is (M, 2)), as kept by `belot.vecenv.BelotVecEnv`.
+def encode_batch(out, hands, played, trick, player, trump_suit, lead_suit, bidder=None, scores=None):
+    rows = np.arange(len(out))
+    player = np.asarray(player, dtype=np.intp)
+    out[:] = 0
+    out[:, HAND] = hands
+    out[:, PLAYED] = played
+
+    trick = np.asarray(trick)
+    trick_rows, seats = np.nonzero(trick >= 0)
+    relative = (seats - player[trick_rows]) & 3
+    out[trick_rows, TRICK.start + relative * NUM_CARDS + trick[trick_rows, seats]] = 1
+
+    out[rows, TRUMP.start + np.asarray(trump_suit, dtype=np.intp)] = 1
+    lead_suit = np.asarray(lead_suit, dtype=np.intp)
+    led = lead_suit != NO_SUIT
+    out[rows[led], LEAD.start + lead_suit[led]] = 1
+    if bidder is not None:
+        out[rows, BIDDER.start + ((np.asarray(bidder, dtype=np.intp) - player) & 3)] = 1
+    if scores is not None:
+        scores = np.asarray(scores)
+        team = player & 1
+        out[:, SCORES.start] = scores[rows, team] / MAX_POINTS
+        out[:, SCORES.start + 1] = scores[rows, 1 - team] / MAX_POINTS
+    return out
+
+
+# Encodes the state of the player to act in every game of a `BelotVecEnv`.
+def encode_env(env, out=None):
+    if out is None:
+        out = new_buffer(env.num_envs)
+    rows = np.arange(env.num_envs)
+    return encode_batch(out, env.hands[rows, env.player], env.played, env.trick, env.player,
+                        env.trump, env.lead_suit, env.bidder, env.scores)
+
+
+# Mask of cards no longer in any hand: played in earlier tricks or in the current one.
+def played_mask(players_hands):
+    return engine.FULL_DECK & ~(players_hands[0] | players_hands[1] | players_hands[2] | players_hands[3])
+
+
+# Packs (M, STATE_SIZE) states into (M, PACKED_SIZE) bits and (M, 2) uint8 points.
+def pack_states(states, bits_out=None, scores_out=None):
+    states = np.asarray(states).reshape(-1, STATE_SIZE)
+    bits = np.packbits(states[:, :BINARY_SIZE] > 0, axis=1, bitorder="little")
+    scores = np.rint(states[:, SCORES] * MAX_POINTS).astype(np.uint8)
+    if bits_out is None:
+        return bits, scores
+    bits_out[:] = bits
+    scores_out[:] = scores
+    return bits_out, scores_out
+
+
+# Inverse of `pack_states`, writing into `out` (M, STATE_SIZE) if given.
+def unpack_states(bits, scores, out=None):
+    if out is None:
+        out = new_buffer(len(bits))
+    out[:, :BINARY_SIZE] = np.unpackbits(bits, axis=1, count=BINARY_SIZE, bitorder="little")
+    np.divide(scores, MAX_POINTS, out=out[:, SCORES], casting="unsafe")
+    return out
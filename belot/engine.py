@@ -0,0 +1,337 @@
+"""
+Integer/bitmask card engine for Belot.
+
+A card is an int 0..31 laid out exactly like `generate_deck()` in the scripts:
+`card = suit * 8 + rank`, so `card % 8` is the rank and `card // 8` the suit
+(the same convention `Belot v1.py` uses for card IDs). A hand is a 32-bit mask
+with bit `card` set for every card held, which makes following suit a single
+AND with `SUIT_MASKS[suit]`.
+
+All per-card lookups (points, trick-taking strength, higher trumps) are
+precomputed tables, and strings only appear at the display edge through
+`card_name` / `mask_to_names`.
+"""
+
+import random
+from collections import namedtuple
+
+import numpy as np
+
+
+# Deck and Point Definitions
+RANKS = ("7", "8", "9", "10", "J", "Q", "K", "A")
+SUITS = ("hearts", "diamonds", "clubs", "spades")
+TRUMP_POINTS = {"J": 20, "9": 14, "A": 11, "10": 10, "K": 4, "Q": 3, "8": 0, "7": 0}
+NON_TRUMP_POINTS = {"A": 11, "10": 10, "K": 4, "Q": 3, "J": 2, "9": 0, "8": 0, "7": 0}
+
+# Trick-taking order of the ranks, weakest first
+TRUMP_ORDER = ("7", "8", "Q", "K", "10", "A", "9", "J")
+NON_TRUMP_ORDER = ("7", "8", "9", "J", "Q", "K", "10", "A")
+
+NUM_CARDS = 32
+NUM_PLAYERS = 4
+NUM_TRICKS = 8
+FULL_DECK = (1 << NUM_CARDS) - 1
+NO_SUIT = -1
+
+# Per-card tables
+CARD_RANK = tuple(card & 7 for card in range(NUM_CARDS))
+CARD_SUIT = tuple(card >> 3 for card in range(NUM_CARDS))
+CARD_BIT = tuple(1 << card for card in range(NUM_CARDS))
+CARD_NAMES = tuple(f"{rank} of {suit}" for suit in SUITS for rank in RANKS)
+CARD_IDS = {name: card for card, name in enumerate(CARD_NAMES)}
+SUIT_IDS = {suit: index for index, suit in enumerate(SUITS)}
+SUIT_MASKS = tuple(0xFF << (8 * suit) for suit in range(4))
+
+TRUMP_CARD_POINTS = tuple(TRUMP_POINTS[RANKS[CARD_RANK[card]]] for card in range(NUM_CARDS))
+NON_TRUMP_CARD_POINTS = tuple(NON_TRUMP_POINTS[RANKS[CARD_RANK[card]]] for card in range(NUM_CARDS))
+TRUMP_STRENGTH = tuple(TRUMP_ORDER.index(RANKS[CARD_RANK[card]]) for card in range(NUM_CARDS))
+NON_TRUMP_STRENGTH = tuple(NON_TRUMP_ORDER.index(RANKS[CARD_RANK[card]]) for card in range(NUM_CARDS))
+
+# CARD_POINTS[trump][card]: points of a card once the trump suit is known
+CARD_POINTS = tuple(
+    tuple(TRUMP_CARD_POINTS[card] if CARD_SUIT[card] == trump else NON_TRUMP_CARD_POINTS[card]
+          for card in range(NUM_CARDS))
+    for trump in range(4)
+)
+# Card points in a deal whatever the trump (no last-trick or declaration points)
+DEAL_POINTS = sum(CARD_POINTS[0])
+
+# HIGHER_TRUMPS[card]: cards of the same suit that beat `card` when that suit is trump
+HIGHER_TRUMPS = tuple(
+    sum(CARD_BIT[other] for other in range(NUM_CARDS)
+        if CARD_SUIT[other] == CARD_SUIT[card] and TRUMP_STRENGTH[other] > TRUMP_STRENGTH[card])
+    for card in range(NUM_CARDS)
+)
+
+# WIN_KEY[trump][lead][card]: trick-taking key; trumps beat the lead suit, other suits never win
+WIN_KEY = tuple(
+    tuple(
+        tuple(8 + TRUMP_STRENGTH[card] if CARD_SUIT[card] == trump
+              else NON_TRUMP_STRENGTH[card] if CARD_SUIT[card] == lead
+              else -1
+              for card in range(NUM_CARDS))
+        for lead in range(4)
+    )
+    for trump in range(4)
+)
+
+# TSAKANE_MASK[trump][win_card]: trumps a player must choose from when forced to trump over `win_card`.
+# Over a winning trump only higher trumps qualify; over any other card every trump does.
+TSAKANE_MASK = tuple(
+    tuple(HIGHER_TRUMPS[card] if CARD_SUIT[card] == trump else SUIT_MASKS[trump]
+          for card in range(NUM_CARDS))
+    for trump in range(4)
+)
+
+# Cards held in each possible 8-bit suit slice, used to unpack masks quickly
+_BYTE_CARDS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+_BYTE_COUNT = tuple(len(bits) for bits in _BYTE_CARDS)
+_WORD_BITS = ((np.arange(1 << 16)[:, None] >> np.arange(16)) & 1).astype(bool)
+
+# Seats that play after each possible leader, in order
+_FOLLOWERS = tuple(tuple((leader + k) & 3 for k in range(1, 4)) for leader in range(4))
+
+
+# One played trick: who led, the cards in play order and the winning seat
+Trick = namedtuple("Trick", ["leader", "cards", "winner", "points"])
+
+# Outcome of a full deal; `deck` is the shuffled deck the hands were dealt from
+GameResult = namedtuple("GameResult", ["bidder", "trump", "scores", "tricks", "deck"])
+
+
+class DealInfo:
+    """
+    Public facts about the deal in play that a select callback is not passed:
+    the bidder and each team's card points from finished tricks. `play_deal`
+    keeps the one it is given up to date. Both are None before the first deal.
+    """
+
+    __slots__ = ("bidder", "scores")
+
+    def __init__(self, bidder=None, scores=None):
+        self.bidder = bidder
+        self.scores = scores
+
+
+# Conversions (display edge only)
+def card_id(name):
+    return CARD_IDS[name]
+
+
+def card_name(card):
+    return CARD_NAMES[card]
+
+
+def cards_to_mask(cards):
+    mask = 0
+    for card in cards:
+        mask |= CARD_BIT[card]
+    return mask
+
+
+# Unpacks a hand mask into a list of card ids in ascending order.
+def mask_to_cards(mask):
+    cards = []
+    for suit in range(4):
+        byte = (mask >> (8 * suit)) & 0xFF
+        if byte:
+            base = 8 * suit
+            cards.extend(base + bit for bit in _BYTE_CARDS[byte])
+    return cards
+
+
+def mask_to_names(mask):
+    return [CARD_NAMES[card] for card in mask_to_cards(mask)]
+
+
+# Creates a complete deck of card ids in `generate_deck()` order.
+def generate_deck():
+    return list(range(NUM_CARDS))
+
+
+# Distributes the first 5 cards of a shuffled deck to each of the 4 players as hand masks.
+def generate_initial_hands(deck):
+    hands = [cards_to_mask(deck[i * 5:(i + 1) * 5]) for i in range(4)]
+    return hands, deck[20:]
+
+
+# Deals 3 more cards to each player from the remaining deck.
+def deal_additional_cards(players_hands, deck):
+    for i in range(4):
+        players_hands[i] |= cards_to_mask(deck[i * 3:(i + 1) * 3])
+    return deck[12:]
+
+
+# Determines the point value of a card based on whether it is a trump card.
+def get_card_points(card, is_trump):
+    return TRUMP_CARD_POINTS[card] if is_trump else NON_TRUMP_CARD_POINTS[card]
+
+
+def trick_points(trick, trump_suit):
+    points = CARD_POINTS[trump_suit]
+    return sum(points[card] for card in trick)
+
+
+# Index into `trick` of the card currently winning it.
+def trick_winner(trick, lead_suit, trump_suit):
+    keys = WIN_KEY[trump_suit][lead_suit]
+    best = 0
+    for i in range(1, len(trick)):
+        if keys[trick[i]] > keys[trick[best]]:
+            best = i
+    return best
+
+
+# Determines which card wins the trick based on the lead suit and trump suit.
+def determine_winning_card(trick, lead_suit, trump_suit):
+    return trick[trick_winner(trick, lead_suit, trump_suit)]
+
+
+# Returns the k-th lowest card (0-based) held in `mask`.
+def nth_card(mask, k):
+    for base in (0, 8, 16, 24):
+        byte = (mask >> base) & 0xFF
+        count = _BYTE_COUNT[byte]
+        if k < count:
+            return base + _BYTE_CARDS[byte][k]
+        k -= count
+    raise IndexError("mask has fewer than k + 1 cards")
+
+
+# Draws a uniformly random card from `mask` without unpacking it into a list.
+def random_card(mask, rng=random):
+    if mask & (mask - 1) == 0:
+        return mask.bit_length() - 1
+    return nth_card(mask, int(rng.random() * mask.bit_count()))
+
+
+# Legal moves
+# Players follow the lead suit if possible. A player who cannot follow while the opponents
+# are winning must play a trump ("Tsakane"), over-trumping the highest trump in the trick
+# when able; otherwise any card may be played.
+# `win_card` is the card currently winning the trick, and `partner_winning` says whether it
+# belongs to the player's partner. Only table lookups, no iteration over the hand.
+def legal_mask(hand, lead_suit, trump_suit, win_card, partner_winning):
+    if lead_suit == NO_SUIT:
+        return hand
+    valid = hand & SUIT_MASKS[lead_suit]
+    if valid or partner_winning:
+        return valid or hand
+    trumps = hand & SUIT_MASKS[trump_suit]
+    if not trumps:
+        return hand
+    return trumps & TSAKANE_MASK[trump_suit][win_card] or trumps
+
+
+# Legal moves for the next player given the trick so far (cards in play order).
+def legal_moves(hand, trick, lead_suit, trump_suit):
+    if not trick:
+        return hand
+    win = trick_winner(trick, lead_suit, trump_suit)
+    # The partner played two positions before the current player
+    return legal_mask(hand, lead_suit, trump_suit, trick[win], (len(trick) - win) & 1 == 0)
+
+
+# 32-dim boolean action mask of a hand or legal-move mask.
+# With `out` (any writable 32-slot array) the bits are written in place without allocating.
+def action_mask(mask, out=None):
+    if out is None:
+        return _WORD_BITS[[mask & 0xFFFF, mask >> 16]].reshape(NUM_CARDS)
+    out[0:16] = _WORD_BITS[mask & 0xFFFF]
+    out[16:32] = _WORD_BITS[mask >> 16]
+    return out
+
+
+# Play a single trick
+# Each seat plays one card starting from `leader`, choosing among `legal_mask` moves.
+# `select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit)` returns the card to play.
+def play_trick(players_hands, trump_suit, leader=0, select=None, rng=random):
+    # Lead: any card
+    hand = players_hands[leader]
+    if select is None:
+        card = random_card(hand, rng)
+    else:
+        card = select(hand, leader, players_hands, [], trump_suit, NO_SUIT)
+    trick = [card]
+    players_hands[leader] = hand & ~CARD_BIT[card]
+
+    lead_suit = CARD_SUIT[card]
+    keys = WIN_KEY[trump_suit][lead_suit]
+    win_seat = leader
+    win_card = card
+
+    for seat in _FOLLOWERS[leader]:
+        hand = players_hands[seat]
+        valid = legal_mask(hand, lead_suit, trump_suit, win_card, not (seat ^ win_seat) & 1)
+
+        if select is not None:
+            card = select(valid, seat, players_hands, trick, trump_suit, lead_suit)
+        elif valid & (valid - 1):
+            card = nth_card(valid, int(rng.random() * valid.bit_count()))
+        else:
+            card = valid.bit_length() - 1
+        trick.append(card)
+        players_hands[seat] = hand & ~CARD_BIT[card]
+
+        if keys[card] > keys[win_card]:
+            win_card = card
+            win_seat = seat
+
+    return win_seat, trick
+
+
+# Simulates the bidding phase where players decide on the trump suit or pass.
+# Returns the winning seat and trump suit index, or (None, None) if everyone passed.
+def bidding_phase(rng=random):
+    current_bid = None
+    winner = None
+
+    for i in range(4):
+        player_bid = rng.randint(0, len(SUITS)) - 1  # -1 is "pass"
+        if player_bid != NO_SUIT and player_bid != current_bid:
+            current_bid = player_bid
+            winner = i
+
+    return winner, current_bid
+
+
+# Full game simulation without any output.
+# The deal is thrown in and redealt if every player passes. Player 0 leads the
+# first trick and each trick's winner leads the next one.
+def play_game(rng=random, select=None, info=None):
+    while True:
+        deck = generate_deck()
+        rng.shuffle(deck)
+        bidder, trump_suit = bidding_phase(rng)
+        if bidder is not None:
+            break
+
+    return play_deal(deck, bidder, trump_suit, rng, select, info)
+
+
+# Plays out a deal from a shuffled deck once the bid is settled: the 5 + 3 deal of
+# `generate_initial_hands` / `deal_additional_cards`, then eight tricks led first by player 0.
+# `info`, a `DealInfo` shared with the select callback, is given the bidder and the running scores.
+# `on_trick(trick_number, trick)`, if given, is called with each finished `Trick`.
+def play_deal(deck, bidder, trump_suit, rng=random, select=None, info=None, on_trick=None):
+    players_hands, remaining_deck = generate_initial_hands(deck)
+    deal_additional_cards(players_hands, remaining_deck)
+
+    scores = [0, 0]
+    if info is not None:
+        info.bidder = bidder
+        info.scores = scores
+    tricks = []
+    leader = 0
+    points = CARD_POINTS[trump_suit]
+    for trick_number in range(NUM_TRICKS):
+        winner, trick = play_trick(players_hands, trump_suit, leader, select, rng)
+        trick_total = sum(points[card] for card in trick)
+        scores[winner & 1] += trick_total
+        tricks.append(Trick(leader, trick, winner, trick_total))
+        if on_trick is not None:
+            on_trick(trick_number, tricks[-1])
+        leader = winner
+
+    return GameResult(bidder, trump_suit, scores, tricks, deck)
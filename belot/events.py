@@ -0,0 +1,179 @@
+"""
+Event-stream game API.
+
+`play_game` plays a deal like `engine.play_game` and reports what happens
+as small typed events sent to the handlers subscribed on an `EventBus`:
+
+    Deal          the shuffled deck and the 5-card hands, before bidding
+    Bid           the winning bidder and trump (bidder None: everyone passed, the deal is redealt)
+    HandsComplete the 8-card hands after `deal_additional_cards`
+    CardPlayed    one card, as it is played
+    TrickWon      a finished trick, its winner and points
+    Score         the final team scores
+
+Events carry card ids and hand masks only; turning them into text is left
+to consumers such as `TextLogger`. An event is only built when something
+subscribed to its type, and with an empty bus `play_game` simply runs
+`engine.play_game`.
+
+    bus = EventBus()
+    bus.subscribe(TrickWon, lambda event: ...)
+    TextLogger().attach(bus)
+    result = play_game(rng, select, bus)
+"""
+
+import itertools
+import random
+import sys
+from collections import namedtuple
+
+from belot import engine
+
+
+Deal = namedtuple("Deal", ["deck", "hands"])
+Bid = namedtuple("Bid", ["bidder", "trump"])
+HandsComplete = namedtuple("HandsComplete", ["hands"])
+CardPlayed = namedtuple("CardPlayed", ["trick_number", "seat", "card"])
+TrickWon = namedtuple("TrickWon", ["trick_number", "leader", "cards", "winner", "points"])
+Score = namedtuple("Score", ["bidder", "trump", "scores"])
+
+EVENT_TYPES = (Deal, Bid, HandsComplete, CardPlayed, TrickWon, Score)
+
+
+class EventBus:
+    """Handlers by event type. A bus with no handlers is falsy."""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def subscribe(self, event_type, handler):
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        handlers = self.handlers.get(event_type, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self.handlers.pop(event_type, None)
+
+    def wants(self, event_type):
+        return event_type in self.handlers
+
+    def emit(self, event):
+        for handler in self.handlers.get(type(event), ()):
+            handler(event)
+
+    def __bool__(self):
+        return bool(self.handlers)
+
+
+# Full game with events. Draws from `rng` exactly like `engine.play_game`, so the same seed plays the same game.
+def play_game(rng=random, select=None, bus=None, info=None):
+    if not bus:
+        return engine.play_game(rng, select, info)
+
+    while True:
+        deck = engine.generate_deck()
+        rng.shuffle(deck)
+        if bus.wants(Deal):
+            players_hands, _ = engine.generate_initial_hands(deck)
+            bus.emit(Deal(tuple(deck), tuple(players_hands)))
+        bidder, trump_suit = engine.bidding_phase(rng)
+        if bus.wants(Bid):
+            bus.emit(Bid(bidder, trump_suit))
+        if bidder is not None:
+            break
+
+    return play_deal(deck, bidder, trump_suit, rng, select, bus, info)
+
+
+# `engine.play_deal` with events: cards are reported from the select callback and tricks
+# from the deal's `on_trick` hook.
+def play_deal(deck, bidder, trump_suit, rng=random, select=None, bus=None, info=None):
+    if not bus:
+        return engine.play_deal(deck, bidder, trump_suit, rng, select, info)
+
+    if bus.wants(HandsComplete):
+        players_hands, remaining_deck = engine.generate_initial_hands(deck)
+        engine.deal_additional_cards(players_hands, remaining_deck)
+        bus.emit(HandsComplete(tuple(players_hands)))
+
+    if bus.wants(CardPlayed):
+        choose = select
+        cards_played = itertools.count()
+
+        def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+            if choose is None:
+                card = engine.random_card(valid_mask, rng)
+            else:
+                card = choose(valid_mask, seat, players_hands, trick, trump_suit, lead_suit)
+            bus.emit(CardPlayed(next(cards_played) // engine.NUM_PLAYERS, seat, card))
+            return card
+
+    on_trick = None
+    if bus.wants(TrickWon):
+        def on_trick(trick_number, trick):
+            bus.emit(TrickWon(trick_number, trick.leader, tuple(trick.cards), trick.winner, trick.points))
+
+    result = engine.play_deal(deck, bidder, trump_suit, rng, select, info, on_trick)
+    if bus.wants(Score):
+        bus.emit(Score(bidder, trump_suit, tuple(result.scores)))
+    return result
+
+
+class EventLog:
+    """Collects every event of the given types (all of them by default) in `events`."""
+
+    def __init__(self, event_types=EVENT_TYPES):
+        self.event_types = event_types
+        self.events = []
+
+    def attach(self, bus):
+        for event_type in self.event_types:
+            bus.subscribe(event_type, self.events.append)
+        return self
+
+
+class TextLogger:
+    """Prints a game the way `Belot v3.py` always has."""
+
+    def __init__(self, file=None):
+        self.file = file
+
+    def attach(self, bus):
+        bus.subscribe(Deal, self.on_deal)
+        bus.subscribe(Bid, self.on_bid)
+        bus.subscribe(HandsComplete, self.on_hands_complete)
+        bus.subscribe(TrickWon, self.on_trick_won)
+        bus.subscribe(Score, self.on_score)
+        return self
+
+    def _print(self, *args):
+        print(*args, file=self.file or sys.stdout)
+
+    def _print_hands(self, hands):
+        for i, hand in enumerate(hands):
+            self._print(f"Player {i + 1}: {engine.mask_to_names(hand)}")
+
+    def on_deal(self, event):
+        self._print("Initial Hands:")
+        self._print_hands(event.hands)
+
+    def on_bid(self, event):
+        if event.bidder is None:
+            self._print("\nAll players passed, redealing\n")
+        else:
+            self._print(f"\nPlayer {event.bidder + 1} won the bid with trump suit: {engine.SUITS[event.trump]}")
+
+    def on_hands_complete(self, event):
+        self._print("\nHands after receiving additional cards:")
+        self._print_hands(event.hands)
+
+    def on_trick_won(self, event):
+        self._print(f"\nTrick {event.trick_number + 1}: {[engine.card_name(card) for card in event.cards]}")
+        self._print(f"Player {event.winner + 1} won the trick and earned {event.points} points")
+
+    def on_score(self, event):
+        self._print("\nFinal Scores:")
+        self._print(f"Team 1 (Players 1 & 3): {event.scores[0]} points")
+        self._print(f"Team 2 (Players 2 & 4): {event.scores[1]} points")
@@ -0,0 +1,216 @@
+"""
+Long-lived policies and a batching inference broker.
+
+A policy maps a batch of encoded states (see `belot.encoding`) and their
+32-slot legal-card masks to one card id per row:
+
+    actions = policy.act_batch(states, masks)
+
+`InferenceBroker` lets many concurrent games (threads or asyncio tasks)
+share one policy. Each game submits a single state and mask; a background
+thread gathers requests until `max_batch` are waiting or the oldest one has
+waited `max_latency` seconds, evaluates them in one `act_batch` call and
+hands every game its card back.
+
+    with InferenceBroker(RandomPolicy(seed=0), max_batch=256) as broker:
+        info = engine.DealInfo()
+        select = broker_select(broker, info)
+        results = [engine.play_game(rng, select, info) for ...]  # from many threads
+        print(broker.stats())
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from belot import encoding, engine
+
+
+class RandomPolicy:
+    """
+    Uniformly random legal card, evaluated for a whole batch at once.
+    Stands in for a trained policy until one is loaded.
+    """
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def act_batch(self, states, masks):
+        return np.argmax(self.rng.random(masks.shape) * masks, axis=1)
+
+
+class InferenceBroker:
+    """
+    Collects single-state requests from many games into batched policy calls.
+
+    Requests are answered through `concurrent.futures.Future` objects, so
+    threads can block on `act` and coroutines can await `act_async`. Once
+    closed, the broker refuses new requests with RuntimeError; requests it
+    never evaluated fail with RuntimeError too.
+    """
+
+    def __init__(self, policy, max_batch=256, max_latency=0.002, latency_window=10000):
+        self.policy = policy
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._states = encoding.new_buffer(max_batch)
+        self._masks = np.zeros((max_batch, engine.NUM_CARDS), dtype=bool)
+        self._thread = None
+
+        # Statistics
+        self._batches = 0
+        self._requests = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._eval_time = 0.0
+
+    def start(self):
+        if self._closed:
+            raise RuntimeError("inference broker is closed")
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="inference-broker", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        # Requests left in the queue (the broker was never started) would otherwise wait forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[2].set_exception(RuntimeError("inference broker closed before evaluating the request"))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Queues one state and its legal mask; the returned future resolves to a card id.
+    # The arrays are copied when the batch is assembled, so keep them unchanged until then.
+    def submit(self, state, mask):
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("inference broker is closed")
+            self._queue.put((state, mask, future, time.perf_counter()))
+        return future
+
+    def act(self, state, mask):
+        return self.submit(state, mask).result()
+
+    async def act_async(self, state, mask):
+        return await asyncio.wrap_future(self.submit(state, mask))
+
+    def _run(self):
+        running = True
+        while running:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = first[3] + self.max_latency
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+            self._evaluate(batch)
+
+    def _evaluate(self, batch):
+        n = len(batch)
+        started = time.perf_counter()
+        for i, (state, mask, _, submitted) in enumerate(batch):
+            self._states[i] = state
+            self._masks[i] = mask
+            self._latencies.append(started - submitted)
+
+        try:
+            actions = self.policy.act_batch(self._states[:n], self._masks[:n])
+        except Exception as exc:
+            for _, _, future, _ in batch:
+                future.set_exception(exc)
+        else:
+            for (_, _, future, _), action in zip(batch, actions):
+                future.set_result(int(action))
+
+        self._eval_time += time.perf_counter() - started
+        self._batches += 1
+        self._requests += n
+
+    # Batch-fill and queue-latency statistics since the broker was created.
+    def stats(self):
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+        batches = max(self._batches, 1)
+        return {
+            "requests": self._requests,
+            "batches": self._batches,
+            "mean_batch_size": self._requests / batches,
+            "batch_fill": self._requests / (batches * self.max_batch),
+            "queue_latency_mean_ms": float(latencies.mean() * 1e3),
+            "queue_latency_p50_ms": float(np.percentile(latencies, 50) * 1e3),
+            "queue_latency_p99_ms": float(np.percentile(latencies, 99) * 1e3),
+            "eval_time_sec": self._eval_time,
+        }
+
+
+# Card-selection callback for `engine.play_trick` / `engine.play_game` that asks the broker.
+# Each callback owns its state row, so use one per concurrently running game. With an `engine.DealInfo`
+# passed to the game too, the bidder and scores are encoded as well.
+def broker_select(broker, info=None):
+    state = encoding.new_buffer()
+    mask = np.zeros(engine.NUM_CARDS, dtype=bool)
+    info = engine.DealInfo() if info is None else info
+
+    def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+        if valid_mask & (valid_mask - 1) == 0:
+            return valid_mask.bit_length() - 1  # forced move, no need to ask the policy
+        leader = (seat - len(trick)) & 3
+        encoding.encode_state(state, players_hands[seat], encoding.played_mask(players_hands),
+                              trick, leader, seat, trump_suit, lead_suit, info.bidder, info.scores)
+        engine.action_mask(valid_mask, mask)
+        return broker.act(state, mask)
+
+    return select
+
+
+# Card-selection callback that evaluates `policy` directly, one state at a time, without a broker.
+# `info` is used as in `broker_select`.
+def policy_select(policy, info=None):
+    state = encoding.new_buffer(1)
+    mask = np.zeros((1, engine.NUM_CARDS), dtype=bool)
+    info = engine.DealInfo() if info is None else info
+
+    def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+        if valid_mask & (valid_mask - 1) == 0:
+            return valid_mask.bit_length() - 1
+        leader = (seat - len(trick)) & 3
+        encoding.encode_state(state[0], players_hands[seat], encoding.played_mask(players_hands),
+                              trick, leader, seat, trump_suit, lead_suit, info.bidder, info.scores)
+        engine.action_mask(valid_mask, mask[0])
+        return int(policy.act_batch(state, mask)[0])
+
+    return select
@@ -0,0 +1,287 @@
+"""
+Per-phase timers and counters for the engine hot paths.
+
+Instrumentation works by swapping module attributes: `enable()` replaces
+`engine.play_game`, `play_trick`, `legal_mask`, `bidding_phase`, the dealing
+functions and `encoding.encode_state` with timed wrappers, and `disable()`
+puts the originals back. The engine calls these through its module globals,
+so nothing in the hot path checks a flag and a disabled run costs nothing.
+Modules that took their own reference (`from belot.engine import
+legal_mask`, as `belot.solver` does) are patched too, if they are imported
+before `enable()`.
+
+Recorded per process in `STATS`:
+
+- wall time and call count per phase (times are inclusive: `play_trick`
+  contains the `legal_mask` and `select` calls made while it runs);
+- `select`: time spent in the card-selection callback passed to `play_trick`
+  (e.g. `select_card_with_rl`);
+- events: `tsakane` (a player void in the lead suit is forced to trump) and
+  `tsakane_overtrump` (forced to beat a trump already in the trick).
+
+Snapshots are plain dicts, so workers can send them back to the parent and
+`merge` adds them up:
+
+    instrument.enable()
+    engine.play_game()
+    print(instrument.format_table(instrument.snapshot()))
+
+`profile(games)` additionally runs cProfile, and optionally tracemalloc, for
+the next `games` calls to `play_game`; the report lands in the snapshot.
+"""
+
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+from belot import encoding, engine
+from belot.engine import NO_SUIT, SUIT_MASKS
+
+
+# Phase name for every wrapped function, as (module, attribute)
+PHASES = {
+    (engine, "play_game"): "play_game",
+    (engine, "generate_deck"): "generate_deck",
+    (engine, "generate_initial_hands"): "generate_initial_hands",
+    (engine, "deal_additional_cards"): "deal_additional_cards",
+    (engine, "bidding_phase"): "bidding_phase",
+    (engine, "play_trick"): "play_trick",
+    (engine, "legal_mask"): "legal_mask",
+    (encoding, "encode_state"): "encode_state",
+}
+
+
+class Stats:
+    """
+    Per-process accumulator: `phases` maps a phase to [calls, nanoseconds],
+    `events` maps an event name to its count.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.phases = {}
+        self.events = {}
+        self.profiles = []
+
+    def add(self, phase, elapsed_ns, calls=1):
+        entry = self.phases.get(phase)
+        if entry is None:
+            self.phases[phase] = [calls, elapsed_ns]
+        else:
+            entry[0] += calls
+            entry[1] += elapsed_ns
+
+    def count(self, event, n=1):
+        self.events[event] = self.events.get(event, 0) + n
+
+
+STATS = Stats()
+_originals = {}
+_profiler = None
+
+
+def enabled():
+    return bool(_originals)
+
+
+# Wraps `func` so every call adds its wall time to `phase`.
+def timed(phase, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            STATS.add(phase, time.perf_counter_ns() - start)
+    return wrapper
+
+
+@contextlib.contextmanager
+def phase(name):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        STATS.add(name, time.perf_counter_ns() - start)
+
+
+def count(event, n=1):
+    STATS.count(event, n)
+
+
+def _legal_mask_wrapper(func):
+    wrapped = timed("legal_mask", func)
+
+    def legal_mask(hand, lead_suit, trump_suit, win_card, partner_winning):
+        valid = wrapped(hand, lead_suit, trump_suit, win_card, partner_winning)
+        if (lead_suit != NO_SUIT and not partner_winning and not hand & SUIT_MASKS[lead_suit]
+                and hand & SUIT_MASKS[trump_suit]):
+            STATS.count("tsakane")
+            if engine.CARD_SUIT[win_card] == trump_suit and valid & engine.HIGHER_TRUMPS[win_card]:
+                STATS.count("tsakane_overtrump")
+        return valid
+    return functools.wraps(func)(legal_mask)
+
+
+def _play_trick_wrapper(func):
+    wrapped = timed("play_trick", func)
+
+    def play_trick(players_hands, trump_suit, leader=0, select=None, rng=engine.random):
+        if select is not None:
+            select = timed("select", select)
+        return wrapped(players_hands, trump_suit, leader, select, rng)
+    return functools.wraps(func)(play_trick)
+
+
+def _play_game_wrapper(func):
+    wrapped = timed("play_game", func)
+
+    def play_game(*args, **kwargs):
+        result = wrapped(*args, **kwargs)
+        STATS.count("games")
+        if _profiler is not None:
+            _profiler.game_finished()
+        return result
+    return functools.wraps(func)(play_game)
+
+
+_WRAPPERS = {"legal_mask": _legal_mask_wrapper, "play_trick": _play_trick_wrapper, "play_game": _play_game_wrapper}
+
+
+# Loaded belot modules other than `module` holding their own reference to `func` under `name`.
+def _aliases(module, name, func):
+    for other in list(sys.modules.values()):
+        if (other is not module and getattr(other, "__name__", "").startswith("belot.")
+                and vars(other).get(name) is func):
+            yield other
+
+
+# Installs the timed wrappers. Calling it again is a no-op.
+def enable():
+    if _originals:
+        return
+    for (module, name), phase_name in PHASES.items():
+        func = getattr(module, name)
+        make = _WRAPPERS.get(name)
+        wrapper = make(func) if make else timed(phase_name, func)
+        for target in [module, *_aliases(module, name, func)]:
+            _originals[target, name] = func
+            setattr(target, name, wrapper)
+
+
+def disable():
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+        _profiler = None
+    for (module, name), func in _originals.items():
+        setattr(module, name, func)
+    _originals.clear()
+
+
+@contextlib.contextmanager
+def instrumented(reset=True):
+    was_enabled = enabled()
+    if reset:
+        STATS.reset()
+    enable()
+    try:
+        yield STATS
+    finally:
+        if not was_enabled:
+            disable()
+
+
+class _Profiler:
+    """cProfile (and optionally tracemalloc) over the next `games` games."""
+
+    def __init__(self, games, memory=False, top=25):
+        self.remaining = games
+        self.games = games
+        self.memory = memory
+        self.top = top
+        self.profile = cProfile.Profile()
+        if memory:
+            tracemalloc.start()
+        self.profile.enable()
+
+    def game_finished(self):
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.stop()
+
+    def stop(self):
+        global _profiler
+        if self.profile is None:
+            return
+        self.profile.disable()
+        text = io.StringIO()
+        pstats.Stats(self.profile, stream=text).sort_stats("cumulative").print_stats(self.top)
+        report = {"pid": os.getpid(), "games": self.games - max(self.remaining, 0), "cprofile": text.getvalue()}
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            report["tracemalloc"] = [str(stat) for stat in snapshot.statistics("lineno")[:self.top]]
+        STATS.profiles.append(report)
+        self.profile = None
+        if _profiler is self:
+            _profiler = None
+
+
+# Profiles the next `games` calls to `play_game` (enables instrumentation if needed).
+def profile(games, memory=False, top=25):
+    global _profiler
+    enable()
+    if _profiler is not None:
+        _profiler.stop()
+    _profiler = _Profiler(games, memory, top)
+
+
+def snapshot():
+    return {
+        "pid": os.getpid(),
+        "phases": {name: {"calls": calls, "seconds": ns / 1e9} for name, (calls, ns) in STATS.phases.items()},
+        "events": dict(STATS.events),
+        "profiles": list(STATS.profiles),
+    }
+
+
+# Adds up snapshots from several processes.
+def merge(snapshots):
+    merged = {"pids": [], "phases": {}, "events": {}, "profiles": []}
+    for snap in snapshots:
+        merged["pids"].extend(snap.get("pids", [snap.get("pid")]))
+        for name, entry in snap["phases"].items():
+            total = merged["phases"].setdefault(name, {"calls": 0, "seconds": 0.0})
+            total["calls"] += entry["calls"]
+            total["seconds"] += entry["seconds"]
+        for name, n in snap["events"].items():
+            merged["events"][name] = merged["events"].get(name, 0) + n
+        merged["profiles"].extend(snap["profiles"])
+    return merged
+
+
+def to_json(snap, **kwargs):
+    return json.dumps(snap, **kwargs)
+
+
+def format_table(snap):
+    games = snap["events"].get("games", 0)
+    lines = [f"{'phase':24s} {'calls':>12s} {'total s':>10s} {'mean us':>10s} {'us/game':>10s}"]
+    for name, entry in sorted(snap["phases"].items(), key=lambda item: -item[1]["seconds"]):
+        calls, seconds = entry["calls"], entry["seconds"]
+        per_game = f"{seconds / games * 1e6:10.1f}" if games else f"{'':10s}"
+        lines.append(f"{name:24s} {calls:12d} {seconds:10.3f} {seconds / max(calls, 1) * 1e6:10.2f} {per_game}")
+    for name, n in sorted(snap["events"].items()):
+        per_game = f" ({n / games:.3f} per game)" if games and name != "games" else ""
+        lines.append(f"{name}: {n}{per_game}")
+    return "\n".join(lines)
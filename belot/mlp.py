@@ -0,0 +1,227 @@
+"""
+NumPy-only MLP policy runtime with memory-mapped weights.
+
+A weights file holds a plain feed-forward network (ReLU hidden layers, 32
+output logits, one per card slot) in a layout that can be memory-mapped
+as-is. Every process that loads it maps the same pages read-only, so
+workers start without reading or copying the weights and share them
+through the page cache.
+
+    file header   b"BELOTMLP", header length u32
+    header        JSON: input size and, per layer, the offset, shape and dtype of each array
+    arrays        raw little-endian data, each aligned to 64 bytes
+
+Weights are stored as float32, float16 or int8. Int8 weights carry one
+float32 scale per output unit (symmetric per-column quantization).
+Biases are always float32. Float32 weights are used in place. Float16 and
+int8 weights are widened one layer at a time during the forward pass into
+one scratch buffer, so nothing beyond one layer's float32 copy is kept per
+process. `MLP(path, widen=True)` instead widens them once at load, with the
+int8 scales folded in, trading the shared pages for a faster forward pass.
+
+    save_weights("policy.bin", layers, dtype="int8")
+    policy = MLPPolicy("policy.bin")
+    actions = policy.act_batch(states, masks)   # same interface as RandomPolicy
+
+`MLPAgent` wraps a policy in the `select_action(state, valid_cards)`
+interface of the agent behind `select_card_with_rl` in `Belot v3.py`.
+"""
+
+import json
+import struct
+
+import numpy as np
+
+from belot import encoding, engine
+
+
+MAGIC = b"BELOTMLP"
+FILE_HEADER = struct.Struct("<8sI")
+ALIGN = 64
+WEIGHT_DTYPES = ("float32", "float16", "int8")
+
+
+# Random (weight, bias) layers for `sizes` = [input, hidden..., output], He-initialized.
+def init_layers(sizes, seed=None):
+    rng = np.random.default_rng(seed)
+    return [(rng.normal(0, np.sqrt(2 / n_in), (n_in, n_out)).astype(np.float32), np.zeros(n_out, dtype=np.float32))
+            for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+
+
+# Int8 weights and per-column scales with weight ~= q * scale.
+def quantize_int8(weight):
+    scale = np.abs(weight).max(axis=0) / 127
+    scale[scale == 0] = 1
+    q = np.clip(np.rint(weight / scale), -127, 127).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+# Serializes `layers`, a list of (weight (in, out), bias (out,)) float arrays, storing weights as `dtype`.
+def weights_bytes(layers, dtype="float32"):
+    if dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"weight dtype must be one of {WEIGHT_DTYPES}, not {dtype!r}")
+
+    arrays = []
+    header = {"input_size": int(layers[0][0].shape[0]), "weight_dtype": dtype, "layers": []}
+    for weight, bias in layers:
+        weight = np.asarray(weight, dtype=np.float32)
+        entry = {}
+        if dtype == "int8":
+            weight, scale = quantize_int8(weight)
+            arrays.append(("scale", entry, scale))
+        else:
+            weight = weight.astype(dtype)
+        arrays.append(("weight", entry, weight))
+        arrays.append(("bias", entry, np.asarray(bias, dtype=np.float32)))
+        header["layers"].append(entry)
+
+    # Offsets are relative to the start of the data section, which follows the padded header
+    offset = 0
+    for name, entry, array in arrays:
+        entry[name] = {"offset": offset, "shape": list(array.shape), "dtype": array.dtype.str}
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b" " * (-(FILE_HEADER.size + len(header_bytes)) % ALIGN)
+
+    parts = [FILE_HEADER.pack(MAGIC, len(header_bytes)), header_bytes]
+    for name, entry, array in arrays:
+        data = np.ascontiguousarray(array).tobytes()
+        parts.append(data + b"\0" * (-len(data) % ALIGN))
+    return b"".join(parts)
+
+
+def save_weights(path, layers, dtype="float32"):
+    with open(path, "wb") as f:
+        f.write(weights_bytes(layers, dtype))
+
+
+class MLP:
+    """
+    Forward pass over memory-mapped weights. Intermediate activations live in
+    buffers reused between calls, grown to the largest batch seen. `version`
+    labels the weights (e.g. a `belot.pipeline` publication) for caches.
+    With `widen`, float16 and int8 weights get a private float32 copy at load.
+    """
+
+    def __init__(self, path=None, data=None, version=0, widen=False):
+        self.path = path
+        self.version = version
+        if data is None:
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            data = np.frombuffer(data, dtype=np.uint8)
+        magic, header_size = FILE_HEADER.unpack(data[:FILE_HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"{path or 'buffer'} is not a Belot MLP weights file")
+        header = json.loads(data[FILE_HEADER.size:FILE_HEADER.size + header_size].tobytes())
+        self._data = data[FILE_HEADER.size + header_size:]
+
+        self.input_size = header["input_size"]
+        self.weight_dtype = header["weight_dtype"]
+        self.layers = []
+        for entry in header["layers"]:
+            weight = self._array(entry["weight"])
+            bias = self._array(entry["bias"])
+            scale = self._array(entry["scale"]) if "scale" in entry else None
+            if widen and weight.dtype != np.float32:
+                weight = weight.astype(np.float32)
+                if scale is not None:
+                    weight *= scale
+                    scale = None
+            self.layers.append((weight, bias, scale))
+        self.output_size = self.layers[-1][0].shape[1]
+        self._buffers = []
+        # Room for the largest weight still to be widened during `forward`
+        narrow = [weight.size for weight, _, _ in self.layers if weight.dtype != np.float32]
+        self._scratch = np.empty(max(narrow, default=0), dtype=np.float32)
+
+    # Model over the bytes of a weights file (e.g. `weights_bytes` output), used in place.
+    @classmethod
+    def from_bytes(cls, data, version=0, widen=False):
+        return cls(data=data, version=version, widen=widen)
+
+    def _array(self, spec):
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        data = self._data[spec["offset"]:spec["offset"] + count * dtype.itemsize]
+        return np.frombuffer(data, dtype=dtype).reshape(spec["shape"])
+
+    def _activations(self, rows):
+        if not self._buffers or len(self._buffers[0]) < rows:
+            self._buffers = [np.empty((rows, weight.shape[1]), dtype=np.float32) for weight, _, _ in self.layers]
+        return [buffer[:rows] for buffer in self._buffers]
+
+    def num_parameters(self):
+        return sum(weight.size + bias.size for weight, bias, _ in self.layers)
+
+    # Logits for an (M, input_size) batch. The result is an internal buffer, overwritten by the next call.
+    def forward(self, states):
+        x = np.asarray(states, dtype=np.float32)
+        outputs = self._activations(len(x))
+        last = len(self.layers) - 1
+        for i, ((weight, bias, scale), out) in enumerate(zip(self.layers, outputs)):
+            if weight.dtype != np.float32:
+                wide = self._scratch[:weight.size].reshape(weight.shape)
+                np.copyto(wide, weight)
+                weight = wide
+            np.matmul(x, weight, out=out)
+            if scale is not None:
+                out *= scale
+            out += bias
+            if i < last:
+                np.maximum(out, 0, out=out)
+            x = out
+        return x
+
+
+class MLPPolicy:
+    """
+    `act_batch` policy over an `MLP`: illegal cards are masked out of the
+    logits, then the best card is taken (`temperature=0`) or one is sampled
+    from the softmax at `temperature`.
+    """
+
+    def __init__(self, model, temperature=0.0, seed=None):
+        self.model = MLP(model) if isinstance(model, str) else model
+        if self.model.input_size != encoding.STATE_SIZE or self.model.output_size != engine.NUM_CARDS:
+            raise ValueError(f"expected a {encoding.STATE_SIZE} -> {engine.NUM_CARDS} network, "
+                             f"got {self.model.input_size} -> {self.model.output_size}")
+        self.temperature = temperature
+        self.rng = np.random.default_rng(seed)
+
+    def act_batch(self, states, masks):
+        return self.choose(self.model.forward(states), masks)
+
+    # One card per row of (M, 32) `logits`, which are overwritten.
+    def choose(self, logits, masks):
+        masks = np.asarray(masks, dtype=bool)
+        np.copyto(logits, -np.inf, where=~masks)
+        if not self.temperature:
+            return np.argmax(logits, axis=1)
+
+        logits -= logits.max(axis=1, keepdims=True)
+        logits /= self.temperature
+        np.exp(logits, out=logits)
+        # Inverse-CDF sampling, one uniform draw per row
+        np.cumsum(logits, axis=1, out=logits)
+        draws = self.rng.random(len(logits)) * logits[:, -1]
+        return (logits <= draws[:, None]).sum(axis=1)
+
+
+class MLPAgent:
+    """
+    Single-decision adapter for `Belot v3.py`: `select_action(state, valid_cards)`
+    returns an index into `valid_cards`, like the `rl_agent()` placeholder.
+    """
+
+    def __init__(self, policy):
+        self.policy = MLPPolicy(policy) if isinstance(policy, str) else policy
+        self._mask = np.zeros((1, engine.NUM_CARDS), dtype=bool)
+
+    def select_action(self, state, valid_cards):
+        if len(valid_cards) == 1:
+            return 0
+        self._mask[:] = False
+        self._mask[0, valid_cards] = True
+        card = int(self.policy.act_batch(state[None], self._mask)[0])
+        return valid_cards.index(card)
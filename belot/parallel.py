@@ -0,0 +1,40 @@
+"""
+Chunked, reproducible work over worker processes.
+
+A run of `count` items (games, matches, duplicate pairs) is split into
+chunks, each paired with an independent child of one root
+`numpy.random.SeedSequence`. A chunk's RNG depends only on its position, so
+a run gives the same results whatever the number of workers.
+
+    root, tasks = make_tasks(10000, seed=1, chunk_size=1000)
+    for results in iter_results(tasks, workers=8, func=play_chunk):
+        ...
+"""
+
+import multiprocessing
+import random
+
+import numpy as np
+
+
+# Splits `count` items into chunks, each paired with an independent child seed.
+def make_tasks(count, seed=None, chunk_size=1000):
+    root = np.random.SeedSequence(seed)
+    sizes = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+    return root, list(zip(root.spawn(len(sizes)), sizes))
+
+
+# The `random.Random` a chunk plays with, seeded from its child seed.
+def chunk_rng(seed_seq):
+    return random.Random(int.from_bytes(seed_seq.generate_state(4).tobytes(), "little"))
+
+
+# Yields `func(task)` for every task in task order, over a pool when `workers` > 1.
+def iter_results(tasks, workers, func):
+    if workers <= 1:
+        for task in tasks:
+            yield func(task)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(func, tasks)
@@ -0,0 +1,322 @@
+"""
+Time-budgeted Monte Carlo determinization (PIMC) agent.
+
+At each decision the agent deals the cards it cannot see in many ways that
+agree with everything it has seen (`belot.belief`), scores every legal card
+in every such world, and plays the card with the best average. A world is
+scored by exact double-dummy search (`belot.solver`) once hands are down to
+`ENDGAME_CARDS`, and by random playouts before that. Values are the card
+points the agent's team takes from the current trick on.
+
+The search is anytime: `PIMCSearch.run(seconds)` evaluates worlds until the
+time is up and can be called again to refine the same decision, and
+`values()` / `best()` can be read at any point. `PIMCAgent` gives each move a
+fixed wall-clock budget rather than a fixed number of worlds. With
+`workers > 1` the worlds are evaluated in small tasks over a process pool.
+When the budget expires the search moves a generation counter shared with
+the workers, so the tasks it leaves behind return before their next world
+instead of holding up the next move. A budget is only exceeded by the time
+it takes to evaluate one world.
+
+Work is reused between consecutive moves of a deal: worlds sampled for the
+previous move that still agree with the cards played since then are played
+forward and evaluated again before new ones are sampled, and each process
+keeps its solver transposition tables, which already hold many of the
+positions reached from those worlds.
+
+`PIMCAgent` is a `play_trick` select callback, a drop-in for
+`select_card_with_rl`. It learns the play from the callback's arguments: the
+current trick, and which cards each hand has lost since its last turn.
+Nothing else about the other hands is read.
+
+    with PIMCAgent(budget=0.05, workers=4) as agent:
+        result = engine.play_game(rng, agent)
+"""
+
+import multiprocessing
+import random
+import time
+from collections import deque
+
+from belot import engine
+from belot.belief import BeliefTracker
+from belot.engine import CARD_BIT, CARD_POINTS, CARD_SUIT
+from belot.solver import Solver
+
+
+BUDGET = 0.1
+ENDGAME_CARDS = 4
+ROLLOUTS = 2
+TASK_WORLDS = 2
+TABLE_LIMIT = 1 << 20
+
+# Per-process solvers by trump suit, kept between tasks so their tables carry over
+_SOLVERS = {}
+
+# In pool workers, the shared generation of the search whose tasks are still wanted
+_GENERATION = None
+
+
+def _init_worker(generation):
+    global _GENERATION
+    _GENERATION = generation
+
+
+def _solver(trump_suit):
+    solver = _SOLVERS.get(trump_suit)
+    if solver is None:
+        solver = _SOLVERS[trump_suit] = Solver(trump_suit)
+    elif len(solver.table) > TABLE_LIMIT:
+        solver.clear()
+    return solver
+
+
+# A process pool for `PIMCSearch` and the generation counter its workers check between worlds.
+def make_pool(workers):
+    generation = multiprocessing.RawValue("q", 0)
+    return multiprocessing.Pool(workers, _init_worker, (generation,)), generation
+
+
+# Team 1 card points from here on (current trick included) with random legal play.
+def rollout_points(players_hands, leader, trick, trump_suit, rng):
+    hands = list(players_hands)
+    points = CARD_POINTS[trump_suit]
+    team1 = 0
+    if trick:
+        trick = list(trick)
+        lead_suit = CARD_SUIT[trick[0]]
+        while len(trick) < engine.NUM_PLAYERS:
+            seat = (leader + len(trick)) & 3
+            card = engine.random_card(engine.legal_moves(hands[seat], trick, lead_suit, trump_suit), rng)
+            hands[seat] &= ~CARD_BIT[card]
+            trick.append(card)
+        leader = (leader + engine.trick_winner(trick, lead_suit, trump_suit)) & 3
+        if not leader & 1:
+            team1 += sum(points[card] for card in trick)
+    while hands[leader]:
+        leader, trick = engine.play_trick(hands, trump_suit, leader, None, rng)
+        if not leader & 1:
+            team1 += sum(points[card] for card in trick)
+    return team1
+
+
+# Evaluates candidate cards in a list of worlds; returns the summed values for the player to act's team
+# and the number of worlds evaluated, which falls short once the task's search generation has passed.
+def evaluate_worlds(task):
+    worlds, leader, trick, trump_suit, candidates, rollouts, seed, generation = task
+    rng = random.Random(seed)
+    seat = (leader + len(trick)) & 3
+    points = CARD_POINTS[trump_suit]
+    totals = [0.0] * len(candidates)
+    evaluated = 0
+    for hands in worlds:
+        if _GENERATION is not None and _GENERATION.value != generation:
+            break
+        evaluated += 1
+        live = hands[0] | hands[1] | hands[2] | hands[3] | engine.cards_to_mask(trick)
+        remaining = sum(points[card] for card in engine.mask_to_cards(live))
+        if hands[seat].bit_count() <= ENDGAME_CARDS:
+            values = _solver(trump_suit).move_values(hands, leader, trick)
+            team1 = [values[card] for card in candidates]
+        else:
+            team1 = []
+            for card in candidates:
+                after = list(hands)
+                after[seat] &= ~CARD_BIT[card]
+                team1.append(sum(rollout_points(after, leader, trick + [card], trump_suit, rng)
+                                 for _ in range(rollouts)) / rollouts)
+        for i, value in enumerate(team1):
+            totals[i] += remaining - value if seat & 1 else value
+    return totals, evaluated
+
+
+class PIMCSearch:
+    """
+    Anytime evaluation of one decision. `worlds` are deals to evaluate before
+    new ones are drawn from `sampler`; every evaluated world is kept in
+    `evaluated` for reuse at the next decision. `generation` is the shared
+    counter given to `pool` by `make_pool`.
+    """
+
+    def __init__(self, sampler, leader, trick, trump_suit, candidates, rng=random, pool=None, workers=1,
+                 rollouts=ROLLOUTS, worlds=(), generation=None):
+        self.sampler = sampler
+        self.leader = leader
+        self.trick = list(trick)
+        self.trump_suit = trump_suit
+        self.candidates = list(candidates)
+        self.rng = rng
+        self.pool = pool
+        self.workers = workers
+        self.rollouts = rollouts
+        self.generation = generation
+        self.reused = deque(worlds)
+        self.evaluated = []
+        self.totals = [0.0] * len(self.candidates)
+        self.worlds = 0
+
+    def _task(self, size=TASK_WORLDS):
+        worlds = []
+        while len(worlds) < size:
+            worlds.append(self.reused.popleft() if self.reused else self.sampler.sample(self.rng))
+        generation = None if self.generation is None else self.generation.value
+        return (worlds, self.leader, self.trick, self.trump_suit, self.candidates, self.rollouts,
+                self.rng.getrandbits(64), generation)
+
+    # Adds a task's result; only the worlds the worker got to are kept for reuse.
+    def _add(self, task, result):
+        totals, evaluated = result
+        for i, value in enumerate(totals):
+            self.totals[i] += value
+        self.worlds += evaluated
+        self.evaluated.extend(task[0][:evaluated])
+
+    def _evaluate(self, task):
+        self._add(task, evaluate_worlds(task))
+
+    # Evaluates worlds for `seconds` and/or until `max_worlds` more have been evaluated, and at least one.
+    # The time budget can be overrun by the evaluation of one world.
+    def run(self, seconds=None, max_worlds=None):
+        deadline = None if seconds is None else time.perf_counter() + seconds
+        target = None if max_worlds is None else self.worlds + max_worlds
+
+        def done():
+            if deadline is None and target is None:
+                return True
+            return (deadline is not None and time.perf_counter() >= deadline) or (
+                target is not None and self.worlds >= target)
+
+        # In-process, one world at a time so the deadline is checked often
+        if self.pool is None:
+            self._evaluate(self._task(1))
+            while not done():
+                self._evaluate(self._task(1))
+            return self
+
+        # Over the pool: one task in flight per worker, so few are left running past the deadline
+        inflight = deque()
+        submitted = self.worlds
+        while not done():
+            while len(inflight) < self.workers and (target is None or submitted < target):
+                task = self._task()
+                inflight.append((task, self.pool.apply_async(evaluate_worlds, (task,))))
+                submitted += TASK_WORLDS
+            timeout = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            task, result = inflight[0]
+            try:
+                result = result.get(timeout)
+            except multiprocessing.TimeoutError:
+                break
+            inflight.popleft()
+            self._add(task, result)
+        # Tasks still queued or running are abandoned: move the generation on so the workers skip them
+        if inflight and self.generation is not None:
+            self.generation.value += 1
+        if not self.worlds:
+            self._evaluate(self._task(1))
+        return self
+
+    # Mean value of each candidate card over the worlds evaluated so far.
+    def values(self):
+        return {card: total / max(self.worlds, 1) for card, total in zip(self.candidates, self.totals)}
+
+    def best(self):
+        return self.candidates[max(range(len(self.candidates)), key=self.totals.__getitem__)]
+
+
+class _SeatView:
+    """One seat's record of a deal between its turns."""
+
+    def __init__(self, tracker, hands, pending):
+        self.tracker = tracker
+        self.hands = hands      # every hand as the seat left it after its last card
+        self.pending = pending  # seats still to play to the trick the seat last played to
+        self.worlds = []        # evaluated worlds, played forward to the same point
+
+
+class PIMCAgent:
+    """
+    PIMC card selection with a per-move time `budget` in seconds (or a fixed
+    `max_worlds` with `budget=None`). One agent can play any number of seats.
+    """
+
+    def __init__(self, budget=BUDGET, workers=1, rollouts=ROLLOUTS, max_worlds=None, seed=None):
+        self.budget = budget
+        self.max_worlds = max_worlds
+        self.rollouts = rollouts
+        self.rng = random.Random(seed)
+        self.workers = workers
+        self.pool, self.generation = make_pool(workers) if workers > 1 else (None, None)
+        self.views = {}
+        self.last_search = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Brings the seat's view up to date with the cards played since its last turn, starting a new one
+    # at the beginning of a deal or when the view does not match the table.
+    def _view(self, seat, players_hands, trick, trump_suit):
+        leader = (seat - len(trick)) & 3
+        view = self.views.get(seat)
+        if view is None or view.hands[seat] != players_hands[seat] or view.tracker.trump_suit != trump_suit:
+            # Public information only: the cards gone from play and how many each hand holds
+            in_trick = [(leader + i) & 3 for i in range(len(trick))]
+            tracker = BeliefTracker(seat, players_hands[seat], trump_suit, leader)
+            tracker.played = engine.FULL_DECK & ~(players_hands[0] | players_hands[1] | players_hands[2]
+                                                  | players_hands[3] | engine.cards_to_mask(trick))
+            tracker.counts = [players_hands[p].bit_count() + (p in in_trick) for p in range(engine.NUM_PLAYERS)]
+            view = self.views[seat] = _SeatView(tracker, None, [])
+            observed = []
+        else:
+            in_trick = engine.cards_to_mask(trick)
+            observed = [(p, (view.hands[p] & ~players_hands[p] & ~in_trick).bit_length() - 1) for p in view.pending]
+        observed += [((leader + i) & 3, card) for i, card in enumerate(trick)]
+
+        for p, card in observed:
+            view.tracker.observe(p, card)
+        view.worlds = self._play_forward(view.worlds, observed, view.tracker)
+        return view
+
+    # Worlds that agree with the cards observed since they were sampled, with those cards removed.
+    def _play_forward(self, worlds, observed, tracker):
+        possible = [tracker.possible(p) for p in range(engine.NUM_PLAYERS)]
+        kept = []
+        for hands in worlds:
+            hands = list(hands)
+            for p, card in observed:
+                if not hands[p] & CARD_BIT[card]:
+                    break
+                hands[p] &= ~CARD_BIT[card]
+            else:
+                if all(not hands[p] & ~possible[p] for p in range(engine.NUM_PLAYERS)):
+                    kept.append(hands)
+        return kept
+
+    def __call__(self, valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+        view = self._view(seat, players_hands, trick, trump_suit)
+        leader = (seat - len(trick)) & 3
+        if valid_mask & (valid_mask - 1) == 0:
+            card = valid_mask.bit_length() - 1
+            worlds = view.worlds
+        else:
+            search = PIMCSearch(view.tracker.sampler(), leader, trick, trump_suit, engine.mask_to_cards(valid_mask),
+                                self.rng, self.pool, self.workers, self.rollouts, view.worlds, self.generation)
+            search.run(self.budget, self.max_worlds)
+            self.last_search = search
+            card = search.best()
+            worlds = search.evaluated + list(search.reused)
+
+        view.tracker.observe(seat, card)
+        view.worlds = self._play_forward(worlds, [(seat, card)], view.tracker)
+        view.hands = list(players_hands)
+        view.hands[seat] &= ~CARD_BIT[card]
+        view.pending = [(seat + k) & 3 for k in range(1, engine.NUM_PLAYERS - len(trick))]
+        return card
@@ -0,0 +1,408 @@
+"""
+Shared-memory actor/learner pipeline for self-play.
+
+Actor processes play deals and write every decision as an encoded
+transition into their own `SharedRing`, a single-producer single-consumer
+ring buffer in `multiprocessing.shared_memory`. The learner reads the rings
+in place as NumPy views, so transitions are never pickled. Policy weights go
+the other way through a `WeightStore`: the learner publishes a `belot.mlp`
+weights blob under a new version number and each actor reloads it between
+deals.
+
+Ring columns (per transition, 41 bytes plus the version):
+
+    states    (capacity, PACKED_SIZE) uint8   bit-packed binary slots (`encoding.pack_states`)
+    scores    (capacity, 2)           uint8   team points from the SCORES slots
+    masks     (capacity,)             uint32  legal cards as a card mask
+    actions   (capacity,)             uint8   card played
+    rewards   (capacity,)             float32 final point margin of the acting team / MAX_POINTS
+    versions  (capacity,)             int32   weights version the actor played with
+
+The ring needs no lock. Its write and read counters are int64 slots in the
+segment header, each written by one side only, and a counter moves only
+after the rows it covers have been written (or consumed). When a ring is
+full the actor waits, which is the backpressure. Waiting time is counted in
+the ring header.
+
+    with Pipeline(actors=8, capacity=1 << 16, seed=1) as pipeline:
+        while training:
+            with pipeline.batch(4096) as batch:     # views into one actor's ring
+                states = encoding.unpack_states(batch["states"], batch["scores"])
+                ...
+            pipeline.publish(layers)
+        print(pipeline.metrics())
+"""
+
+import contextlib
+import multiprocessing
+import random
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from belot import encoding, engine, mlp, policycache
+from belot.inference import RandomPolicy
+
+
+ALIGN = 64
+WAIT = 0.0001
+
+# Ring header slots (int64)
+CAPACITY, WRITTEN, READ, STALL_NS, GAMES = range(5)
+RING_HEADER = 8
+
+RING_COLUMNS = (
+    ("states", (encoding.PACKED_SIZE,), np.uint8),
+    ("scores", (2,), np.uint8),
+    ("masks", (), np.uint32),
+    ("actions", (), np.uint8),
+    ("rewards", (), np.float32),
+    ("versions", (), np.int32),
+)
+
+
+def _layout(columns, rows):
+    offset = RING_HEADER * 8
+    layout = []
+    for name, shape, dtype in columns:
+        shape = (rows, *shape)
+        layout.append((name, shape, dtype, offset))
+        offset += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // ALIGN) * ALIGN
+    return layout, offset
+
+
+class SharedRing:
+    """
+    Single-producer single-consumer transition ring in shared memory.
+
+    `put_batch` is called by the one actor that owns the ring; `peek` and
+    `release` by the one learner reading it.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray(RING_HEADER, dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self.header[CAPACITY])
+        layout, _ = _layout(RING_COLUMNS, self.capacity)
+        for name, shape, dtype, offset in layout:
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset))
+
+    @classmethod
+    def create(cls, capacity):
+        _, size = _layout(RING_COLUMNS, capacity)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        header = np.ndarray(RING_HEADER, dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[CAPACITY] = capacity
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __len__(self):
+        return int(self.header[WRITTEN] - self.header[READ])
+
+    # Writes M transitions, waiting for room up to `timeout` seconds (forever if None).
+    # `masks` are card masks (ints) or (M, 32) boolean arrays.
+    # Returns False, writing nothing, if the ring stayed too full.
+    def put_batch(self, states, masks, actions, rewards, version, timeout=None):
+        n = len(actions)
+        masks = np.asarray(masks)
+        if masks.ndim == 2:
+            masks = np.packbits(masks, axis=1, bitorder="little").view("<u4")[:, 0]
+        if n > self.capacity:
+            raise ValueError(f"cannot put {n} transitions into a ring of capacity {self.capacity}")
+        written = int(self.header[WRITTEN])
+        if written + n - int(self.header[READ]) > self.capacity:
+            start = time.perf_counter_ns()
+            deadline = None if timeout is None else start + timeout * 1e9
+            while written + n - int(self.header[READ]) > self.capacity:
+                if deadline is not None and time.perf_counter_ns() >= deadline:
+                    self.header[STALL_NS] += time.perf_counter_ns() - start
+                    return False
+                time.sleep(WAIT)
+            self.header[STALL_NS] += time.perf_counter_ns() - start
+
+        indices = (written + np.arange(n)) % self.capacity
+        self.states[indices], self.scores[indices] = encoding.pack_states(states)
+        self.masks[indices] = masks
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.versions[indices] = version
+        # Publish the rows only once they are written
+        self.header[WRITTEN] = written + n
+        return True
+
+    # Views of up to `max_items` unread transitions, contiguous in the ring (so possibly fewer
+    # than are waiting). The rows stay valid until `release`.
+    def peek(self, max_items):
+        read = int(self.header[READ])
+        start = read % self.capacity
+        n = min(int(self.header[WRITTEN]) - read, max_items, self.capacity - start)
+        rows = slice(start, start + n)
+        return {
+            "states": self.states[rows],
+            "scores": self.scores[rows],
+            "masks": self.masks[rows],
+            "actions": self.actions[rows],
+            "rewards": self.rewards[rows],
+            "versions": self.versions[rows],
+        }
+
+    def release(self, n):
+        self.header[READ] += n
+
+    def close(self):
+        for name, _, _ in RING_COLUMNS:
+            setattr(self, name, None)
+        self.header = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# Weight store header slots (int64): a sequence number that is odd while a blob is being
+# written and twice the version otherwise, then the blob size and the segment capacity
+SEQUENCE, BLOB_SIZE, BLOB_CAPACITY = range(3)
+WEIGHT_HEADER = 8
+
+
+class WeightStore:
+    """
+    Versioned weights blob in shared memory with one writer and many readers.
+    Readers copy the blob and retry if a publish overlapped the copy.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray(WEIGHT_HEADER, dtype=np.int64, buffer=shm.buf)
+        self.data = np.ndarray(int(self.header[BLOB_CAPACITY]), dtype=np.uint8, buffer=shm.buf,
+                               offset=WEIGHT_HEADER * 8)
+
+    @classmethod
+    def create(cls, capacity):
+        shm = shared_memory.SharedMemory(create=True, size=WEIGHT_HEADER * 8 + capacity)
+        header = np.ndarray(WEIGHT_HEADER, dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[BLOB_CAPACITY] = capacity
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def version(self):
+        return int(self.header[SEQUENCE]) // 2
+
+    # Stores `blob` as the next version and returns that version number.
+    def publish(self, blob):
+        if len(blob) > len(self.data):
+            raise ValueError(f"weights of {len(blob)} bytes exceed the {len(self.data)}-byte store")
+        self.header[SEQUENCE] += 1
+        self.data[:len(blob)] = np.frombuffer(blob, dtype=np.uint8)
+        self.header[BLOB_SIZE] = len(blob)
+        self.header[SEQUENCE] += 1
+        return self.version()
+
+    # (version, bytes) of the latest complete blob; version 0 means nothing was published yet.
+    def read(self):
+        while True:
+            sequence = int(self.header[SEQUENCE])
+            if sequence & 1:
+                time.sleep(WAIT)
+                continue
+            blob = self.data[:int(self.header[BLOB_SIZE])].tobytes()
+            if int(self.header[SEQUENCE]) == sequence:
+                return sequence // 2, blob
+
+    def close(self):
+        self.header = self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# Actor process: plays deals with the latest published policy and writes their transitions.
+def actor_main(ring_name, weights_name, seed, stop, temperature=1.0):
+    ring = SharedRing.attach(ring_name)
+    weights = WeightStore.attach(weights_name)
+    rng = random.Random(seed)
+    policy = RandomPolicy(seed)
+    cache = None
+    version = 0
+
+    states = encoding.new_buffer(engine.NUM_CARDS)
+    masks = np.zeros((engine.NUM_CARDS, engine.NUM_CARDS), dtype=bool)
+    actions = np.zeros(engine.NUM_CARDS, dtype=np.uint8)
+    seats = np.zeros(engine.NUM_CARDS, dtype=np.int8)
+    decisions = [0]
+    info = engine.DealInfo()
+
+    def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+        i = decisions[0]
+        leader = (seat - len(trick)) & 3
+        encoding.encode_state(states[i], players_hands[seat], encoding.played_mask(players_hands),
+                              trick, leader, seat, trump_suit, lead_suit, info.bidder, info.scores)
+        engine.action_mask(valid_mask, masks[i])
+        if valid_mask & (valid_mask - 1):
+            card = int(policy.act_batch(states[i:i + 1], masks[i:i + 1])[0])
+        else:
+            card = valid_mask.bit_length() - 1
+        actions[i] = card
+        seats[i] = seat
+        decisions[0] = i + 1
+        return card
+
+    try:
+        while not stop.is_set():
+            if weights.version() != version:
+                version, blob = weights.read()
+                loaded = mlp.MLPPolicy(mlp.MLP.from_bytes(blob, version), temperature, seed=rng.getrandbits(32))
+                if cache is None:
+                    cache = policycache.PolicyCache(loaded)
+                cache.policy = loaded
+                policy = cache
+
+            decisions[0] = 0
+            result = engine.play_game(rng, select, info)
+            margin = (result.scores[0] - result.scores[1]) / encoding.MAX_POINTS
+            rewards = np.where(seats & 1, -margin, margin).astype(np.float32)
+            while not ring.put_batch(states, masks, actions, rewards, version, timeout=0.1):
+                if stop.is_set():
+                    return
+            ring.header[GAMES] += 1
+    finally:
+        ring.close()
+        weights.close()
+
+
+class Pipeline:
+    """
+    Learner-side owner of the rings, the weight store and the actor processes.
+    """
+
+    def __init__(self, actors=4, capacity=1 << 16, weights_capacity=1 << 24, seed=None, temperature=1.0):
+        self.num_actors = actors
+        self.capacity = capacity
+        self.seed = np.random.SeedSequence(seed)
+        self.temperature = temperature
+        self.rings = [SharedRing.create(capacity) for _ in range(actors)]
+        self.weights = WeightStore.create(weights_capacity)
+        self._stop = multiprocessing.Event()
+        self._processes = []
+        self._next_ring = 0
+
+        # Learner-side statistics
+        self._started = None
+        self._consumed = 0
+        self._staleness_sum = 0
+        self._staleness_max = 0
+
+    def start(self):
+        seeds = self.seed.generate_state(self.num_actors)
+        for ring, seed in zip(self.rings, seeds):
+            process = multiprocessing.Process(
+                target=actor_main, args=(ring.name, self.weights.name, int(seed), self._stop, self.temperature),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        self._started = time.perf_counter()
+        return self
+
+    def close(self):
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        for ring in self.rings:
+            ring.close()
+        self.weights.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Serializes and publishes new policy weights; returns the new version.
+    def publish(self, layers, dtype="float32"):
+        return self.weights.publish(mlp.weights_bytes(layers, dtype))
+
+    # (ring index, views) for the next ring with unread transitions, round-robin, or None if all are empty.
+    def poll(self, max_items):
+        for k in range(self.num_actors):
+            index = (self._next_ring + k) % self.num_actors
+            views = self.rings[index].peek(max_items)
+            if len(views["actions"]):
+                self._next_ring = (index + 1) % self.num_actors
+                return index, views
+        return None
+
+    def release(self, index, views):
+        n = len(views["actions"])
+        staleness = self.weights.version() - views["versions"]
+        self._staleness_sum += int(staleness.sum())
+        self._staleness_max = max(self._staleness_max, int(staleness.max()))
+        self._consumed += n
+        self.rings[index].release(n)
+
+    # Waits up to `timeout` for transitions and yields their views, releasing them afterwards.
+    # Yields None if nothing arrived in time.
+    @contextlib.contextmanager
+    def batch(self, max_items, timeout=1.0):
+        deadline = time.perf_counter() + timeout
+        polled = self.poll(max_items)
+        while polled is None and time.perf_counter() < deadline:
+            time.sleep(WAIT)
+            polled = self.poll(max_items)
+        if polled is None:
+            yield None
+            return
+        index, views = polled
+        try:
+            yield views
+        finally:
+            self.release(index, views)
+
+    def metrics(self):
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        actors = []
+        for ring, process in zip(self.rings, self._processes or [None] * self.num_actors):
+            header = ring.header
+            actors.append({
+                "alive": process is not None and process.is_alive(),
+                "games": int(header[GAMES]),
+                "produced": int(header[WRITTEN]),
+                "pending": int(header[WRITTEN] - header[READ]),
+                "fill": float(header[WRITTEN] - header[READ]) / ring.capacity,
+                "stall_sec": int(header[STALL_NS]) / 1e9,
+            })
+        produced = sum(actor["produced"] for actor in actors)
+        return {
+            "elapsed_sec": elapsed,
+            "weights_version": self.weights.version(),
+            "produced": produced,
+            "consumed": self._consumed,
+            "produced_per_sec": produced / elapsed if elapsed else 0.0,
+            "consumed_per_sec": self._consumed / elapsed if elapsed else 0.0,
+            "staleness_mean": self._staleness_sum / self._consumed if self._consumed else 0.0,
+            "staleness_max": self._staleness_max,
+            "actors": actors,
+        }
@@ -0,0 +1,176 @@
+"""
+Memoized policy evaluation with LRU eviction under a memory cap.
+
+`PolicyCache` sits in front of an `MLPPolicy` and stores the network's
+logits per position, so a position seen before costs a dict lookup instead
+of a state encoding and a forward pass. Logits are cached rather than
+cards, so a sampling policy (`temperature > 0`) still draws a fresh card
+every time.
+
+- Keys: `state_key` packs (hand, played cards, current trick, trump, bidder,
+  scores) into one int. Those are all the inputs `encode_state` gets in a
+  `play_trick` select callback; the lead suit is the first trick card's
+  suit. Rows coming through `act_batch` are keyed by their bit-packed
+  encoding instead.
+- Memory: logits live in one preallocated float32 slab. Its size, plus an
+  estimate of the per-entry dict overhead, is kept within `max_bytes`. The
+  least recently used entry is evicted when the slab is full.
+- Forced moves (one legal card) never reach the cache or the network.
+- Versioning: the cache remembers the model object and its `version`. When
+  either changes (new weights were loaded, or `cache.policy` was replaced),
+  every entry is dropped before the next lookup.
+
+    cache = PolicyCache(MLPPolicy("policy.bin"), max_bytes=64 << 20)
+    info = engine.DealInfo()
+    engine.play_game(rng, cache.select(info), info)
+    cache.stats()   # hit rate, evictions, forced moves, invalidations
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from belot import encoding, engine
+
+
+MAX_BYTES = 64 << 20
+# Rough cost of one entry besides its logits: the key, the dict slot and the linked-list node
+ENTRY_OVERHEAD = 200
+
+
+# Compact key of a decision from a select callback: everything `encode_state` is given there.
+# Seats are relative to the player to act, so the trick is identified by its cards in play order,
+# `bidder` is the bidder's seat relative to the player (or None) and `scores` (own team, opponents).
+def state_key(hand, played, trick, trump_suit, bidder=None, scores=(0, 0)):
+    key = ((scores[0] << 8 | scores[1]) << 3 | (4 if bidder is None else bidder)) << 2 | trump_suit
+    key = key << 32 | hand
+    for card in trick:
+        key = key << 5 | card
+    return (key << 2 | len(trick)) << 32 | played
+
+
+class PolicyCache:
+    """
+    LRU cache of logits in front of `policy` (an `MLPPolicy`). `act_batch`
+    is a drop-in for the policy's own; `select()` returns a `play_trick`
+    select callback that skips state encoding on hits.
+    """
+
+    def __init__(self, policy, max_bytes=MAX_BYTES):
+        self.policy = policy
+        self.capacity = max(1, max_bytes // (engine.NUM_CARDS * 4 + ENTRY_OVERHEAD))
+        self._logits = np.empty((self.capacity, engine.NUM_CARDS), dtype=np.float32)
+        self._slots = OrderedDict()
+        self._model = None
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.forced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def clear(self):
+        self._slots.clear()
+
+    # Drops every entry if the policy's weights changed since the last lookup.
+    def _check_version(self):
+        model = self.policy.model
+        if model is not self._model or model.version != self._version:
+            if self._slots:
+                self.invalidations += 1
+                self._slots.clear()
+            self._model = model
+            self._version = model.version
+
+    def _get(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            self.misses += 1
+            return None
+        self._slots.move_to_end(key)
+        self.hits += 1
+        return slot
+
+    def _put(self, key, logits):
+        if len(self._slots) < self.capacity:
+            slot = len(self._slots)
+        else:
+            _, slot = self._slots.popitem(last=False)
+            self.evictions += 1
+        self._logits[slot] = logits
+        self._slots[key] = slot
+        return slot
+
+    # Cards for (M, STATE_SIZE) `states` and (M, 32) `masks`, evaluating only the rows not cached.
+    def act_batch(self, states, masks):
+        self._check_version()
+        masks = np.asarray(masks, dtype=bool)
+        actions = np.empty(len(states), dtype=np.intp)
+        forced = masks.sum(axis=1) == 1
+        actions[forced] = masks[forced].argmax(axis=1)
+        self.forced += int(forced.sum())
+
+        rows = np.flatnonzero(~forced)
+        if not len(rows):
+            return actions
+        bits, scores = encoding.pack_states(states[rows])
+        keys = [b.tobytes() + s.tobytes() for b, s in zip(bits, scores)]
+        slots = [self._get(key) for key in keys]
+        missing = [i for i, slot in enumerate(slots) if slot is None]
+
+        # Gather every row's logits before inserting anything: inserts may evict slots this batch hit
+        logits = np.empty((len(rows), engine.NUM_CARDS), dtype=np.float32)
+        hit = [i for i, slot in enumerate(slots) if slot is not None]
+        logits[hit] = self._logits[[slots[i] for i in hit]]
+        if missing:
+            logits[missing] = self.policy.model.forward(states[rows[missing]])
+            for i in missing:
+                # A batch can repeat a position; the first copy fills the slot
+                if keys[i] not in self._slots:
+                    self._put(keys[i], logits[i])
+        actions[rows] = self.policy.choose(logits, masks[rows])
+        return actions
+
+    # `play_trick` select callback: forced moves are played directly, hits skip encoding and inference.
+    # With an `engine.DealInfo` passed to the game too, the bidder and scores are part of the state.
+    def select(self, info=None):
+        state = encoding.new_buffer(1)
+        mask = np.zeros((1, engine.NUM_CARDS), dtype=bool)
+        info = engine.DealInfo() if info is None else info
+
+        def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+            if valid_mask & (valid_mask - 1) == 0:
+                self.forced += 1
+                return valid_mask.bit_length() - 1
+            self._check_version()
+            played = encoding.played_mask(players_hands)
+            bidder = None if info.bidder is None else (info.bidder - seat) & 3
+            scores = (0, 0) if info.scores is None else (info.scores[seat & 1], info.scores[~seat & 1])
+            key = state_key(players_hands[seat], played, trick, trump_suit, bidder, scores)
+            slot = self._get(key)
+            if slot is None:
+                leader = (seat - len(trick)) & 3
+                encoding.encode_state(state[0], players_hands[seat], played, trick, leader, seat,
+                                      trump_suit, lead_suit, info.bidder, info.scores)
+                slot = self._put(key, self.policy.model.forward(state)[0])
+            engine.action_mask(valid_mask, mask[0])
+            return int(self.policy.choose(self._logits[slot:slot + 1].copy(), mask)[0])
+
+        return select
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "forced": self.forced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._slots),
+            "capacity": self.capacity,
+            "bytes": self._logits.nbytes + len(self._slots) * ENTRY_OVERHEAD,
+        }
@@ -0,0 +1,285 @@
+"""
+Compact binary game records.
+
+One deal is a fixed 41-byte record:
+
+    byte 0        bidder seat (bits 2-3) and trump suit (bits 0-1)
+    bytes 1-20    the shuffled deck the hands were dealt from, 32 card ids x 5 bits
+    bytes 21-40   the 32 cards in play order, 32 card ids x 5 bits
+
+The deck fixes the 5 + 3 deal of `generate_initial_hands` /
+`deal_additional_cards`, and the play order follows from the rules (each
+trick's winner leads the next), so nothing else is needed to replay a game.
+
+A record file is a header followed by blocks of records, each block
+optionally zlib-compressed:
+
+    file header   b"BELOTREC", version u8
+    block header  record count u32, payload length u32, codec u8
+    payload       count * RECORD_SIZE bytes (compressed if codec is ZLIB)
+
+A sidecar `<path>.idx` lists (first game number, file offset) for every
+block as little-endian u64 pairs, so `read_game` can jump to any game.
+Both files are append-only.
+
+    with RecordWriter("games.bin") as writer:
+        writer.append(record_from_result(engine.play_game()))
+    for record in iter_records("games.bin"):
+        ...
+"""
+
+import os
+import random
+import struct
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from belot import engine
+
+
+MAGIC = b"BELOTREC"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sB")
+BLOCK_HEADER = struct.Struct("<IIB")
+INDEX_ENTRY = struct.Struct("<QQ")
+
+RAW, ZLIB = 0, 1
+CARD_BITS = 5
+PACKED_CARDS = engine.NUM_CARDS * CARD_BITS // 8
+RECORD_SIZE = 1 + 2 * PACKED_CARDS
+BLOCK_RECORDS = 4096
+
+
+# One recorded deal: `deck` and `plays` are tuples of 32 card ids
+GameRecord = namedtuple("GameRecord", ["bidder", "trump", "deck", "plays"])
+
+
+def record_from_result(result):
+    plays = tuple(card for trick in result.tricks for card in trick.cards)
+    return GameRecord(result.bidder, result.trump, tuple(result.deck), plays)
+
+
+# Packs (n, 32) card ids into (n, 20) bytes, 5 bits per card.
+def pack_cards(cards):
+    bits = np.unpackbits(np.asarray(cards, dtype=np.uint8)[..., None], axis=-1, count=CARD_BITS, bitorder="little")
+    return np.packbits(bits.reshape(len(bits), -1), axis=1, bitorder="little")
+
+
+def unpack_cards(packed):
+    bits = np.unpackbits(packed, axis=1, bitorder="little").reshape(len(packed), engine.NUM_CARDS, CARD_BITS)
+    return np.packbits(bits, axis=-1, bitorder="little")[..., 0]
+
+
+# Encodes records into an (n, RECORD_SIZE) uint8 array.
+def encode_records(records):
+    out = np.empty((len(records), RECORD_SIZE), dtype=np.uint8)
+    out[:, 0] = [record.bidder << 2 | record.trump for record in records]
+    out[:, 1:1 + PACKED_CARDS] = pack_cards([record.deck for record in records])
+    out[:, 1 + PACKED_CARDS:] = pack_cards([record.plays for record in records])
+    return out
+
+
+def decode_records(data):
+    data = np.frombuffer(data, dtype=np.uint8).reshape(-1, RECORD_SIZE)
+    decks = unpack_cards(data[:, 1:1 + PACKED_CARDS]).tolist()
+    plays = unpack_cards(data[:, 1 + PACKED_CARDS:]).tolist()
+    return [GameRecord(head >> 2, head & 3, tuple(deck), tuple(play))
+            for head, deck, play in zip(data[:, 0].tolist(), decks, plays)]
+
+
+class RecordWriter:
+    """
+    Append-only writer that buffers records into blocks of `block_records`.
+    Opening an existing file appends to it.
+    """
+
+    def __init__(self, path, block_records=BLOCK_RECORDS, compress=True, level=6):
+        self.path = path
+        self.block_records = block_records
+        self.codec = ZLIB if compress else RAW
+        self.level = level
+        self._pending = []
+
+        if os.path.exists(path):
+            self.count = count_records(path)
+            self._file = open(path, "ab")
+        else:
+            self.count = 0
+            self._file = open(path, "wb")
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+            open(index_path(path), "wb").close()
+        self._index = open(index_path(path), "ab")
+
+    def append(self, record):
+        self._pending.append(record)
+        if len(self._pending) >= self.block_records:
+            self._write_block()
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def _write_block(self):
+        if not self._pending:
+            return
+        payload = encode_records(self._pending).tobytes()
+        if self.codec == ZLIB:
+            payload = zlib.compress(payload, self.level)
+        offset = self._file.tell()
+        self._file.write(BLOCK_HEADER.pack(len(self._pending), len(payload), self.codec))
+        self._file.write(payload)
+        self._index.write(INDEX_ENTRY.pack(self.count, offset))
+        self.count += len(self._pending)
+        self._pending = []
+
+    def flush(self):
+        self._write_block()
+        self._file.flush()
+        self._index.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def _check_header(file, path):
+    magic, version = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} Belot record file")
+
+
+# The decoded payload of the block at the file position, None at the end of the file.
+# A block cut short or that does not decode to its record count raises ValueError.
+def _read_block(file):
+    offset = file.tell()
+    header = file.read(BLOCK_HEADER.size)
+    if not header:
+        return None
+    if len(header) < BLOCK_HEADER.size:
+        raise ValueError(f"{file.name}: truncated block header at offset {offset}")
+    count, length, codec = BLOCK_HEADER.unpack(header)
+    payload = file.read(length)
+    if len(payload) < length:
+        raise ValueError(f"{file.name}: block at offset {offset} is truncated")
+    if codec == ZLIB:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as exc:
+            raise ValueError(f"{file.name}: corrupted block at offset {offset}: {exc}") from None
+    elif codec != RAW:
+        raise ValueError(f"{file.name}: unknown codec {codec} at offset {offset}")
+    if len(payload) != count * RECORD_SIZE:
+        raise ValueError(f"{file.name}: block at offset {offset} holds {len(payload)} bytes, "
+                         f"not {count} records")
+    return payload
+
+
+# Streams records block by block without loading the whole file.
+def iter_records(path, start=0):
+    with open(path, "rb") as file:
+        _check_header(file, path)
+        number = 0
+        if start:
+            number, offset = _block_for(path, start)
+            file.seek(offset)
+        while True:
+            payload = _read_block(file)
+            if payload is None:
+                return
+            records = decode_records(payload)
+            skip = max(start - number, 0)
+            number += len(records)
+            yield from records[skip:]
+
+
+def read_index(path):
+    with open(index_path(path), "rb") as file:
+        data = file.read()
+    return np.frombuffer(data, dtype="<u8").reshape(-1, 2)
+
+
+def _block_for(path, game):
+    index = read_index(path)
+    block = int(np.searchsorted(index[:, 0], game, side="right")) - 1
+    if block < 0:
+        raise IndexError(game)
+    return int(index[block, 0]), int(index[block, 1])
+
+
+# Random access to one game by its number in the file.
+def read_game(path, game):
+    first, offset = _block_for(path, game)
+    with open(path, "rb") as file:
+        file.seek(offset)
+        payload = _read_block(file)
+    i = game - first
+    if payload is None or i >= len(payload) // RECORD_SIZE:
+        raise IndexError(game)
+    return decode_records(payload[i * RECORD_SIZE:(i + 1) * RECORD_SIZE])[0]
+
+
+def count_records(path):
+    index = read_index(path)
+    if not len(index):
+        return 0
+    with open(path, "rb") as file:
+        file.seek(int(index[-1, 1]))
+        count, _, _ = BLOCK_HEADER.unpack(file.read(BLOCK_HEADER.size))
+    return int(index[-1, 0]) + count
+
+
+# Replays a record through the engine, checking every card is legal, and returns the GameResult.
+def replay_record(record):
+    players_hands, remaining_deck = engine.generate_initial_hands(list(record.deck))
+    engine.deal_additional_cards(players_hands, remaining_deck)
+    plays = iter(record.plays)
+
+    def select(valid_mask, seat, hands, trick, trump_suit, lead_suit):
+        card = next(plays)
+        if not valid_mask & engine.CARD_BIT[card]:
+            raise ValueError(f"illegal card {engine.card_name(card)} for player {seat + 1}")
+        return card
+
+    scores = [0, 0]
+    tricks = []
+    leader = 0
+    for _ in range(engine.NUM_TRICKS):
+        winner, trick = engine.play_trick(players_hands, record.trump, leader, select)
+        points = engine.trick_points(trick, record.trump)
+        scores[winner & 1] += points
+        tricks.append(engine.Trick(leader, trick, winner, points))
+        leader = winner
+    return engine.GameResult(record.bidder, record.trump, scores, tricks, list(record.deck))
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("record", help="play random deals and append them to a record file")
+    parser.add_argument("path", help="record file to write or extend")
+    parser.add_argument("--games", type=int, default=10000, help="number of deals to play")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--raw", action="store_true", help="store blocks uncompressed")
+    parser.set_defaults(func=run_cli)
+    return parser
+
+
+def run_cli(args):
+    rng = random.Random(args.seed)
+    with RecordWriter(args.path, compress=not args.raw) as writer:
+        for _ in range(args.games):
+            writer.append(record_from_result(engine.play_game(rng)))
+    total = writer.count
+    print(f"{args.path}: {total} games, {os.path.getsize(args.path) / max(total, 1):.1f} bytes per game")
+    return 0
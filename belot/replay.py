@@ -0,0 +1,224 @@
+"""
+Disk-backed experience replay for Belot self-play.
+
+Transitions (state, legal-card mask, action, reward) live in a directory of
+memory-mapped `.npy` columns, so a buffer of hundreds of millions of
+transitions costs page cache rather than process memory and reopens after
+a restart without being read back in:
+
+    states     (capacity, PACKED_SIZE) uint8   bit-packed binary slots (`encoding.pack_states`)
+    scores     (capacity, 2)           uint8   team points from the SCORES slots
+    masks      (capacity,)             uint32  legal cards as a card mask
+    actions    (capacity,)             uint8   card id played
+    rewards    (capacity,)             float32
+    priorities (capacity,)             float32 priority ** alpha (padded to whole blocks)
+    tree       (2 * blocks,)           float64 sum tree over blocks of BLOCK priorities
+    cursor     (2,)                    int64   next write slot, number of stored transitions
+
+The sum tree stops at blocks of `BLOCK` transitions; sampling walks it
+down to a block and finishes with a scan of that block's priorities. With
+blocks rounded up to a power of two the tree costs at most 32 / BLOCK
+bytes per transition, so a transition takes 37 bytes of data, 4 of
+priority and at most 0.5 of tree: about 4.2 GB for 100 million. The buffer
+is a ring: once full, new transitions overwrite the oldest ones.
+
+`meta.json` records the capacity and `alpha`. Priorities are stored raised
+to `alpha`, so a buffer can only be reopened with the alpha it was built with.
+
+    buffer = ReplayBuffer("replay/", capacity=100_000_000)
+    buffer.add_batch(states, masks, actions, rewards)
+    batch = buffer.sample(1024)                     # uniform
+    batch = buffer.sample(1024, prioritized=True)   # proportional to priority ** alpha
+    buffer.update_priorities(batch["indices"], td_errors)
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from belot import encoding
+
+
+DEFAULT_ALPHA = 0.6
+# Transitions per leaf of the priority sum tree
+BLOCK = 64
+FORMAT_VERSION = 2
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions backed by memory-mapped files.
+
+    Appends are O(1) per transition and thread-safe: producers hold the lock
+    only to reserve slots and to update the priority tree. Several
+    processes should each own a buffer directory. `alpha` defaults to
+    `DEFAULT_ALPHA` for a new buffer and to the stored one on reopening.
+    """
+
+    def __init__(self, path, capacity=None, alpha=None, seed=None):
+        self.path = path
+        self.rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("version") != FORMAT_VERSION:
+                raise ValueError(f"{path} holds a replay buffer in an older format; rebuild it")
+            if capacity is not None and capacity != meta["capacity"]:
+                raise ValueError(f"{path} holds a buffer of capacity {meta['capacity']}, not {capacity}")
+            if alpha is not None and alpha != meta["alpha"]:
+                raise ValueError(f"{path} stores priorities with alpha {meta['alpha']}, not {alpha}")
+            self.capacity = meta["capacity"]
+            self.alpha = meta["alpha"]
+            self._open("r+")
+        else:
+            if capacity is None:
+                raise ValueError(f"no replay buffer at {path}; pass a capacity to create one")
+            self.capacity = capacity
+            self.alpha = DEFAULT_ALPHA if alpha is None else alpha
+            os.makedirs(path, exist_ok=True)
+            self._open("w+")
+            self.cursor[:] = 0
+            self.priorities[:] = 0
+            self.tree[:] = 0
+            self._max_priority = 1.0
+            with open(meta_path, "w") as f:
+                json.dump({"version": FORMAT_VERSION, "capacity": capacity, "alpha": self.alpha,
+                           "state_size": encoding.STATE_SIZE}, f)
+            return
+
+        stored = self.priorities[:self.size]
+        self._max_priority = float(stored.max()) ** (1 / self.alpha) if stored.size else 1.0
+
+    def _open(self, mode):
+        blocks = -(-self.capacity // BLOCK)
+        self._leaves = 1 << max(blocks - 1, 1).bit_length()
+        self._block_slots = np.arange(BLOCK)
+        columns = {
+            "states": ((self.capacity, encoding.PACKED_SIZE), np.uint8),
+            "scores": ((self.capacity, 2), np.uint8),
+            "masks": ((self.capacity,), np.uint32),
+            "actions": ((self.capacity,), np.uint8),
+            "rewards": ((self.capacity,), np.float32),
+            "priorities": ((blocks * BLOCK,), np.float32),
+            "tree": ((2 * self._leaves,), np.float64),
+            "cursor": ((2,), np.int64),
+        }
+        for name, (shape, dtype) in columns.items():
+            file = os.path.join(self.path, f"{name}.npy")
+            if mode == "w+":
+                setattr(self, name, open_memmap(file, mode="w+", dtype=dtype, shape=shape))
+            else:
+                setattr(self, name, open_memmap(file, mode="r+"))
+
+    @property
+    def size(self):
+        return int(self.cursor[1])
+
+    def __len__(self):
+        return self.size
+
+    def flush(self):
+        for name in ("states", "scores", "masks", "actions", "rewards", "priorities", "tree", "cursor"):
+            getattr(self, name).flush()
+
+    # Reserves `n` consecutive ring slots and returns their indices.
+    def _reserve(self, n):
+        if n > self.capacity:
+            raise ValueError(f"cannot add {n} transitions to a buffer of capacity {self.capacity}")
+        with self._lock:
+            start = int(self.cursor[0])
+            self.cursor[0] = (start + n) % self.capacity
+            self.cursor[1] = min(self.capacity, int(self.cursor[1]) + n)
+        return (start + np.arange(n)) % self.capacity
+
+    def add(self, state, mask, action, reward):
+        self.add_batch(np.asarray(state)[None], np.array([mask], dtype=np.uint32), [action], [reward])
+
+    # Appends M transitions. `masks` are card masks (ints) or (M, 32) boolean arrays.
+    def add_batch(self, states, masks, actions, rewards):
+        masks = np.asarray(masks)
+        if masks.ndim == 2:
+            masks = np.packbits(masks, axis=1, bitorder="little").view("<u4")[:, 0]
+        indices = self._reserve(len(masks))
+        self.states[indices], self.scores[indices] = encoding.pack_states(states)
+        self.masks[indices] = masks
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self._set_priorities(indices, np.full(len(indices), self._max_priority))
+        return indices
+
+    def _set_priorities(self, indices, priorities):
+        indices = np.asarray(indices)
+        with self._lock:
+            self.priorities[indices] = np.asarray(priorities, dtype=np.float64) ** self.alpha
+            blocks = np.unique(indices // BLOCK)
+            node = blocks + self._leaves
+            self.tree[node] = self.priorities[blocks[:, None] * BLOCK + self._block_slots].sum(axis=1, dtype=np.float64)
+            # Recompute parents level by level; duplicates in `node` collapse naturally
+            while node[0] > 1:
+                node = np.unique(node >> 1)
+                self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+
+    def update_priorities(self, indices, priorities, eps=1e-6):
+        priorities = np.abs(np.asarray(priorities, dtype=np.float64)) + eps
+        self._max_priority = max(self._max_priority, float(priorities.max()))
+        self._set_priorities(indices, priorities)
+
+    # Walks the sum tree down to a block for every target mass at once, then scans within the blocks.
+    def _find(self, mass):
+        node = np.ones(len(mass), dtype=np.int64)
+        while node[0] < self._leaves:
+            left = 2 * node
+            left_mass = self.tree[left]
+            right = mass > left_mass
+            mass = np.where(right, mass - left_mass, mass)
+            node = left + right
+        slots = (node - self._leaves)[:, None] * BLOCK + self._block_slots
+        cumulative = np.cumsum(self.priorities[slots], axis=1, dtype=np.float64)
+        offset = np.minimum((cumulative < mass[:, None]).sum(axis=1), BLOCK - 1)
+        return np.minimum(slots[:, 0] + offset, self.size - 1)
+
+    # Preallocated minibatch arrays for `sample(..., out=...)`.
+    def new_batch(self, batch_size):
+        return {
+            "indices": np.zeros(batch_size, dtype=np.int64),
+            "states": encoding.new_buffer(batch_size),
+            "masks": np.zeros((batch_size, 32), dtype=bool),
+            "actions": np.zeros(batch_size, dtype=np.uint8),
+            "rewards": np.zeros(batch_size, dtype=np.float32),
+            "weights": np.ones(batch_size, dtype=np.float32),
+        }
+
+    # Samples a minibatch, gathering straight from the memory maps into `out`.
+    # Prioritized sampling also fills importance weights (N * P(i)) ** -beta, scaled to max 1.
+    def sample(self, batch_size, prioritized=False, beta=0.4, out=None):
+        if self.size == 0:
+            raise ValueError("cannot sample from an empty replay buffer")
+        if out is None:
+            out = self.new_batch(batch_size)
+        indices = out["indices"]
+
+        if prioritized:
+            total = self.tree[1]
+            # Stratified: one draw from each of `batch_size` equal slices of the total mass
+            mass = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+            indices[:] = self._find(mass)
+            probabilities = self.priorities[indices] / total
+            weights = (self.size * probabilities) ** -beta
+            out["weights"][:] = weights / weights.max()
+        else:
+            indices[:] = self.rng.integers(0, self.size, batch_size)
+            out["weights"][:] = 1
+
+        encoding.unpack_states(self.states[indices], self.scores[indices], out["states"])
+        masks = self.masks[indices]
+        out["masks"][:] = np.unpackbits(masks.view(np.uint8).reshape(-1, 4), axis=1, bitorder="little")
+        np.take(self.actions, indices, out=out["actions"])
+        np.take(self.rewards, indices, out=out["rewards"])
+        return out
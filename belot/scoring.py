@@ -0,0 +1,234 @@
+"""
+Round and match scoring.
+
+`engine.play_game` only adds up card points per trick. A round is settled
+here from the trick winners and card points, as in Bulgarian Belot:
+
+- the team taking the last trick gets 10 more points ("ten of last"), for
+  162 in all;
+- declarations (`belot.declarations`) are added to each team's total;
+- a team that takes all eight tricks (capot) gets 90 more points;
+- the contract is made if the bidder's team has more points than the
+  defenders: each team then scores its own points. It fails if the bidder's
+  team has fewer: the defenders score every point of the round. On a tie
+  the round is "hanging": the defenders score their points, and the
+  bidder's points are held over and go to the winner of the next round that
+  is not hanging (the bidder's team if it makes its contract, the defenders
+  otherwise);
+- game points are points / 10, rounded up from a last digit of 6
+  (86 -> 9, 85 -> 8).
+
+A match is played round after round until a team reaches `TARGET` game
+points; if both teams reach it in the same round, the higher total wins,
+and an exact tie plays on.
+
+`score_round` settles one round, `score_rounds` settles N rounds at once
+from (N, 8) arrays of trick winners and trick points, and `iter_match` /
+`play_match` stream a match through `engine.play_game`.
+
+    python -m belot match --matches 10000 --workers 8 --seed 1
+"""
+
+import json
+import os
+import random
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from belot import declarations, engine, parallel
+
+
+LAST_TRICK_BONUS = 10
+CAPOT_BONUS = 90
+TARGET = 151
+
+# Round outcomes for the bidder's team
+MADE, HANGING, FAILED = range(3)
+OUTCOMES = ("made", "hanging", "failed")
+NO_TEAM = -1
+
+# A settled round. `points` are the teams' points with every bonus, `game_points` what they score
+# (carried points included), `capot` the team that took every trick or NO_TEAM, and `hanging` the
+# game points held over to the next round. In `score_rounds` every field is an array.
+RoundScore = namedtuple("RoundScore", ["points", "game_points", "outcome", "capot", "hanging"])
+
+# One round of a match: the deal, its settlement and the match totals after it
+MatchRound = namedtuple("MatchRound", ["result", "score", "totals"])
+
+MatchResult = namedtuple("MatchResult", ["winner", "totals", "rounds"])
+
+
+def game_points(points):
+    return (points + 4) // 10
+
+
+# The 8-card hands dealt from a shuffled deck, as `engine.play_deal` deals them.
+def deal_hands(deck):
+    players_hands, remaining_deck = engine.generate_initial_hands(deck)
+    engine.deal_additional_cards(players_hands, remaining_deck)
+    return players_hands
+
+
+# Settles one round from the seat winning each trick and each trick's card points.
+# `declared` is the teams' declaration points and `carried` game points hanging from earlier rounds.
+def score_round(bidder, winners, trick_points, declared=(0, 0), carried=0):
+    points = [declared[0], declared[1]]
+    for winner, trick_total in zip(winners, trick_points):
+        points[winner & 1] += trick_total
+    points[winners[-1] & 1] += LAST_TRICK_BONUS
+    teams = {winner & 1 for winner in winners}
+    capot = teams.pop() if len(teams) == 1 else NO_TEAM
+    if capot != NO_TEAM:
+        points[capot] += CAPOT_BONUS
+
+    team = bidder & 1
+    scored = [0, 0]
+    hanging = 0
+    if points[team] > points[1 - team]:
+        outcome = MADE
+        scored = [game_points(points[0]), game_points(points[1])]
+        scored[team] += carried
+    elif points[team] < points[1 - team]:
+        outcome = FAILED
+        scored[1 - team] = game_points(points[0] + points[1]) + carried
+    else:
+        outcome = HANGING
+        scored[1 - team] = game_points(points[1 - team])
+        hanging = carried + game_points(points[team])
+    return RoundScore(points, scored, outcome, capot, hanging)
+
+
+# `score_round` for a finished `engine.GameResult`, with the declarations of its deal unless given.
+def score_game(result, declared=None, carried=0):
+    if declared is None:
+        declared = declarations.deal_declarations(deal_hands(result.deck), result.trump).points
+    winners = [trick.winner for trick in result.tricks]
+    trick_points = [trick.points for trick in result.tricks]
+    return score_round(result.bidder, winners, trick_points, declared, carried)
+
+
+# Settles N rounds at once. `bidder` is (N,), `winners` and `trick_points` are (N, 8) by trick,
+# `declared` (N, 2) team declaration points and `carried` (N,) hanging game points.
+def score_rounds(bidder, winners, trick_points, declared=None, carried=None):
+    bidder = np.asarray(bidder, dtype=np.int64)
+    teams = np.asarray(winners, dtype=np.int64) & 1
+    trick_points = np.asarray(trick_points, dtype=np.int64)
+    n = len(bidder)
+    rows = np.arange(n)
+
+    points = np.zeros((n, 2), dtype=np.int64)
+    points[:, 1] = (trick_points * teams).sum(axis=1)
+    points[:, 0] = trick_points.sum(axis=1) - points[:, 1]
+    points[rows, teams[:, -1]] += LAST_TRICK_BONUS
+    if declared is not None:
+        points += np.asarray(declared, dtype=np.int64)
+    swept = (teams == teams[:, :1]).all(axis=1)
+    capot = np.where(swept, teams[:, 0], NO_TEAM)
+    points[rows[swept], capot[swept]] += CAPOT_BONUS
+
+    carried = np.zeros(n, dtype=np.int64) if carried is None else np.asarray(carried, dtype=np.int64)
+    team = bidder & 1
+    ours, theirs = points[rows, team], points[rows, 1 - team]
+    outcome = np.where(ours > theirs, MADE, np.where(ours < theirs, FAILED, HANGING))
+
+    scored_ours = np.where(outcome == MADE, game_points(ours) + carried, 0)
+    scored_theirs = np.select([outcome == MADE, outcome == FAILED],
+                              [game_points(theirs), game_points(ours + theirs) + carried],
+                              game_points(theirs))
+    scored = np.empty((n, 2), dtype=np.int64)
+    scored[rows, team] = scored_ours
+    scored[rows, 1 - team] = scored_theirs
+    hanging = np.where(outcome == HANGING, carried + game_points(ours), 0)
+    return RoundScore(points, scored, outcome, capot, hanging)
+
+
+# The winning team once a round leaves the totals at `target` or more, else None.
+def match_winner(totals, target=TARGET):
+    if max(totals) < target or totals[0] == totals[1]:
+        return None
+    return 0 if totals[0] > totals[1] else 1
+
+
+# Plays rounds with `engine.play_game` and yields each one until a team wins the match.
+# `info`, a `DealInfo` shared with the select callback, is filled in for every round.
+def iter_match(rng=random, select=None, target=TARGET, with_declarations=True, info=None):
+    totals = [0, 0]
+    carried = 0
+    while True:
+        result = engine.play_game(rng, select, info)
+        score = score_game(result, None if with_declarations else (0, 0), carried)
+        carried = score.hanging
+        totals = [totals[0] + score.game_points[0], totals[1] + score.game_points[1]]
+        yield MatchRound(result, score, tuple(totals))
+        if match_winner(totals, target) is not None:
+            return
+
+
+def play_match(rng=random, select=None, target=TARGET, with_declarations=True, info=None):
+    rounds = list(iter_match(rng, select, target, with_declarations, info))
+    totals = rounds[-1].totals
+    return MatchResult(match_winner(totals, target), totals, rounds)
+
+
+# Columns of the per-match result arrays
+WINNER, ROUNDS, TEAM1_TOTAL, TEAM2_TOTAL, MADE_ROUNDS, HANGING_ROUNDS, FAILED_ROUNDS, CAPOTS = range(8)
+
+
+# Plays one chunk of matches and returns an (n, 8) array of per-match results.
+def play_chunk(task):
+    seed_seq, matches, target, with_declarations = task
+    rng = parallel.chunk_rng(seed_seq)
+    results = np.zeros((matches, 8), dtype=np.int32)
+    for i in range(matches):
+        match = play_match(rng, None, target, with_declarations)
+        row = results[i]
+        row[WINNER], row[ROUNDS] = match.winner, len(match.rounds)
+        row[TEAM1_TOTAL], row[TEAM2_TOTAL] = match.totals
+        for played in match.rounds:
+            row[MADE_ROUNDS + played.score.outcome] += 1
+            row[CAPOTS] += played.score.capot != NO_TEAM
+    return results
+
+
+def simulate_matches(matches, workers=1, seed=None, target=TARGET, with_declarations=True, chunk_size=100):
+    root, tasks = parallel.make_tasks(matches, seed, chunk_size)
+    tasks = [(seed_seq, size, target, with_declarations) for seed_seq, size in tasks]
+    start = time.perf_counter()
+    chunks = list(parallel.iter_results(tasks, workers, play_chunk))
+    elapsed = time.perf_counter() - start
+    results = np.concatenate(chunks) if chunks else np.empty((0, 8), dtype=np.int32)
+
+    rounds = max(int(results[:, ROUNDS].sum()), 1)
+    summary = {
+        "matches": len(results),
+        "seed": root.entropy,
+        "target": target,
+        "elapsed_sec": elapsed,
+        "matches_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "team1_win_rate": float((results[:, WINNER] == 0).mean()) if len(results) else 0.0,
+        "mean_rounds": float(results[:, ROUNDS].mean()) if len(results) else 0.0,
+        "outcome_rates": {name: float(results[:, MADE_ROUNDS + i].sum() / rounds) for i, name in enumerate(OUTCOMES)},
+        "capot_rate": float(results[:, CAPOTS].sum() / rounds),
+    }
+    return summary, results
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("match", help="play full matches to the target score")
+    parser.add_argument("--matches", type=int, default=1000, help="number of matches to play")
+    parser.add_argument("--target", type=int, default=TARGET, help="game points needed to win a match")
+    parser.add_argument("--no-declarations", action="store_true", help="score card points only")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--seed", type=int, default=None, help="root seed (random if omitted)")
+    parser.add_argument("--chunk-size", type=int, default=100, help="matches per task")
+    parser.set_defaults(func=run_cli)
+    return parser
+
+
+def run_cli(args):
+    summary, _ = simulate_matches(args.matches, args.workers, args.seed, args.target, not args.no_declarations,
+                                  args.chunk_size)
+    print(json.dumps(summary))
+    return 0
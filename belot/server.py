@@ -0,0 +1,471 @@
+"""
+Asyncio game server hosting many concurrent tables in one process.
+
+Every table is a coroutine that deals, bids and plays whole games. A seat is
+either a bot running in the server (any `belot.arena` agent spec) or a
+client connected over a local TCP or Unix socket. Search bots (`pimc`)
+decide in a worker thread so the other tables keep playing meanwhile; the
+cheap bots decide on the event loop. All rules are checked on
+the server: bids follow `engine.bidding_phase`, cards must be in
+`engine.legal_moves` and tricks are won per `engine.trick_winner`. A client
+that answers with an illegal move, or not within `move_timeout`, has a
+random legal card (or a pass) played for it and the game goes on.
+
+Messages are JSON objects, one per line. A client opens with
+
+    {"type": "join", "seat": 0, "games": 10}     play seat 0 against bots (games omitted: until disconnect)
+    {"type": "stats"}                            get the server metrics and disconnect
+
+and then answers every request carrying an "id", echoing the id:
+
+    {"type": "bid", "id": 7, "seat": 0, "hand": mask, "bid": -1}   ->  {"id": 7, "bid": 2}      (-1 passes)
+    {"type": "play", "id": 8, "seat": 0, "hand": mask, "trick": [...], "leader": 1, "trump": 2,
+     "valid": mask}                                                ->  {"id": 8, "card": 17}
+
+Between requests the server sends `deal` and `hand` (the seat's 5- and 8-card
+hands), `bidding`, `card`, `trick`, `score`, `error` and finally `done`.
+Cards are ids and hands are masks as in `belot.engine`.
+
+Metrics cover move latency (request sent to legal answer received for
+clients, decision time for bots) as p50/p99 over a sliding window, games
+finished per second over all tables, timeouts and illegal moves.
+
+    python -m belot serve --port 7777 --bot-tables 1000
+    python -m belot load --port 7777 --clients 500 --games 20
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+from belot import arena, engine, pimc
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7777
+MOVE_TIMEOUT = 10.0
+LATENCY_WINDOW = 100000
+PASS = -1
+
+
+# One client message; anything but a JSON object is a ValueError.
+def _parse(line):
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError(f"expected a JSON object, got {line.strip()[:80]!r}")
+    return message
+
+
+class ServerStats:
+    """Counters and sliding-window move latencies, per seat kind ("bot" or "client")."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time.perf_counter()
+        self.latencies = {"bot": deque(maxlen=window), "client": deque(maxlen=window)}
+        self.moves = {"bot": 0, "client": 0}
+        self.games = 0
+        self.timeouts = 0
+        self.illegal = 0
+        self.tables = 0
+        self.connections = 0
+
+    def record(self, kind, latency):
+        self.moves[kind] += 1
+        self.latencies[kind].append(latency)
+
+    def snapshot(self):
+        elapsed = time.perf_counter() - self.started
+        stats = {
+            "elapsed_sec": elapsed,
+            "games": self.games,
+            "games_per_sec": self.games / elapsed if elapsed else 0.0,
+            "tables": self.tables,
+            "connections": self.connections,
+            "timeouts": self.timeouts,
+            "illegal": self.illegal,
+        }
+        for kind, latencies in self.latencies.items():
+            values = np.array(latencies) if latencies else np.zeros(1)
+            stats[f"{kind}_moves"] = self.moves[kind]
+            stats[f"{kind}_latency_p50_ms"] = float(np.percentile(values, 50) * 1e3)
+            stats[f"{kind}_latency_p99_ms"] = float(np.percentile(values, 99) * 1e3)
+        return stats
+
+
+class BotSeat:
+    """
+    A seat played in the server by a `play_trick` select callback; bids like `engine.bidding_phase`.
+    A `blocking` select is run in the loop's default executor rather than on the event loop.
+    """
+
+    kind = "bot"
+
+    def __init__(self, select, rng, blocking=False):
+        self.select = select
+        self.rng = rng
+        self.blocking = blocking
+
+    async def bid(self, seat, hand, current):
+        return self.rng.randint(0, len(engine.SUITS)) - 1
+
+    async def play(self, valid_mask, seat, players_hands, trick, trump_suit, lead_suit, leader):
+        if self.blocking:
+            # The table does not touch the hands or trick until the card comes back
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.select, valid_mask, seat, players_hands, trick, trump_suit, lead_suit)
+        return self.select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit)
+
+    async def send(self, message):
+        pass
+
+
+class RemoteSeat:
+    """A seat played by a socket client. Replies to requests that already timed out are dropped."""
+
+    kind = "client"
+
+    def __init__(self, reader, writer, timeout):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self._next_id = 0
+
+    async def send(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+    async def _request(self, message, key):
+        self._next_id += 1
+        message["id"] = self._next_id
+        await self.send(message)
+        return await asyncio.wait_for(self._reply(self._next_id, key), self.timeout)
+
+    async def _reply(self, request_id, key):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("client disconnected")
+            reply = _parse(line)
+            if reply.get("id") == request_id:
+                return reply.get(key)
+
+    async def bid(self, seat, hand, current):
+        return await self._request({"type": "bid", "seat": seat, "hand": hand,
+                                    "bid": PASS if current is None else current}, "bid")
+
+    async def play(self, valid_mask, seat, players_hands, trick, trump_suit, lead_suit, leader):
+        return await self._request({"type": "play", "seat": seat, "hand": players_hands[seat], "trick": trick,
+                                    "leader": leader, "trump": trump_suit, "valid": valid_mask}, "card")
+
+
+class GameServer:
+    """
+    Runs tables as asyncio tasks. `bot` is the `belot.arena` agent spec for
+    bot seats; every table gets its own RNG drawn from `seed`.
+    """
+
+    def __init__(self, bot="random", move_timeout=MOVE_TIMEOUT, seed=None, latency_window=LATENCY_WINDOW):
+        self.bot = bot
+        self.move_timeout = move_timeout
+        self.rng = random.Random(seed)
+        self.stats = ServerStats(latency_window)
+        self._tables = set()
+        self._servers = []
+
+    def _bot_seat(self, rng, info):
+        select = arena.make_agent(self.bot, rng, info)
+        return BotSeat(select, rng, isinstance(select, pimc.PIMCAgent))
+
+    async def _decide(self, seat, request, *args):
+        started = time.perf_counter()
+        try:
+            value = await request(*args)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            return None
+        self.stats.record(seat.kind, time.perf_counter() - started)
+        return value
+
+    async def _broadcast(self, remotes, message):
+        for seat in remotes:
+            await seat.send(message)
+
+    async def _bidding(self, seats, remotes, players_hands):
+        current_bid = None
+        winner = None
+        for i, seat in enumerate(seats):
+            bid = await self._decide(seat, seat.bid, i, players_hands[i], current_bid)
+            if type(bid) is not int or not PASS <= bid < len(engine.SUITS):
+                if bid is not None:
+                    self.stats.illegal += 1
+                    await seat.send({"type": "error", "message": f"illegal bid {bid!r}, passing"})
+                bid = PASS
+            # Same rule as `engine.bidding_phase`: any new suit takes the bid
+            if bid != PASS and bid != current_bid:
+                current_bid = bid
+                winner = i
+        await self._broadcast(remotes, {"type": "bidding", "bidder": winner, "trump": current_bid})
+        return winner, current_bid
+
+    async def _trick(self, seats, remotes, players_hands, trump_suit, leader, rng, trick_number):
+        trick = []
+        lead_suit = engine.NO_SUIT
+        for k in range(engine.NUM_PLAYERS):
+            i = (leader + k) & 3
+            seat = seats[i]
+            valid = engine.legal_moves(players_hands[i], trick, lead_suit, trump_suit)
+            card = await self._decide(seat, seat.play, valid, i, players_hands, trick, trump_suit, lead_suit, leader)
+            if type(card) is not int or not 0 <= card < engine.NUM_CARDS or not valid >> card & 1:
+                if card is not None:
+                    self.stats.illegal += 1
+                    await seat.send({"type": "error", "message": f"illegal card {card!r}, playing a random legal card"})
+                card = engine.random_card(valid, rng)
+            trick.append(card)
+            players_hands[i] &= ~engine.CARD_BIT[card]
+            if not k:
+                lead_suit = engine.CARD_SUIT[card]
+            await self._broadcast(remotes, {"type": "card", "trick_number": trick_number, "seat": i, "card": card})
+        winner = (leader + engine.trick_winner(trick, lead_suit, trump_suit)) & 3
+        return winner, trick
+
+    # Deals and plays one game at a table (redealing when everyone passes) and returns the team scores.
+    # `info` is the table's `engine.DealInfo`, kept up to date for its bots.
+    async def play_game(self, seats, rng, info=None):
+        remotes = [seat for seat in seats if seat.kind == "client"]
+        while True:
+            deck = engine.generate_deck()
+            rng.shuffle(deck)
+            players_hands, remaining_deck = engine.generate_initial_hands(deck)
+            for i, seat in enumerate(seats):
+                if seat.kind == "client":
+                    await seat.send({"type": "deal", "seat": i, "hand": players_hands[i]})
+            bidder, trump_suit = await self._bidding(seats, remotes, players_hands)
+            if bidder is not None:
+                break
+
+        engine.deal_additional_cards(players_hands, remaining_deck)
+        for i, seat in enumerate(seats):
+            if seat.kind == "client":
+                await seat.send({"type": "hand", "seat": i, "hand": players_hands[i]})
+
+        scores = [0, 0]
+        if info is not None:
+            info.bidder = bidder
+            info.scores = scores
+        leader = 0
+        points = engine.CARD_POINTS[trump_suit]
+        for trick_number in range(engine.NUM_TRICKS):
+            winner, trick = await self._trick(seats, remotes, players_hands, trump_suit, leader, rng, trick_number)
+            trick_total = sum(points[card] for card in trick)
+            scores[winner & 1] += trick_total
+            await self._broadcast(remotes, {"type": "trick", "trick_number": trick_number, "cards": trick,
+                                            "winner": winner, "points": trick_total})
+            leader = winner
+            if not remotes:
+                await asyncio.sleep(0)  # all-bot tables yield once per trick so other tables keep moving
+
+        await self._broadcast(remotes, {"type": "score", "bidder": bidder, "trump": trump_suit, "scores": scores})
+        self.stats.games += 1
+        return scores
+
+    # Plays `games` games (forever if None) at a table of `seats`; returns the number finished.
+    async def run_table(self, seats, rng, games=None, info=None):
+        self.stats.tables += 1
+        played = 0
+        try:
+            while games is None or played < games:
+                await self.play_game(seats, rng, info)
+                played += 1
+        finally:
+            self.stats.tables -= 1
+        return played
+
+    def _spawn(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._tables.add(task)
+        task.add_done_callback(self._tables.discard)
+        return task
+
+    # Starts `count` all-bot tables that play until the server closes.
+    def add_bot_tables(self, count):
+        for _ in range(count):
+            rng = random.Random(self.rng.getrandbits(64))
+            info = engine.DealInfo()
+            seats = [self._bot_seat(rng, info) for _ in range(engine.NUM_PLAYERS)]
+            self._spawn(self.run_table(seats, rng, None, info))
+
+    async def _handle(self, reader, writer):
+        self.stats.connections += 1
+        try:
+            line = await reader.readline()
+            hello = _parse(line) if line.strip() else {}
+            if hello.get("type") == "stats":
+                writer.write(json.dumps(self.stats.snapshot()).encode() + b"\n")
+            elif hello.get("type") == "join":
+                seat = hello.get("seat", 0)
+                if type(seat) is not int or not 0 <= seat < engine.NUM_PLAYERS:
+                    raise ValueError(f"seat must be 0..3, not {seat!r}")
+                games = hello.get("games")
+                if games is not None and (type(games) is not int or games < 0):
+                    raise ValueError(f"games must be a non-negative integer, not {games!r}")
+                rng = random.Random(self.rng.getrandbits(64))
+                remote = RemoteSeat(reader, writer, self.move_timeout)
+                info = engine.DealInfo()
+                seats = [remote if i == seat else self._bot_seat(rng, info) for i in range(engine.NUM_PLAYERS)]
+                played = await self._spawn(self.run_table(seats, rng, games, info))
+                await remote.send({"type": "done", "games": played})
+            else:
+                raise ValueError(f"expected a join or stats message, got {hello!r}")
+        except ValueError as exc:
+            writer.write(json.dumps({"type": "error", "message": str(exc)}).encode() + b"\n")
+        except ConnectionError:
+            pass
+        finally:
+            self.stats.connections -= 1
+            writer.close()
+
+    # Listens on TCP `host:port`, or on the Unix socket `path` when given.
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        if path:
+            server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            server = await asyncio.start_server(self._handle, host, port, backlog=4096)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+        for task in list(self._tables):
+            task.cancel()
+        await asyncio.gather(*self._tables, return_exceptions=True)
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+
+async def _connect(host, port, path):
+    if path:
+        return await asyncio.open_unix_connection(path, limit=1 << 20)
+    return await asyncio.open_connection(host, port, limit=1 << 20)
+
+
+async def fetch_stats(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+    reader, writer = await _connect(host, port, path)
+    writer.write(b'{"type": "stats"}\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+
+# One load-generator client: joins as `seat`, answers with random bids and random legal cards.
+async def load_client(games, rng, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, seat=0, think=0.0):
+    reader, writer = await _connect(host, port, path)
+    writer.write(json.dumps({"type": "join", "seat": seat, "games": games}).encode() + b"\n")
+    played = 0
+    try:
+        while line := await reader.readline():
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "play":
+                reply = {"id": message["id"], "card": engine.random_card(message["valid"], rng)}
+            elif kind == "bid":
+                reply = {"id": message["id"], "bid": rng.randint(0, len(engine.SUITS)) - 1}
+            else:
+                if kind == "done":
+                    played = message["games"]
+                    break
+                continue
+            if think:
+                await asyncio.sleep(rng.expovariate(1 / think))
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+    finally:
+        writer.close()
+    return played
+
+
+# Runs `clients` concurrent clients of `games` games each and returns throughput and the server's metrics.
+async def run_load(clients=100, games=10, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, seed=None, think=0.0):
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    played = await asyncio.gather(*(load_client(games, random.Random(rng.getrandbits(64)), host, port, path,
+                                                think=think)
+                                    for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    return {
+        "clients": clients,
+        "games": sum(played),
+        "elapsed_sec": elapsed,
+        "client_games_per_sec": sum(played) / elapsed,
+        "server": await fetch_stats(host, port, path),
+    }
+
+
+def format_stats(stats):
+    return (f"{stats['games']} games in {stats['elapsed_sec']:.1f}s ({stats['games_per_sec']:.0f}/s), "
+            f"{stats['tables']} tables, {stats['connections']} connections; "
+            f"client moves p50 {stats['client_latency_p50_ms']:.2f} ms p99 {stats['client_latency_p99_ms']:.2f} ms, "
+            f"bot moves p50 {stats['bot_latency_p50_ms']:.3f} ms p99 {stats['bot_latency_p99_ms']:.3f} ms; "
+            f"{stats['timeouts']} timeouts, {stats['illegal']} illegal")
+
+
+async def serve(args):
+    server = GameServer(args.bot, args.move_timeout, args.seed)
+    await server.start(args.host, args.port, args.unix)
+    server.add_bot_tables(args.bot_tables)
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    try:
+        while deadline is None or time.perf_counter() < deadline:
+            wait = args.report_every if deadline is None else min(args.report_every, deadline - time.perf_counter())
+            await asyncio.sleep(max(wait, 0))
+            print(format_stats(server.stats.snapshot()), flush=True)
+    finally:
+        stats = server.stats.snapshot()
+        await server.close()
+    return stats
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("serve", help="host concurrent tables for bots and socket clients")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--bot", default="random", help="agent spec for bot seats (see `arena`)")
+    parser.add_argument("--bot-tables", type=int, default=0, help="all-bot tables to run alongside clients")
+    parser.add_argument("--move-timeout", type=float, default=MOVE_TIMEOUT, help="seconds a client has per move")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--report-every", type=float, default=5.0, help="seconds between metric lines")
+    parser.add_argument("--seed", type=int, default=None, help="seed for dealing and bots")
+    parser.add_argument("--json", action="store_true", help="print the final metrics as JSON")
+    parser.set_defaults(func=run_serve)
+
+    parser = subparsers.add_parser("load", help="load-generator clients for a running `serve`")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="server address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument("--unix", default=None, help="connect to this Unix socket path instead of TCP")
+    parser.add_argument("--clients", type=int, default=100, help="concurrent client connections")
+    parser.add_argument("--games", type=int, default=10, help="games per client")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds a client waits before each move")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the clients' moves")
+    parser.set_defaults(func=run_load_cli)
+    return parser
+
+
+def run_serve(args):
+    try:
+        stats = asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        return 0
+    print(json.dumps(stats) if args.json else format_stats(stats))
+    return 0
+
+
+def run_load_cli(args):
+    summary = asyncio.run(run_load(args.clients, args.games, args.host, args.port, args.unix, args.seed, args.think))
+    print(json.dumps(summary))
+    return 0
@@ -0,0 +1,166 @@
+"""
+Headless multi-process self-play runner.
+
+Deals are played with `belot.engine.play_game` in fixed-size chunks. Each
+chunk gets its own RNG stream spawned from one `numpy.random.SeedSequence`,
+so the stream of results for a given seed is identical no matter how many
+worker processes play the chunks. Nothing is printed while games run.
+
+With `instrumented=True` every worker records `belot.instrument` phase timers
+for its chunks and the merged snapshot is returned in the summary.
+
+    python -m belot simulate --games 100000 --workers 8 --seed 1
+    python -m belot simulate --games 10000 --instrument --profile-games 200
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from belot import engine, instrument, parallel
+
+
+CHUNK_SIZE = 1000
+
+# Columns of the per-game result arrays
+BIDDER, TRUMP, TEAM1_POINTS, TEAM2_POINTS = range(4)
+
+
+# Plays one chunk of games and returns an (n, 4) array of bidder, trump and team points.
+def play_chunk(task):
+    seed_seq, games = task
+    rng = parallel.chunk_rng(seed_seq)
+    results = np.empty((games, 4), dtype=np.int16)
+    for i in range(games):
+        game = engine.play_game(rng)
+        results[i] = (game.bidder, game.trump, game.scores[0], game.scores[1])
+    return results
+
+
+# Plays one chunk with instrumentation on and returns the results and the chunk's snapshot.
+# The task carries the number of games to profile in this chunk and whether to trace memory.
+def play_chunk_instrumented(task):
+    seed_seq, games, profile_games, profile_memory = task
+    instrument.STATS.reset()
+    instrument.enable()
+    if profile_games:
+        instrument.profile(profile_games, profile_memory)
+    try:
+        results = play_chunk((seed_seq, games))
+    finally:
+        instrument.disable()
+    return results, instrument.snapshot()
+
+
+# Aggregates an (n, 4) result array into summary statistics.
+def summarize(results, elapsed=None):
+    games = len(results)
+    points = results[:, [TEAM1_POINTS, TEAM2_POINTS]].astype(np.int64)
+    bidder_team = results[:, BIDDER] & 1
+    rows = np.arange(games)
+    bidder_points = points[rows, bidder_team]
+    defender_points = points[rows, 1 - bidder_team]
+    bidder_won = bidder_points > defender_points
+
+    summary = {
+        "games": games,
+        "team_points_mean": points.mean(axis=0).tolist() if games else [0.0, 0.0],
+        "team_points_std": points.std(axis=0).tolist() if games else [0.0, 0.0],
+        "team1_points_percentiles": dict(zip(
+            ("p5", "p25", "p50", "p75", "p95"),
+            np.percentile(points[:, 0], [5, 25, 50, 75, 95]).tolist(),
+        )) if games else {},
+        "team1_points_hist": np.bincount(points[:, 0], minlength=153).tolist(),
+        "bidder_points_mean": float(bidder_points.mean()) if games else 0.0,
+        "bidder_win_rate": float(bidder_won.mean()) if games else 0.0,
+        "trump_win_rate": {},
+    }
+    for suit, name in enumerate(engine.SUITS):
+        chosen = results[:, TRUMP] == suit
+        summary["trump_win_rate"][name] = float(bidder_won[chosen].mean()) if chosen.any() else None
+    if elapsed is not None:
+        summary["elapsed_sec"] = elapsed
+        summary["games_per_sec"] = games / elapsed if elapsed else None
+    return summary
+
+
+# Plays `games` deals over `workers` processes and returns the summary and the raw results.
+# `instrumented` adds merged phase timers under "instrumentation"; `profile_games` also
+# profiles that many games (spread over the first chunks), with tracemalloc if `profile_memory`.
+def simulate(games, workers=1, seed=None, chunk_size=CHUNK_SIZE, instrumented=False,
+             profile_games=0, profile_memory=False):
+    root, tasks = parallel.make_tasks(games, seed, chunk_size)
+    start = time.perf_counter()
+    if instrumented or profile_games:
+        instrumented_tasks = []
+        for seed_seq, size in tasks:
+            profiled = min(profile_games, size)
+            profile_games -= profiled
+            instrumented_tasks.append((seed_seq, size, profiled, profile_memory))
+        outputs = list(parallel.iter_results(instrumented_tasks, workers, play_chunk_instrumented))
+        chunks = [results for results, _ in outputs]
+        snapshot = instrument.merge([snap for _, snap in outputs])
+    else:
+        chunks = list(parallel.iter_results(tasks, workers, play_chunk))
+        snapshot = None
+    elapsed = time.perf_counter() - start
+
+    results = np.concatenate(chunks) if chunks else np.empty((0, 4), dtype=np.int16)
+    summary = summarize(results, elapsed)
+    summary["seed"] = root.entropy
+    summary["workers"] = workers
+    if snapshot is not None:
+        summary["instrumentation"] = snapshot
+    return summary, results
+
+
+def format_summary(summary):
+    lines = [
+        f"Games: {summary['games']} in {summary['elapsed_sec']:.2f}s "
+        f"({summary['games_per_sec']:.0f} games/s, {summary['workers']} workers, seed {summary['seed']})",
+        "Team points (mean +- std): "
+        + ", ".join(f"Team {i + 1} {mean:.1f} +- {std:.1f}"
+                    for i, (mean, std) in enumerate(zip(summary["team_points_mean"], summary["team_points_std"]))),
+        "Team 1 points percentiles: "
+        + (", ".join(f"{key} {value:.0f}" for key, value in summary["team1_points_percentiles"].items()) or "n/a"),
+        f"Bidding team: {summary['bidder_points_mean']:.1f} points on average, "
+        f"wins {summary['bidder_win_rate']:.1%} of deals",
+    ]
+    for name, rate in summary["trump_win_rate"].items():
+        lines.append(f"  {name}: " + ("n/a" if rate is None else f"{rate:.1%}"))
+    return "\n".join(lines)
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser("simulate", help="play random self-play deals headless")
+    parser.add_argument("--games", type=int, default=10000, help="number of deals to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--seed", type=int, default=None, help="root seed (random if omitted)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="deals per task")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--instrument", action="store_true", help="record per-phase timers and event counts")
+    parser.add_argument("--profile-games", type=int, default=0, help="run cProfile over this many games")
+    parser.add_argument("--profile-memory", action="store_true", help="also trace allocations while profiling")
+    parser.set_defaults(func=run_cli)
+    return parser
+
+
+def run_cli(args):
+    summary, _ = simulate(args.games, args.workers, args.seed, args.chunk_size,
+                          args.instrument, args.profile_games, args.profile_memory)
+    if args.json:
+        print(json.dumps(summary))
+        return 0
+    print(format_summary(summary))
+    snapshot = summary.get("instrumentation")
+    if snapshot is not None:
+        print()
+        print(instrument.format_table(snapshot))
+        for report in snapshot["profiles"]:
+            print(f"\ncProfile of {report['games']} games in process {report['pid']}:")
+            print(report["cprofile"])
+            for line in report.get("tracemalloc", ()):
+                print(line)
+    return 0
@@ -0,0 +1,294 @@
+"""
+Perfect-information (double-dummy) solver.
+
+Given all four hands, the trump suit, the leader and optionally the cards
+already played to the current trick, the solver plays out the remaining
+tricks under the `play_trick` / `legal_mask` rules and returns the exact
+number of card points each team takes with best play from both sides.
+
+The search is alpha-beta over team 1's points (seats 0 and 2 maximise,
+seats 1 and 3 minimise), run as null-window passes that bisect the range of
+possible points, with:
+
+- a transposition table keyed by the four hands and the leader at every
+  trick boundary, storing lower/upper bounds and the best move;
+- move ordering: the table move first; then, when the partner is winning,
+  the richest cards; when the opponents are winning, the cards that take the
+  trick before the cheapest discards;
+- equivalent-card merging: cards of one suit in the same legal set that are
+  adjacent in trick-taking order among the cards still live, and that carry
+  the same points, are interchangeable, so only one of them is searched.
+
+    solver = Solver(trump_suit)
+    result = solver.solve(players_hands, leader)
+    result.points, result.best_move
+"""
+
+from collections import namedtuple
+
+from belot import engine
+from belot.engine import CARD_BIT, CARD_POINTS, CARD_SUIT, SUIT_MASKS, WIN_KEY, legal_mask, mask_to_cards
+
+
+# Team points from the current position on (current trick included) and the best card for the player to act
+SolveResult = namedtuple("SolveResult", ["points", "best_move"])
+
+# Cards of each suit in ascending trick-taking order: SUIT_ORDER[trump][suit]
+SUIT_ORDER = tuple(
+    tuple(
+        tuple(sorted(range(8 * suit, 8 * suit + 8),
+                     key=lambda card: (engine.TRUMP_STRENGTH if suit == trump else engine.NON_TRUMP_STRENGTH)[card]))
+        for suit in range(4)
+    )
+    for trump in range(4)
+)
+
+
+# SUIT_BYTE_POINTS[trump][suit][byte]: points of the cards of `suit` set in an 8-bit slice
+SUIT_BYTE_POINTS = tuple(
+    tuple(
+        tuple(sum(CARD_POINTS[trump][8 * suit + bit] for bit in range(8) if byte >> bit & 1) for byte in range(256))
+        for suit in range(4)
+    )
+    for trump in range(4)
+)
+
+
+class Solver:
+    """
+    Double-dummy solver for one trump suit. The transposition table is kept
+    between calls, so solving successive positions of the same deal reuses work.
+    """
+
+    def __init__(self, trump_suit):
+        self.trump = trump_suit
+        self.points = CARD_POINTS[trump_suit]
+        self.order = SUIT_ORDER[trump_suit]
+        self.byte_points = SUIT_BYTE_POINTS[trump_suit]
+        self.table = {}
+        self.nodes = 0
+
+    def clear(self):
+        self.table.clear()
+        self.nodes = 0
+
+    def _mask_points(self, mask):
+        byte_points = self.byte_points
+        return (byte_points[0][mask & 0xFF] + byte_points[1][(mask >> 8) & 0xFF]
+                + byte_points[2][(mask >> 16) & 0xFF] + byte_points[3][mask >> 24])
+
+    # Legal cards for `seat`, one representative per group of equivalent cards, in search order.
+    def _moves(self, hand, trick, lead_suit, win_seat, win_card, seat, live, hint):
+        if trick:
+            keys = WIN_KEY[self.trump][lead_suit]
+            valid = legal_mask(hand, lead_suit, self.trump, win_card, not (seat ^ win_seat) & 1)
+        else:
+            keys = None
+            valid = hand
+
+        points = self.points
+        moves = []
+        for suit in range(4):
+            if not valid & SUIT_MASKS[suit]:
+                continue
+            previous = -1
+            for card in self.order[suit]:
+                if not live & CARD_BIT[card]:
+                    continue
+                if valid & CARD_BIT[card]:
+                    if previous >= 0 and points[previous] == points[card]:
+                        moves[-1] = card  # equivalent to the previous card: keep the stronger one
+                    else:
+                        moves.append(card)
+                    previous = card
+                else:
+                    previous = -1
+
+        if keys is None:
+            moves.sort(key=lambda card: -WIN_KEY[self.trump][CARD_SUIT[card]][card])
+        elif not (seat ^ win_seat) & 1:
+            moves.sort(key=lambda card: -points[card])  # partner is winning: give it points
+        else:
+            # Opponents are winning: take the trick (last to play: with the richest card), else discard cheaply
+            best = keys[win_card]
+            if len(trick) == 3:
+                moves.sort(key=lambda card: -points[card] if keys[card] > best else 100 + points[card])
+            else:
+                moves.sort(key=lambda card: -keys[card] if keys[card] > best else 100 + points[card])
+        if hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+        return moves
+
+    # Team 1 points from the final trick, when every player holds one card.
+    def _last_trick(self, hands, leader):
+        if not hands[leader]:
+            return 0
+        trick = [hands[(leader + k) & 3].bit_length() - 1 for k in range(4)]
+        winner = (leader + engine.trick_winner(trick, CARD_SUIT[trick[0]], self.trump)) & 3
+        points = self.points
+        return 0 if winner & 1 else points[trick[0]] + points[trick[1]] + points[trick[2]] + points[trick[3]]
+
+    # Plays `card` for the player to act, searches the position after it and takes it back.
+    def _play(self, hands, leader, trick, win_seat, win_card, card, alpha, beta):
+        n = len(trick)
+        seat = (leader + n) & 3
+        hand = hands[seat]
+        hands[seat] = hand & ~CARD_BIT[card]
+        trick.append(card)
+        if n == 0:
+            win_seat, win_card = seat, card
+        else:
+            keys = WIN_KEY[self.trump][CARD_SUIT[trick[0]]]
+            if keys[card] > keys[win_card]:
+                win_seat, win_card = seat, card
+
+        if n == 3:
+            points = self.points
+            gained = 0 if win_seat & 1 else points[trick[0]] + points[trick[1]] + points[trick[2]] + points[card]
+            rest, _ = self._search(hands, win_seat, [], -1, -1, alpha - gained, beta - gained)
+            value = gained + rest
+        else:
+            value, _ = self._search(hands, leader, trick, win_seat, win_card, alpha, beta)
+        trick.pop()
+        hands[seat] = hand
+        return value
+
+    # Team 1 points still to come from this position, searched within (alpha, beta).
+    def _search(self, hands, leader, trick, win_seat, win_card, alpha, beta):
+        self.nodes += 1
+        n = len(trick)
+        seat = (leader + n) & 3
+
+        if n == 0:
+            hand = hands[leader]
+            if not hand & (hand - 1):
+                return self._last_trick(hands, leader), hand.bit_length() - 1
+            remaining = self._mask_points(hands[0] | hands[1] | hands[2] | hands[3])
+            if remaining < beta:
+                return remaining, -1  # team 1 cannot reach beta even taking every point left
+            key = hands[0] | hands[1] << 32 | hands[2] << 64 | hands[3] << 96 | leader << 128
+            entry = self.table.get(key)
+            if entry is None:
+                lower, upper, hint = 0, 1000, -1
+            else:
+                lower, upper, hint = entry
+                if lower >= beta:
+                    return lower, hint
+                if upper <= alpha:
+                    return upper, hint
+                alpha = max(alpha, lower)
+                beta = min(beta, upper)
+            alpha_start, beta_start = alpha, beta
+        else:
+            hint = -1
+
+        live = hands[0] | hands[1] | hands[2] | hands[3]
+        for card in trick:
+            live |= CARD_BIT[card]
+        lead_suit = CARD_SUIT[trick[0]] if trick else engine.NO_SUIT
+        maximizing = not seat & 1
+        best_value = -1 if maximizing else 1000
+        best_move = -1
+
+        for card in self._moves(hands[seat], trick, lead_suit, win_seat, win_card, seat, live, hint):
+            value = self._play(hands, leader, trick, win_seat, win_card, card, alpha, beta)
+
+            if maximizing:
+                if value > best_value:
+                    best_value, best_move = value, card
+                    alpha = max(alpha, value)
+            elif value < best_value:
+                best_value, best_move = value, card
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if n == 0:
+            if best_value <= alpha_start:
+                upper = best_value
+            elif best_value >= beta_start:
+                lower = best_value
+            else:
+                lower = upper = best_value
+            self.table[key] = (lower, upper, best_move)
+        return best_value, best_move
+
+    # Exact team points from this position on with best play, and the best card for the player to act.
+    # `players_hands` are card masks; `trick` holds the cards already played to the current trick.
+    def solve(self, players_hands, leader, trick=()):
+        hands = list(players_hands)
+        trick = list(trick)
+        total = self._mask_points(hands[0] | hands[1] | hands[2] | hands[3]) + sum(self.points[c] for c in trick)
+        win_seat, win_card = -1, -1
+        if trick:
+            win = engine.trick_winner(trick, CARD_SUIT[trick[0]], self.trump)
+            win_seat, win_card = (leader + win) & 3, trick[win]
+
+        if not hands[(leader + len(trick)) & 3]:
+            return SolveResult((0, 0), -1)
+
+        # Null-window searches that bisect the value range, reusing table bounds between passes
+        move = -1
+        lower, upper = 0, total
+        while lower < upper:
+            beta = (lower + upper + 1) // 2
+            value, move = self._search(hands, leader, trick, win_seat, win_card, beta - 1, beta)
+            if value < beta:
+                upper = value
+            else:
+                lower = value
+        value = lower
+
+        # The best move is the first one proven to reach the value
+        seat = (leader + len(trick)) & 3
+        lead_suit = CARD_SUIT[trick[0]] if trick else engine.NO_SUIT
+        live = hands[0] | hands[1] | hands[2] | hands[3]
+        for card in trick:
+            live |= CARD_BIT[card]
+        for card in self._moves(hands[seat], trick, lead_suit, win_seat, win_card, seat, live, move):
+            if seat & 1:
+                if self._play(hands, leader, trick, win_seat, win_card, card, value, value + 1) <= value:
+                    break
+            elif self._play(hands, leader, trick, win_seat, win_card, card, value - 1, value) >= value:
+                break
+        return SolveResult((value, total - value), card)
+
+    # Exact team 1 points after each legal card for the player to act.
+    def move_values(self, players_hands, leader, trick=()):
+        hands = list(players_hands)
+        trick = list(trick)
+        seat = (leader + len(trick)) & 3
+        lead_suit = CARD_SUIT[trick[0]] if trick else engine.NO_SUIT
+        win_seat, win_card = -1, -1
+        if trick:
+            win = engine.trick_winner(trick, lead_suit, self.trump)
+            win_seat, win_card = (leader + win) & 3, trick[win]
+        valid = legal_mask(hands[seat], lead_suit, self.trump, win_card, bool(trick) and not (seat ^ win_seat) & 1)
+
+        values = {}
+        for card in mask_to_cards(valid):
+            hands_after = list(hands)
+            hands_after[seat] &= ~CARD_BIT[card]
+            values[card] = self.solve(hands_after, leader, trick + [card]).points[0]
+        return values
+
+    # Optimal play for the rest of the deal as a list of (seat, card).
+    def principal_variation(self, players_hands, leader, trick=()):
+        hands = list(players_hands)
+        trick = list(trick)
+        line = []
+        while hands[0] | hands[1] | hands[2] | hands[3]:
+            seat = (leader + len(trick)) & 3
+            card = self.solve(hands, leader, trick).best_move
+            line.append((seat, card))
+            hands[seat] &= ~CARD_BIT[card]
+            trick.append(card)
+            if len(trick) == 4:
+                leader = (leader + engine.trick_winner(trick, CARD_SUIT[trick[0]], self.trump)) & 3
+                trick = []
+        return line
+
+
+def solve(players_hands, trump_suit, leader=0, trick=()):
+    return Solver(trump_suit).solve(players_hands, leader, trick)
@@ -0,0 +1,195 @@
+"""
+Incremental game state for search and simulation.
+
+`GameState` holds one deal in progress: the four hand masks, the cards
+played, the current trick, leader, trump and scores. `play(card)` and
+`undo()` apply and revert a single card as O(1) deltas, so search and
+rollouts can walk the game tree on one object instead of copying hands
+and tricks at every node.
+
+Two derived views are kept up to date with the same deltas:
+
+- `features`: a (4, STATE_SIZE) array with the `belot.encoding` vector
+  of the position as seen from each seat; `state_vector()` returns the
+  row of the player to act.
+- `key`: a 64-bit Zobrist hash of the hands, the current trick, the
+  player to act and the trump suit.
+
+    state = GameState.from_deal(players_hands, trump_suit, leader=0)
+    for card in engine.mask_to_cards(state.legal_moves()):
+        state.play(card)
+        ...
+        state.undo()
+"""
+
+import random
+
+import numpy as np
+
+from belot import encoding, engine
+from belot.engine import CARD_BIT, CARD_POINTS, CARD_SUIT, NO_SUIT, NUM_CARDS, WIN_KEY
+
+
+_zobrist = random.Random(0x5EED_BE10)
+Z_HAND = tuple(tuple(_zobrist.getrandbits(64) for _ in range(NUM_CARDS)) for _ in range(4))
+Z_TRICK = tuple(tuple(_zobrist.getrandbits(64) for _ in range(NUM_CARDS)) for _ in range(4))
+Z_TO_PLAY = tuple(_zobrist.getrandbits(64) for _ in range(4))
+Z_TRUMP = tuple(_zobrist.getrandbits(64) for _ in range(4))
+
+_SEATS = np.arange(4)
+# Feature column of `card` in the trick block, for every perspective, when played by `seat`
+TRICK_COLUMNS = tuple(
+    tuple(np.array([encoding.TRICK.start + ((seat - view) & 3) * NUM_CARDS + card for view in range(4)])
+          for card in range(NUM_CARDS))
+    for seat in range(4)
+)
+
+
+class GameState:
+    """
+    A deal in progress with O(1) `play` / `undo`.
+
+    The deal must start at a trick boundary. `play` trusts that the card is
+    legal (see `legal_moves`); use `play_checked` where moves come from outside.
+    """
+
+    __slots__ = (
+        "hands", "played", "trick", "leader", "trump", "bidder", "lead_suit",
+        "win_seat", "win_card", "scores", "tricks_played", "key", "features", "_history",
+    )
+
+    def __init__(self, players_hands, trump_suit, leader=0, bidder=None):
+        self.hands = list(players_hands)
+        self.played = engine.FULL_DECK & ~(self.hands[0] | self.hands[1] | self.hands[2] | self.hands[3])
+        self.trick = []
+        self.leader = leader
+        self.trump = trump_suit
+        self.bidder = bidder
+        self.lead_suit = NO_SUIT
+        self.win_seat = -1
+        self.win_card = -1
+        self.scores = [0, 0]
+        self.tricks_played = engine.NUM_TRICKS - self.hands[leader].bit_count()
+        self._history = []
+
+        self.key = Z_TO_PLAY[leader] ^ Z_TRUMP[trump_suit]
+        for seat in range(4):
+            for card in engine.mask_to_cards(self.hands[seat]):
+                self.key ^= Z_HAND[seat][card]
+
+        self.features = encoding.new_buffer(4)
+        for view in range(4):
+            encoding.encode_state(self.features[view], self.hands[view], self.played, (), leader, view,
+                                  trump_suit, NO_SUIT, bidder, self.scores)
+
+    @classmethod
+    def from_deal(cls, players_hands, trump_suit, leader=0, bidder=None):
+        return cls(players_hands, trump_suit, leader, bidder)
+
+    @property
+    def to_play(self):
+        return (self.leader + len(self.trick)) & 3
+
+    def is_over(self):
+        return self.tricks_played == engine.NUM_TRICKS
+
+    def legal_moves(self):
+        seat = self.to_play
+        return engine.legal_mask(self.hands[seat], self.lead_suit, self.trump, self.win_card,
+                                 not (seat ^ self.win_seat) & 1)
+
+    def state_vector(self):
+        return self.features[self.to_play]
+
+    def play_checked(self, card):
+        if not self.legal_moves() & CARD_BIT[card]:
+            raise ValueError(f"{engine.card_name(card)} is not a legal card for player {self.to_play + 1}")
+        self.play(card)
+
+    def play(self, card):
+        seat = (self.leader + len(self.trick)) & 3
+        self._history.append((card, self.lead_suit, self.win_seat, self.win_card, self.key, None))
+        features = self.features
+
+        self.hands[seat] &= ~CARD_BIT[card]
+        self.played |= CARD_BIT[card]
+        self.trick.append(card)
+        next_seat = (seat + 1) & 3
+        self.key ^= Z_HAND[seat][card] ^ Z_TRICK[seat][card] ^ Z_TO_PLAY[seat] ^ Z_TO_PLAY[next_seat]
+
+        features[seat, encoding.HAND.start + card] = 0
+        features[:, encoding.PLAYED.start + card] = 1
+        features[_SEATS, TRICK_COLUMNS[seat][card]] = 1
+
+        if len(self.trick) == 1:
+            self.lead_suit = CARD_SUIT[card]
+            self.win_seat, self.win_card = seat, card
+            features[:, encoding.LEAD.start + self.lead_suit] = 1
+        else:
+            keys = WIN_KEY[self.trump][self.lead_suit]
+            if keys[card] > keys[self.win_card]:
+                self.win_seat, self.win_card = seat, card
+            if len(self.trick) == 4:
+                self._finish_trick()
+
+    # Scores the full trick and hands the lead to its winner.
+    def _finish_trick(self):
+        trick = self.trick
+        winner = self.win_seat
+        points = CARD_POINTS[self.trump]
+        taken = points[trick[0]] + points[trick[1]] + points[trick[2]] + points[trick[3]]
+        card, lead_suit, win_seat, win_card, key, _ = self._history[-1]
+        self._history[-1] = (card, lead_suit, win_seat, win_card, key, (trick, self.leader, self.lead_suit, taken))
+
+        features = self.features
+        self.key ^= Z_TO_PLAY[(self.leader + 4) & 3] ^ Z_TO_PLAY[winner]
+        for k, played in enumerate(trick):
+            seat = (self.leader + k) & 3
+            self.key ^= Z_TRICK[seat][played]
+            features[_SEATS, TRICK_COLUMNS[seat][played]] = 0
+        features[:, encoding.LEAD.start + self.lead_suit] = 0
+
+        self.scores[winner & 1] += taken
+        self._set_score_features()
+        self.trick = []
+        self.leader = winner
+        self.lead_suit = NO_SUIT
+        self.win_seat = -1
+        self.win_card = -1
+        self.tricks_played += 1
+
+    def _set_score_features(self):
+        team1, team2 = self.scores[0] / encoding.MAX_POINTS, self.scores[1] / encoding.MAX_POINTS
+        start = encoding.SCORES.start
+        self.features[0::2, start] = team1
+        self.features[0::2, start + 1] = team2
+        self.features[1::2, start] = team2
+        self.features[1::2, start + 1] = team1
+
+    def undo(self):
+        card, lead_suit, win_seat, win_card, key, finished = self._history.pop()
+        features = self.features
+
+        if finished is not None:
+            # Reopen the trick that `card` completed
+            trick, leader, trick_lead, taken = finished
+            self.tricks_played -= 1
+            self.scores[self.leader & 1] -= taken
+            self._set_score_features()
+            self.trick = trick
+            self.leader = leader
+            for k, played in enumerate(trick):
+                features[_SEATS, TRICK_COLUMNS[(leader + k) & 3][played]] = 1
+            features[:, encoding.LEAD.start + trick_lead] = 1
+
+        self.trick.pop()
+        seat = (self.leader + len(self.trick)) & 3
+        self.hands[seat] |= CARD_BIT[card]
+        self.played &= ~CARD_BIT[card]
+        self.lead_suit, self.win_seat, self.win_card, self.key = lead_suit, win_seat, win_card, key
+
+        features[seat, encoding.HAND.start + card] = 1
+        features[:, encoding.PLAYED.start + card] = 0
+        features[_SEATS, TRICK_COLUMNS[seat][card]] = 0
+        if not self.trick:
+            features[:, encoding.LEAD.start + CARD_SUIT[card]] = 0
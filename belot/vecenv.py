@@ -0,0 +1,204 @@
+"""
+Batched Belot simulator that plays N deals in lockstep with NumPy.
+
+Every game in the batch is a row of the same arrays: hands are (N, 4, 32)
+booleans indexed by the card ids of `belot.engine`, and the trick, trump,
+lead suit and scores are (N,) / (N, 4) / (N, 2) arrays. Dealing follows the
+5 + 3 order of `generate_initial_hands` / `deal_additional_cards`, bidding
+follows `bidding_phase`, and legal moves, the Tsakane over-trump rule and
+trick scoring are resolved for the whole batch with array operations.
+
+The interface is gym-style:
+
+    env = BelotVecEnv(4096, seed=0)
+    obs = env.reset()
+    while True:
+        obs, rewards, dones, info = env.step(env.sample_actions())
+
+Finished games are reset automatically inside `step`; their final scores,
+bidder and trump are reported in `info` for the rows where `dones` is set.
+"""
+
+import numpy as np
+
+from belot import engine
+
+
+NO_CARD = -1
+
+CARD_SUIT = np.array(engine.CARD_SUIT, dtype=np.int8)
+CARD_POINTS = np.array(engine.CARD_POINTS, dtype=np.int16)  # [trump, card]
+WIN_KEY = np.array(engine.WIN_KEY, dtype=np.int8)  # [trump, lead, card]
+SUIT_CARDS = CARD_SUIT[None, :] == np.arange(4)[:, None]  # [suit, card]
+TSAKANE_CARDS = np.array([[engine.action_mask(mask) for mask in row] for row in engine.TSAKANE_MASK])  # [trump, win_card, card]
+
+# Deck positions dealt to each seat: 5 cards before bidding, then 3 more
+DEAL_POSITIONS = np.array(
+    [list(range(i * 5, (i + 1) * 5)) + list(range(20 + i * 3, 20 + (i + 1) * 3)) for i in range(4)],
+    dtype=np.intp,
+)
+
+
+class BelotVecEnv:
+    """
+    N independent Belot deals stepped together.
+
+    Each `step` plays one card in every game, for the seat whose turn it is
+    (`self.player`). Rewards are the (N, 2) team points won on that step,
+    which are non-zero only when the step completes a trick.
+    """
+
+    def __init__(self, num_envs, seed=None):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self._rows = np.arange(num_envs)
+
+        self.hands = np.zeros((num_envs, 4, 32), dtype=bool)
+        self.played = np.zeros((num_envs, 32), dtype=bool)
+        self.trick = np.full((num_envs, 4), NO_CARD, dtype=np.int8)  # card by seat
+        self.bidder = np.zeros(num_envs, dtype=np.int8)
+        self.trump = np.zeros(num_envs, dtype=np.int8)
+        self.lead_suit = np.full(num_envs, engine.NO_SUIT, dtype=np.int8)
+        self.leader = np.zeros(num_envs, dtype=np.int8)
+        self.player = np.zeros(num_envs, dtype=np.int8)
+        self.trick_pos = np.zeros(num_envs, dtype=np.int8)
+        self.tricks_played = np.zeros(num_envs, dtype=np.int8)
+        self.win_seat = np.zeros(num_envs, dtype=np.int8)
+        self.win_card = np.zeros(num_envs, dtype=np.int8)
+        self.scores = np.zeros((num_envs, 2), dtype=np.int16)
+        self._legal = None
+
+    # Deals and bids the given rows; rows where everyone passes are redealt.
+    def _deal(self, rows):
+        while rows.size:
+            decks = np.argsort(self.rng.random((rows.size, 32)), axis=1)
+            bids = self.rng.integers(0, 5, size=(rows.size, 4)) - 1  # -1 is "pass"
+
+            # Sequential bidding as in `bidding_phase`, vectorized over the rows
+            current = np.full(rows.size, engine.NO_SUIT, dtype=np.int8)
+            winner = np.full(rows.size, -1, dtype=np.int8)
+            for seat in range(4):
+                takes = (bids[:, seat] != engine.NO_SUIT) & (bids[:, seat] != current)
+                current[takes] = bids[takes, seat]
+                winner[takes] = seat
+
+            ok = winner >= 0
+            dealt = rows[ok]
+            hands = np.zeros((dealt.size, 4, 32), dtype=bool)
+            cards = decks[ok][:, DEAL_POSITIONS]  # (n, 4, 8)
+            np.put_along_axis(hands, cards, True, axis=2)
+
+            self.hands[dealt] = hands
+            self.bidder[dealt] = winner[ok]
+            self.trump[dealt] = current[ok]
+            rows = rows[~ok]
+
+    def _reset_rows(self, rows):
+        self._deal(rows)
+        self.played[rows] = False
+        self.trick[rows] = NO_CARD
+        self.lead_suit[rows] = engine.NO_SUIT
+        self.leader[rows] = 0
+        self.player[rows] = 0
+        self.trick_pos[rows] = 0
+        self.tricks_played[rows] = 0
+        self.scores[rows] = 0
+
+    def reset(self):
+        self._reset_rows(self._rows)
+        return self.observe()
+
+    # (N, 32) mask of the cards the current player may play.
+    def legal_actions(self):
+        rows = self._rows
+        hand = self.hands[rows, self.player]
+        leading = self.trick_pos == 0
+        lead = np.where(leading, 0, self.lead_suit)
+
+        follow = hand & SUIT_CARDS[lead]
+        can_follow = follow.any(axis=1)
+
+        # Tsakane: void in the lead suit while the opponents win the trick
+        trumps = hand & SUIT_CARDS[self.trump]
+        has_trump = trumps.any(axis=1)
+        opponents_win = ((self.player ^ self.win_seat) & 1).astype(bool)
+        must_trump = ~leading & ~can_follow & opponents_win & has_trump
+
+        higher = trumps & TSAKANE_CARDS[self.trump, self.win_card]
+        overtrump = must_trump & higher.any(axis=1)
+
+        legal = hand.copy()
+        np.copyto(legal, follow, where=(~leading & can_follow)[:, None])
+        np.copyto(legal, trumps, where=must_trump[:, None])
+        np.copyto(legal, higher, where=overtrump[:, None])
+        return legal
+
+    def observe(self):
+        self._legal = self.legal_actions()
+        return {
+            "player": self.player.copy(),
+            "hand": self.hands[self._rows, self.player],
+            "legal": self._legal,
+            "played": self.played.copy(),
+            "trick": self.trick.copy(),
+            "trump": self.trump.copy(),
+            "lead_suit": self.lead_suit.copy(),
+            "scores": self.scores.copy(),
+        }
+
+    # Uniformly random legal card for every game.
+    def sample_actions(self, legal=None):
+        if legal is None:
+            legal = self._legal if self._legal is not None else self.legal_actions()
+        return np.argmax(self.rng.random(legal.shape) * legal, axis=1)
+
+    def step(self, actions):
+        rows = self._rows
+        actions = np.asarray(actions, dtype=np.intp)
+        legal = self._legal if self._legal is not None else self.legal_actions()
+        if not legal[rows, actions].all():
+            raise ValueError("illegal card played in at least one game")
+
+        player = self.player
+        self.hands[rows, player, actions] = False
+        self.played[rows, actions] = True
+        self.trick[rows, player] = actions
+
+        # The first card of a trick sets the lead suit and the provisional winner
+        leading = self.trick_pos == 0
+        self.lead_suit[leading] = CARD_SUIT[actions[leading]]
+        keys = WIN_KEY[self.trump, self.lead_suit]  # (N, 32)
+        beats = leading | (keys[rows, actions] > keys[rows, self.win_card])
+        self.win_card[beats] = actions[beats]
+        self.win_seat[beats] = player[beats]
+
+        self.trick_pos += 1
+        self.player = (player + 1) & 3
+
+        # Score the completed tricks
+        rewards = np.zeros((self.num_envs, 2), dtype=np.int16)
+        complete = self.trick_pos == 4
+        if complete.any():
+            done_rows = rows[complete]
+            points = CARD_POINTS[self.trump[done_rows, None], self.trick[done_rows]].sum(axis=1)
+            team = self.win_seat[done_rows] & 1
+            rewards[done_rows, team] = points
+            self.scores[done_rows, team] += points
+
+            self.leader[done_rows] = self.win_seat[done_rows]
+            self.player[done_rows] = self.win_seat[done_rows]
+            self.trick_pos[done_rows] = 0
+            self.trick[done_rows] = NO_CARD
+            self.lead_suit[done_rows] = engine.NO_SUIT
+            self.tricks_played[done_rows] += 1
+
+        dones = self.tricks_played == engine.NUM_TRICKS
+        info = {"trick_complete": complete}
+        if dones.any():
+            finished = rows[dones]
+            info["final_scores"] = self.scores[finished].copy()
+            info["bidder"] = self.bidder[finished].copy()
+            info["trump"] = self.trump[finished].copy()
+            self._reset_rows(finished)
+
+        return self.observe(), rewards, dones, info
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from belot import arena
+
+
+# Share of simulated null matches (mean difference 0) the sequential test calls significant.
+def false_positive_rate(fractions, alpha, matches=40000, seed=0):
+    rng = np.random.default_rng(seed)
+    steps = np.diff(np.concatenate([[0.0], fractions]))
+    sums = (rng.standard_normal((matches, len(fractions))) * np.sqrt(steps)).cumsum(axis=1)
+    test = arena.SequentialTest(alpha)
+    rejected = np.zeros(matches, dtype=bool)
+    for k, t in enumerate(fractions):
+        rejected |= np.abs(sums[:, k]) / np.sqrt(t) >= test.look(t)
+    return rejected.mean()
+
+
+@pytest.mark.parametrize("fractions", [[1.0], np.linspace(0.1, 1, 10), np.linspace(0.02, 1, 50),
+                                       [0.3, 0.35, 0.9, 1.0]])
+def test_sequential_test_keeps_the_error_rate(fractions):
+    # 40000 matches put the standard error of the rate near 0.001
+    assert false_positive_rate(fractions, 0.05) == pytest.approx(0.05, abs=0.004)
+
+
+def test_spending_function():
+    assert arena.obf_spent(0.05, 0) == 0
+    assert arena.obf_spent(0.05, 1) == pytest.approx(0.05)
+    assert arena.obf_spent(0.05, 0.1) < 1e-6
+    assert arena.SequentialTest(0.05).look(0.1) > 5
+    assert arena.SequentialTest(0.05).look(1.0) == pytest.approx(1.96, abs=0.01)
+
+
+def test_clear_difference_stops_early():
+    summary, results = arena.run_match("greedy", "random", max_pairs=5000, min_pairs=100, seed=1, chunk_size=100)
+    assert summary["stopped"] == "significant"
+    assert summary["pairs"] < 5000 and summary["mean"] > 0
+    assert len(results) == summary["pairs"]
+
+
+def test_same_agents_play_to_max_pairs():
+    summary, _ = arena.run_match("random", "random", max_pairs=600, min_pairs=100, seed=0, chunk_size=100)
+    assert summary["stopped"] == "max_pairs" and summary["pairs"] == 600
+    assert summary["alpha_spent"] == pytest.approx(0.05, abs=1e-3)
@@ -0,0 +1,104 @@
+import itertools
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from belot import engine
+from belot.belief import BeliefTracker
+from belot.engine import CARD_BIT
+
+
+# Seat 0's tracker after `tricks` tricks of random legal play, and the true hands at that point.
+def tracked_deal(seed, tricks):
+    rng = random.Random(seed)
+    deck = engine.generate_deck()
+    rng.shuffle(deck)
+    hands = [engine.cards_to_mask(deck[8 * seat:8 * seat + 8]) for seat in range(4)]
+    trump_suit = rng.randrange(4)
+    tracker = BeliefTracker(0, hands[0], trump_suit)
+    leader = 0
+
+    def observe(valid_mask, seat, players_hands, trick, trump, lead_suit):
+        card = engine.random_card(valid_mask, rng)
+        tracker.observe(seat, card)
+        return card
+
+    for _ in range(tricks):
+        leader, _ = engine.play_trick(hands, trump_suit, leader, observe, rng)
+    return tracker, hands
+
+
+# Every assignment of the unseen cards to seats 1-3 that the constraints allow.
+def brute_force_worlds(constraints):
+    unseen = [card for card in range(engine.NUM_CARDS)
+              if any(constraints.possible[seat] & CARD_BIT[card] for seat in (1, 2, 3))]
+    worlds = []
+    for seats in itertools.product((1, 2, 3), repeat=len(unseen)):
+        counts = Counter(seats)
+        if any(counts[seat] != constraints.counts[seat] for seat in (1, 2, 3)):
+            continue
+        if all(constraints.possible[seat] & CARD_BIT[card] for card, seat in zip(unseen, seats)):
+            hands = [constraints.hand, 0, 0, 0]
+            for card, seat in zip(unseen, seats):
+                hands[seat] |= CARD_BIT[card]
+            worlds.append(tuple(hands))
+    return worlds
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_samples_are_consistent_and_uniform(seed):
+    tracker, hands = tracked_deal(seed, 6)
+    constraints = tracker.constraints()
+    worlds = brute_force_worlds(constraints)
+    assert tuple(hands) in worlds
+    sampler = tracker.sampler()
+    assert sampler.worlds == len(worlds)
+
+    draws = 300 * len(worlds)
+    batch = Counter(map(tuple, sampler.sample_batch(draws, seed).tolist()))
+    rng = random.Random(seed)
+    single = Counter(tuple(sampler.sample(rng)) for _ in range(draws))
+    for counts in (batch, single):
+        assert set(counts) <= set(worlds)
+        # Chi-square against uniform: mean len - 1, sd sqrt(2 (len - 1))
+        observed = np.array([counts[world] for world in worlds])
+        chi2 = ((observed - 300) ** 2 / 300).sum()
+        assert chi2 < len(worlds) - 1 + 5 * np.sqrt(2 * max(len(worlds) - 1, 1)) + 5
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_marginals_match_brute_force(seed):
+    tracker, _ = tracked_deal(seed, 5)
+    worlds = np.array(brute_force_worlds(tracker.constraints()), dtype=np.int64)
+    expected = np.zeros((4, engine.NUM_CARDS))
+    for card in range(engine.NUM_CARDS):
+        expected[:, card] = ((worlds >> card) & 1).mean(axis=0)
+    assert np.allclose(tracker.sampler().marginals(), expected)
+
+
+def test_early_samples_respect_constraints():
+    for seed in range(20):
+        tracker, hands = tracked_deal(seed, 2)
+        constraints = tracker.constraints()
+        for world in tracker.sampler().sample_batch(500, seed).tolist():
+            assert world[0] == constraints.hand
+            assert sum(world[1:]) == constraints.possible[1] | constraints.possible[2] | constraints.possible[3]
+            for seat in range(4):
+                assert world[seat].bit_count() == constraints.counts[seat]
+                assert not world[seat] & ~constraints.possible[seat]
+
+
+def test_void_and_trump_inferences():
+    # Seat 1 discards a spade on a heart lead while the opponents win: no hearts and no trumps (clubs) left
+    trump_suit = 2
+    hand = engine.cards_to_mask([engine.card_id(name) for name in (
+        "A of hearts", "7 of diamonds", "8 of diamonds", "9 of diamonds", "10 of diamonds",
+        "J of diamonds", "Q of diamonds", "K of diamonds")])
+    tracker = BeliefTracker(0, hand, trump_suit)
+    tracker.observe(0, engine.card_id("A of hearts"))
+    tracker.observe(1, engine.card_id("7 of spades"))
+    assert tracker.void_suits(1) == [0, 2]
+    with pytest.raises(ValueError):
+        tracker.observe(1, engine.card_id("8 of spades"))
@@ -0,0 +1,99 @@
+import random
+
+import numpy as np
+import pytest
+
+from belot import bidtable, engine
+from belot.bidtable import BidTable, class_key
+
+
+# Opening hands whose classes make up the tiny table, one per (hand, trump)
+HANDS = [engine.cards_to_mask(cards) for cards in ([0, 1, 2, 8, 16], [4, 12, 20, 28, 7], [3, 11, 19, 27, 31])]
+
+
+@pytest.fixture
+def tiny_keys(monkeypatch):
+    keys = np.array(sorted({class_key(hand, trump) for hand in HANDS for trump in range(4)}), dtype=np.uint32)
+    monkeypatch.setattr(bidtable, "all_class_keys", lambda: keys)
+    return keys
+
+
+def test_lookups_match_the_built_rows(tmp_path, tiny_keys):
+    table = bidtable.build(str(tmp_path / "bids"), rollouts=4, seed=1, chunk_size=3)
+    assert table.complete() and len(table.keys) == len(tiny_keys)
+    assert (table.count[:] == 4).all()
+
+    hand = HANDS[0]
+    for trump in range(4):
+        row = table.row(hand, trump)
+        assert table.keys[row] == class_key(hand, trump)
+        for seat in range(4):
+            mean, var = table.lookup(hand, trump, seat)
+            assert mean == table.mean[row, seat] and var == table.var[row, seat]
+            assert 0 <= mean <= engine.DEAL_POINTS and var >= 0
+    assert table.suit_values(hand, 2) == [table.lookup(hand, trump, 2)[0] for trump in range(4)]
+    _, value = table.best_trump(hand, 1)
+    assert value == max(table.suit_values(hand, 1))
+
+
+def test_suit_relabelling_shares_a_class():
+    hand = engine.cards_to_mask([0, 1, 2, 9, 16])
+    # Swapping the contents of two non-trump suits leaves the class unchanged
+    swapped = engine.cards_to_mask([0, 1, 2, 8, 17])
+    assert hand != swapped and class_key(hand, 0) == class_key(swapped, 0)
+    assert class_key(hand, 0) != class_key(hand, 1)
+    # So does moving the trump suit along with the trumps
+    moved = engine.cards_to_mask([24, 25, 26, 9, 16])
+    assert class_key(hand, 0) == class_key(moved, 3)
+
+
+def test_bidding_phase_follows_the_threshold(tmp_path, tiny_keys):
+    table = bidtable.build(str(tmp_path / "bids"), rollouts=2, seed=0, chunk_size=4)
+    hands = [HANDS[0], HANDS[1], HANDS[2], HANDS[0]]
+    assert table.bidding_phase(hands, threshold=engine.DEAL_POINTS + 1) == (None, None)
+    seat, trump = table.bidding_phase(hands, threshold=0)
+    values = [table.best_trump(hand, seat)[1] for seat, hand in enumerate(hands)]
+    assert seat == values.index(max(values))
+    assert trump == table.best_trump(hands[seat], seat)[0]
+
+
+def test_resume_skips_finished_chunks(tmp_path, tiny_keys, monkeypatch):
+    path = str(tmp_path / "bids")
+    complete = bidtable.build(path, rollouts=2, seed=5, chunk_size=2)
+    expected = np.array(complete.mean)
+    del complete
+
+    # Interrupt the build: the second chunk is lost
+    count = np.load(f"{path}/count.npy", mmap_mode="r+")
+    count[2:4] = 0
+    count.flush()
+    del count
+
+    built = []
+    build_chunk = bidtable.build_chunk
+
+    def recording_build_chunk(task):
+        built.append(task[0])
+        return build_chunk(task)
+
+    monkeypatch.setattr(bidtable, "build_chunk", recording_build_chunk)
+    table = bidtable.build(path, rollouts=2, chunk_size=2)
+    assert built == [2]
+    assert table.complete()
+    # Chunk seeds depend only on the chunk number, so the rebuilt chunk is identical
+    assert (np.array(table.mean) == expected).all()
+
+
+@pytest.mark.parametrize("setting", [{"rollouts": 3}, {"chunk_size": 4}, {"seed": 6}])
+def test_resume_refuses_different_settings(tmp_path, tiny_keys, setting):
+    path = str(tmp_path / "bids")
+    bidtable.build(path, rollouts=2, seed=5, chunk_size=2)
+    arguments = {"rollouts": 2, "chunk_size": 2, **setting}
+    with pytest.raises(ValueError):
+        bidtable.build(path, **arguments)
+
+
+def test_rollout_points_stay_within_a_deal():
+    rng = random.Random(0)
+    for seat in range(4):
+        assert 0 <= bidtable.rollout(HANDS[0], seat, rng) <= engine.DEAL_POINTS
@@ -0,0 +1,116 @@
+import itertools
+import random
+
+import pytest
+
+from belot import engine, solver
+from belot.canonical import (
+    DedupFilter, IsomorphicCache, Position, canonical_key, canonicalize, deal_position, invert, permute_mask,
+    permute_position, restore_card,
+)
+from belot.engine import CARD_BIT, CARD_SUIT, NO_SUIT
+from belot.scoring import deal_hands
+
+
+PERMUTATIONS = list(itertools.permutations(range(4)))
+
+
+# A random position with `cards` per hand (plus the cards of a partly played trick).
+def position(seed, cards=8, played=0, trump=True):
+    rng = random.Random(seed)
+    deck = engine.generate_deck()
+    rng.shuffle(deck)
+    hands = [engine.cards_to_mask(deck[8 * seat:8 * seat + cards]) for seat in range(4)]
+    trump_suit, leader = rng.randrange(4), rng.randrange(4)
+    trick = []
+    for k in range(played):
+        seat = (leader + k) & 3
+        lead_suit = CARD_SUIT[trick[0]] if trick else NO_SUIT
+        card = engine.random_card(engine.legal_moves(hands[seat], trick, lead_suit, trump_suit), rng)
+        hands[seat] &= ~CARD_BIT[card]
+        trick.append(card)
+    return Position(tuple(hands), tuple(trick), leader, trump_suit if trump else None,
+                    CARD_SUIT[trick[0]] if trick else NO_SUIT)
+
+
+@pytest.mark.parametrize("trump", [True, False])
+@pytest.mark.parametrize("seed", range(10))
+def test_every_suit_permutation_has_one_canonical_key(seed, trump):
+    original = position(seed, cards=5 + seed % 4, played=seed % 4, trump=trump)
+    key = canonical_key(original)
+    for perm in PERMUTATIONS:
+        permuted = permute_position(original, perm)
+        assert canonical_key(permuted) == key
+        canonical, to_canonical = canonicalize(permuted)
+        assert canonical == canonicalize(original)[0]
+        assert permute_position(canonical, invert(to_canonical)) == permuted
+        if trump:
+            assert canonical.trump == 0
+
+
+def test_opening_hand_keys_match_across_suit_renamings():
+    hand = deal_hands(list(range(32)))[0]
+    keys = {canonical_key(deal_position((permute_mask(hand, perm), 0, 0, 0))) for perm in PERMUTATIONS}
+    assert len(keys) == 1
+
+
+def test_canonical_form_is_trump_aware():
+    card = engine.card_id
+    # Hearts J, 9 and spades 7, 8: swapping the two suits' contents is an isomorphism
+    # before trump is known, but not once hearts is trump
+    hand = engine.cards_to_mask([card("J of hearts"), card("9 of hearts"), card("7 of spades"), card("8 of spades")])
+    swapped = engine.cards_to_mask([card("J of spades"), card("9 of spades"), card("7 of hearts"), card("8 of hearts")])
+    rest = (0, 0, 0)
+    assert canonical_key(deal_position((hand, *rest))) == canonical_key(deal_position((swapped, *rest)))
+    assert canonical_key(deal_position((hand, *rest), 0)) != canonical_key(deal_position((swapped, *rest), 0))
+    # Renaming the trump along with its cards is still the same position
+    assert canonical_key(deal_position((hand, *rest), 0)) == canonical_key(deal_position((swapped, *rest), 3))
+    # The lead suit is part of the position too
+    diamonds = engine.cards_to_mask([card("7 of diamonds")])
+    clubs = engine.cards_to_mask([card("7 of clubs")])
+    lead = Position((diamonds | clubs, 0, 0, 0), (card("A of diamonds"),), 3, 0, 1)
+    other = Position((diamonds | clubs, 0, 0, 0), (card("A of clubs"),), 3, 0, 2)
+    assert canonical_key(lead) == canonical_key(other)
+
+
+def test_dedup_filter_and_cache_agree():
+    originals = [position(seed, cards=3, played=seed % 3) for seed in range(12)]
+    rng = random.Random(0)
+    stream = [permute_position(original, rng.choice(PERMUTATIONS)) for original in originals for _ in range(5)]
+    rng.shuffle(stream)
+
+    dedup = DedupFilter()
+    kept = list(dedup.filter(stream))
+    assert len(kept) == len(dedup) == len({canonical_key(p) for p in originals})
+    assert dedup.dropped == len(stream) - len(kept)
+
+    def evaluate(canonical):
+        return solver.solve(canonical.hands, canonical.trump, canonical.leader, canonical.trick)
+
+    points = IsomorphicCache(lambda canonical: evaluate(canonical).points)
+    moves = IsomorphicCache(lambda canonical: evaluate(canonical).best_move, restore_card)
+    for item in stream:
+        direct = evaluate(item)
+        assert points(item) == direct.points
+        move = moves(item)
+        seat = (item.leader + len(item.trick)) & 3
+        assert engine.legal_moves(item.hands[seat], list(item.trick), item.lead_suit, item.trump) & CARD_BIT[move]
+        # The restored move is worth as much as the solver's own choice
+        after = list(item.hands)
+        after[seat] &= ~CARD_BIT[move]
+        assert (solver.solve(after, item.trump, item.leader, item.trick + (move,)).points[seat & 1]
+                == direct.points[seat & 1])
+    assert points.misses == moves.misses == len(kept)
+    assert points.hits == len(stream) - len(kept)
+
+
+def test_cache_evicts_the_oldest_entry():
+    cache = IsomorphicCache(lambda canonical: len(canonical.trick), maxsize=2)
+    a, b, c = (position(seed, cards=2, played=1) for seed in range(3))
+    for item in (a, b, c):
+        cache(item)
+    assert len(cache.table) == 2
+    cache(a)
+    assert cache.misses == 4 and cache.hits == 0
+    cache.clear()
+    assert not cache.table and cache.misses == 0
@@ -0,0 +1,127 @@
+import random
+
+import numpy as np
+import pytest
+
+from belot import engine
+from belot.declarations import (
+    BELOT, QUARTE, QUINT, TIERCE, deal_declarations, deal_declarations_batch, hand_declarations,
+    hand_declarations_batch,
+)
+from belot.engine import RANKS
+from belot.scoring import deal_hands
+
+
+HEARTS, DIAMONDS, CLUBS, SPADES = range(4)
+
+
+def hand(*cards):
+    return engine.cards_to_mask(suit * 8 + RANKS.index(rank) for rank, suit in cards)
+
+
+def run(suit, *ranks):
+    return [(rank, suit) for rank in ranks]
+
+
+def four(rank):
+    return [(rank, suit) for suit in range(4)]
+
+
+# Random deals, plus deals from decks sorted by suit (long runs) or by rank (four of a kind)
+# with a few random swaps.
+def random_deals(n, seed):
+    rng = random.Random(seed)
+    deals = []
+    for i in range(n):
+        deck = engine.generate_deck()
+        if i % 3 == 0:
+            rng.shuffle(deck)
+        else:
+            if i % 3 == 2:
+                deck.sort(key=lambda card: (card & 7, card >> 3))
+            for _ in range(rng.randrange(8)):
+                a, b = rng.randrange(32), rng.randrange(32)
+                deck[a], deck[b] = deck[b], deck[a]
+        deals.append(deal_hands(deck))
+    return deals
+
+
+def test_scalar_and_batched_paths_agree():
+    deals = random_deals(400, seed=0)
+    trumps = [i % 4 for i in range(len(deals))]
+    batch = deal_declarations_batch(deals, trumps)
+    per_hand = hand_declarations_batch(deals, np.array(trumps)[:, None])
+    seen = set()
+    for i, (hands, trump) in enumerate(zip(deals, trumps)):
+        assert tuple(batch[i]) == deal_declarations(hands, trump).points
+        for seat in range(4):
+            expected = hand_declarations(hands[seat], trump)
+            assert tuple(int(field[i, seat]) for field in per_hand) == expected
+            seen.update(name for name, value in zip(expected._fields, expected) if value)
+    # The deals exercised every kind of declaration
+    assert seen == {"belot", "sequences", "sequence_best", "carres", "carre_best"}
+
+
+@pytest.mark.parametrize(("cards", "points"), [
+    (run(HEARTS, "7", "8", "9"), TIERCE),
+    (run(CLUBS, "10", "J", "Q", "K"), QUARTE),
+    (run(SPADES, "8", "9", "10", "J", "Q"), QUINT),
+    (run(DIAMONDS, *RANKS), QUINT + TIERCE),
+    (run(HEARTS, "7", "8", "9") + run(SPADES, "Q", "K", "A"), 2 * TIERCE),
+    (run(HEARTS, "7", "8") + run(HEARTS, "10", "J"), 0),
+])
+def test_sequences(cards, points):
+    assert hand_declarations(hand(*cards), HEARTS).sequences == points
+
+
+@pytest.mark.parametrize(("rank", "points"), [("J", 200), ("9", 150), ("A", 100), ("10", 100), ("K", 100),
+                                              ("Q", 100), ("8", 0), ("7", 0)])
+def test_four_of_a_kind(rank, points):
+    assert hand_declarations(hand(*four(rank)), HEARTS).carres == points
+
+
+def test_carre_cards_do_not_count_in_sequences():
+    declared = hand_declarations(hand(*four("J"), ("9", CLUBS), ("10", CLUBS), ("Q", CLUBS), ("K", CLUBS)), SPADES)
+    assert declared.carres == 200 and declared.sequences == 0
+    # Four sevens do not score, so the seven still counts in a run
+    declared = hand_declarations(hand(*four("7"), ("8", CLUBS), ("9", CLUBS)), SPADES)
+    assert declared.carres == 0 and declared.sequences == TIERCE
+
+
+def test_belot_is_king_and_queen_of_trump():
+    king_queen = hand(("K", DIAMONDS), ("Q", DIAMONDS))
+    assert hand_declarations(king_queen, DIAMONDS).belot == BELOT
+    assert hand_declarations(king_queen, HEARTS).belot == 0
+    # Counted on top of the sequence it belongs to
+    declared = hand_declarations(hand(*run(DIAMONDS, "Q", "K", "A")), DIAMONDS)
+    assert declared.belot == BELOT and declared.sequences == TIERCE
+
+
+def test_best_sequence_takes_all_of_its_teams_sequences():
+    hands = [
+        hand(*run(HEARTS, "7", "8", "9", "10")),     # quarte
+        hand(*run(CLUBS, "J", "Q", "K")),            # tierce
+        hand(*run(SPADES, "7", "8", "9")),           # partner's tierce scores too
+        hand(*run(DIAMONDS, "Q", "K", "A")),
+    ]
+    declared = deal_declarations(hands, HEARTS)
+    assert declared.sequences == (QUARTE + TIERCE, 0)
+
+
+def test_equal_best_sequences_cancel():
+    hands = [hand(*run(HEARTS, "8", "9", "10")), hand(*run(CLUBS, "8", "9", "10")), 0,
+             hand(*run(SPADES, "7", "8", "9"))]
+    assert deal_declarations(hands, DIAMONDS).sequences == (0, 0)
+    # The same category with a higher top card wins
+    hands[3] = hand(*run(SPADES, "9", "10", "J"))
+    assert deal_declarations(hands, DIAMONDS).sequences == (0, 2 * TIERCE)
+
+
+def test_carres_compare_by_rank_and_belots_always_count():
+    hands = [hand(*four("9")), hand(*four("A"), ("K", HEARTS), ("Q", HEARTS)), 0, 0]
+    declared = deal_declarations(hands, HEARTS)
+    assert declared.carres == (150, 0)
+    assert declared.belots == (0, BELOT)
+    assert declared.points == (150, BELOT)
+    hands[3] = hand(*four("J"))
+    assert deal_declarations(hands, HEARTS).carres == (0, 300)
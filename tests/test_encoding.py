@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+
+from belot import encoding, engine, inference, mlp
+from belot.encoding import BIDDER, MAX_POINTS, SCORES
+
+
+class RecordingPolicy:
+    """Random legal cards; keeps a copy of every state it is asked about."""
+
+    def __init__(self):
+        self.inner = inference.RandomPolicy(seed=0)
+        self.states = []
+
+    def act_batch(self, states, masks):
+        self.states.extend(np.array(states))
+        return self.inner.act_batch(states, masks)
+
+
+def test_bidder_and_scores_are_encoded_during_play():
+    policy = RecordingPolicy()
+    info = engine.DealInfo()
+    choose = inference.policy_select(policy, info)
+    expected = []
+
+    def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+        if valid_mask & (valid_mask - 1):
+            own, opponents = info.scores[seat & 1], info.scores[~seat & 1]
+            expected.append(((info.bidder - seat) & 3, own, opponents))
+        return choose(valid_mask, seat, players_hands, trick, trump_suit, lead_suit)
+
+    rng = random.Random(3)
+    for _ in range(5):
+        result = engine.play_game(rng, select, info)
+        assert info.bidder == result.bidder and info.scores is result.scores
+
+    assert len(policy.states) == len(expected) > 50
+    for state, (bidder, own, opponents) in zip(policy.states, expected):
+        assert state[BIDDER].tolist() == [float(i == bidder) for i in range(4)]
+        assert np.allclose(state[SCORES] * MAX_POINTS, [own, opponents])
+    assert sum(own + opponents > 0 for _, own, opponents in expected) > len(expected) // 2
+
+
+def test_encoded_slots_are_relative_to_the_player():
+    out = encoding.new_buffer()
+    encoding.encode_state(out, 0b1, 0, [], 0, 1, 0, bidder=2, scores=[30, 12])
+    assert out[BIDDER].tolist() == [0, 1, 0, 0]
+    assert np.allclose(out[SCORES] * MAX_POINTS, [12, 30])
+
+
+def test_cached_select_encodes_bidder_and_scores(tmp_path):
+    from belot.policycache import PolicyCache
+
+    path = str(tmp_path / "policy.bin")
+    mlp.save_weights(path, mlp.init_layers([encoding.STATE_SIZE, 32, engine.NUM_CARDS], seed=1))
+    policy = mlp.MLPPolicy(path)
+    forward = policy.model.forward
+    states = []
+
+    def recording_forward(batch):
+        states.extend(np.array(batch))
+        return forward(batch)
+
+    policy.model.forward = recording_forward
+    info = engine.DealInfo()
+    engine.play_game(random.Random(0), PolicyCache(policy).select(info), info)
+    assert states and all(state[BIDDER].sum() == 1 for state in states)
+    assert any(state[SCORES].sum() > 0 for state in states)
@@ -0,0 +1,71 @@
+import io
+import random
+
+import pytest
+
+from belot import engine, events
+from belot.events import Bid, CardPlayed, Deal, EventBus, EventLog, HandsComplete, Score, TextLogger, TrickWon
+from belot.scoring import deal_hands
+
+
+def greedy(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+    return max(engine.mask_to_cards(valid_mask), key=engine.CARD_POINTS[trump_suit].__getitem__)
+
+
+@pytest.mark.parametrize("select", [None, greedy])
+@pytest.mark.parametrize("seed", range(10))
+def test_event_game_matches_engine_game(seed, select):
+    expected = engine.play_game(random.Random(seed), select)
+    bus = EventBus()
+    log = EventLog().attach(bus)
+    result = events.play_game(random.Random(seed), select, bus)
+    assert result == expected
+
+    by_type = {event_type: [e for e in log.events if type(e) is event_type] for event_type in events.EVENT_TYPES}
+    assert by_type[Bid][-1] == Bid(result.bidder, result.trump)
+    assert all(bid.bidder is None for bid in by_type[Bid][:-1])
+    assert len(by_type[Deal]) == len(by_type[Bid])
+    assert by_type[HandsComplete] == [HandsComplete(tuple(deal_hands(result.deck)))]
+    assert [(e.leader, list(e.cards), e.winner, e.points) for e in by_type[TrickWon]] == [
+        (trick.leader, trick.cards, trick.winner, trick.points) for trick in result.tricks]
+    assert [e.trick_number for e in by_type[TrickWon]] == list(range(engine.NUM_TRICKS))
+    assert [(e.trick_number, e.card) for e in by_type[CardPlayed]] == [
+        (number, card) for number, trick in enumerate(result.tricks) for card in trick.cards]
+    assert by_type[Score] == [Score(result.bidder, result.trump, tuple(result.scores))]
+    # Events arrive in play order: each trick is reported after its fourth card
+    kinds = [type(e) for e in log.events if type(e) in (CardPlayed, TrickWon)]
+    assert kinds == ([CardPlayed] * 4 + [TrickWon]) * engine.NUM_TRICKS
+
+
+def test_deal_info_is_filled_with_events():
+    info = engine.DealInfo()
+    seen = []
+
+    def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+        seen.append((info.bidder, sum(info.scores)))
+        return engine.random_card(valid_mask)
+
+    bus = EventBus()
+    EventLog([TrickWon]).attach(bus)
+    result = events.play_game(random.Random(4), select, bus, info)
+    assert {bidder for bidder, _ in seen} == {result.bidder}
+    assert seen[0][1] == 0 and info.scores == result.scores
+
+
+def test_text_logger_prints_the_game():
+    out = io.StringIO()
+    bus = EventBus()
+    TextLogger(out).attach(bus)
+    result = events.play_game(random.Random(1), None, bus)
+    text = out.getvalue()
+    assert text.count("won the trick") == engine.NUM_TRICKS
+    assert f"Team 1 (Players 1 & 3): {result.scores[0]} points" in text
+
+
+def test_unsubscribed_bus_is_falsy():
+    bus = EventBus()
+    handler = EventLog().events.append
+    bus.subscribe(Score, handler)
+    assert bus and bus.wants(Score)
+    bus.unsubscribe(Score, handler)
+    assert not bus and not bus.wants(Score)
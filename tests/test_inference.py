@@ -0,0 +1,50 @@
+import asyncio
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from belot import encoding, engine, inference
+
+
+def request():
+    mask = np.zeros(engine.NUM_CARDS, dtype=bool)
+    mask[[3, 9]] = True
+    return encoding.new_buffer(), mask
+
+
+def test_broker_answers_legal_cards_from_many_threads():
+    info = [engine.DealInfo() for _ in range(8)]
+    results = [None] * 8
+    with inference.InferenceBroker(inference.RandomPolicy(seed=0), max_batch=8) as broker:
+        def play(i):
+            results[i] = engine.play_game(random.Random(i), inference.broker_select(broker, info[i]), info[i])
+
+        threads = [threading.Thread(target=play, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert broker.stats()["requests"] > 0
+    assert all(sum(result.scores) == 152 for result in results)
+
+
+def test_submit_after_close_raises():
+    broker = inference.InferenceBroker(inference.RandomPolicy(seed=0)).start()
+    assert broker.act(*request()) in (3, 9)
+    broker.close()
+    with pytest.raises(RuntimeError):
+        broker.submit(*request())
+    with pytest.raises(RuntimeError):
+        asyncio.run(broker.act_async(*request()))
+    with pytest.raises(RuntimeError):
+        broker.start()
+
+
+def test_close_fails_requests_never_evaluated():
+    broker = inference.InferenceBroker(inference.RandomPolicy(seed=0))
+    future = broker.submit(*request())
+    broker.close()
+    with pytest.raises(RuntimeError):
+        future.result(timeout=1)
@@ -0,0 +1,30 @@
+import random
+
+from belot import engine, instrument, solver
+
+
+HEARTS, SPADES = 0, 3
+
+
+def test_wrappers_reach_modules_that_imported_the_function():
+    original = engine.legal_mask
+    with instrument.instrumented() as stats:
+        assert solver.legal_mask is engine.legal_mask is not original
+        deck = engine.generate_deck()
+        random.Random(0).shuffle(deck)
+        hands = [engine.cards_to_mask(deck[seat * 4:seat * 4 + 4]) for seat in range(4)]
+        solver.solve(hands, HEARTS)
+        assert stats.phases["legal_mask"][0] > 0
+    assert solver.legal_mask is engine.legal_mask is original
+
+
+def test_overtrump_counted_when_every_trump_beats_the_winner():
+    jack, nine, eight, seven = (engine.card_id(f"{rank} of hearts") for rank in ("J", "9", "8", "7"))
+    with instrument.instrumented() as stats:
+        # Void in spades, opponents winning with the 8 of trumps: both held trumps beat it
+        valid = engine.legal_mask(engine.cards_to_mask([jack, nine]), SPADES, HEARTS, eight, False)
+        assert valid == engine.cards_to_mask([jack, nine])
+        assert stats.events == {"tsakane": 1, "tsakane_overtrump": 1}
+        # Only lower trumps held: forced to trump but not to overtrump
+        engine.legal_mask(engine.cards_to_mask([seven]), SPADES, HEARTS, eight, False)
+        assert stats.events == {"tsakane": 2, "tsakane_overtrump": 1}
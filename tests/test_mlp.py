@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from belot import encoding, engine, mlp
+
+
+SIZES = [encoding.STATE_SIZE, 64, 48, engine.NUM_CARDS]
+# Largest logit error against the float64 reference, per stored weight dtype
+TOLERANCE = {"float32": 1e-4, "float16": 2e-2, "int8": 1e-1}
+
+
+@pytest.fixture
+def layers():
+    layers = mlp.init_layers(SIZES, seed=0)
+    rng = np.random.default_rng(1)
+    return [(weight, rng.normal(0, 0.1, bias.shape).astype(np.float32)) for weight, bias in layers]
+
+
+def states(rows, seed=0):
+    return (np.random.default_rng(seed).random((rows, encoding.STATE_SIZE)) < 0.2).astype(np.float32)
+
+
+def reference(layers, x):
+    x = x.astype(np.float64)
+    for i, (weight, bias) in enumerate(layers):
+        x = x @ weight.astype(np.float64) + bias
+        if i < len(layers) - 1:
+            x = np.maximum(x, 0)
+    return x
+
+
+@pytest.mark.parametrize("widen", [False, True])
+@pytest.mark.parametrize("dtype", mlp.WEIGHT_DTYPES)
+def test_forward_matches_reference(layers, dtype, widen):
+    model = mlp.MLP.from_bytes(mlp.weights_bytes(layers, dtype), widen=widen)
+    x = states(50)
+    expected = reference(layers, x)
+    assert np.abs(model.forward(x) - expected).max() < TOLERANCE[dtype]
+    # Buffers are reused: a smaller batch after a larger one
+    assert np.abs(model.forward(x[:7]) - expected[:7]).max() < TOLERANCE[dtype]
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_widening_at_load_matches_per_call_widening(layers, dtype):
+    data = mlp.weights_bytes(layers, dtype)
+    x = states(20, seed=1)
+    per_call = mlp.MLP.from_bytes(data).forward(x).copy()
+    widened = mlp.MLP.from_bytes(data, widen=True)
+    assert all(weight.dtype == np.float32 and scale is None for weight, _, scale in widened.layers)
+    np.testing.assert_allclose(widened.forward(x), per_call, rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize("dtype", mlp.WEIGHT_DTYPES)
+def test_save_and_load_round_trip(tmp_path, layers, dtype):
+    path = str(tmp_path / "policy.bin")
+    mlp.save_weights(path, layers, dtype)
+    model = mlp.MLP(path)
+    assert isinstance(model._data, np.memmap)
+    assert model.input_size == encoding.STATE_SIZE and model.output_size == engine.NUM_CARDS
+    assert model.weight_dtype == dtype
+    assert model.num_parameters() == sum(weight.size + bias.size for weight, bias in layers)
+
+    for (weight, bias, scale), (expected_weight, expected_bias) in zip(model.layers, layers):
+        assert weight.dtype == np.dtype(dtype) and not weight.flags.writeable
+        np.testing.assert_array_equal(bias, expected_bias)
+        if dtype == "int8":
+            q, expected_scale = mlp.quantize_int8(expected_weight)
+            np.testing.assert_array_equal(weight, q)
+            np.testing.assert_array_equal(scale, expected_scale)
+        else:
+            np.testing.assert_array_equal(weight, expected_weight.astype(dtype))
+    x = states(10, seed=2)
+    np.testing.assert_array_equal(model.forward(x), mlp.MLP.from_bytes(mlp.weights_bytes(layers, dtype)).forward(x))
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"NOTANMLP" + bytes(60))
+    with pytest.raises(ValueError):
+        mlp.MLP(str(path))
+    with pytest.raises(ValueError):
+        mlp.weights_bytes(mlp.init_layers([4, 2], seed=0), "float64")
+
+
+def test_policy_only_picks_legal_cards(layers):
+    policy = mlp.MLPPolicy(mlp.MLP.from_bytes(mlp.weights_bytes(layers)), temperature=1.0, seed=0)
+    masks = np.random.default_rng(3).random((200, engine.NUM_CARDS)) < 0.2
+    masks[:, 5] = True
+    actions = policy.act_batch(states(200, seed=3), masks)
+    assert masks[np.arange(200), actions].all()
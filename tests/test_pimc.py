@@ -0,0 +1,73 @@
+import multiprocessing
+import random
+
+from belot import belief, engine, pimc
+from belot.scoring import deal_hands
+
+
+def _position(seed=0):
+    deck = engine.generate_deck()
+    random.Random(seed).shuffle(deck)
+    hands = deal_hands(deck)
+    return hands, belief.BeliefTracker(0, hands[0], 0).sampler()
+
+
+def test_stale_tasks_skip_their_worlds(monkeypatch):
+    hands, sampler = _position()
+    generation = multiprocessing.RawValue("q", 3)
+    monkeypatch.setattr(pimc, "_GENERATION", generation)
+    worlds = [sampler.sample(random.Random(i)) for i in range(2)]
+    task = (worlds, 0, [], 0, engine.mask_to_cards(hands[0]), 1, 0)
+
+    totals, evaluated = pimc.evaluate_worlds(task + (3,))
+    assert evaluated == 2 and any(totals)
+    assert pimc.evaluate_worlds(task + (2,)) == ([0.0] * 8, 0)
+
+
+def test_pool_search_moves_generation_on_deadline():
+    hands, sampler = _position(1)
+    pool, generation = pimc.make_pool(2)
+    try:
+        candidates = engine.mask_to_cards(hands[0])
+        search = pimc.PIMCSearch(sampler, 0, [], 0, candidates, random.Random(0), pool, 2, rollouts=50,
+                                 generation=generation)
+        search.run(0.001)
+        assert search.worlds >= 1 and generation.value >= 1
+        assert search.best() in candidates
+        # Later searches are not held up by the abandoned tasks
+        search = pimc.PIMCSearch(sampler, 0, [], 0, candidates, random.Random(1), pool, 2, rollouts=1,
+                                 generation=generation)
+        assert search.run(max_worlds=4).worlds >= 4
+    finally:
+        pool.terminate()
+
+
+def test_single_timed_out_task_moves_generation_on():
+    hands, sampler = _position(2)
+    pool, generation = pimc.make_pool(2)
+    try:
+        candidates = engine.mask_to_cards(hands[0])
+        search = pimc.PIMCSearch(sampler, 0, [], 0, candidates, random.Random(0), pool, 2, rollouts=200,
+                                 generation=generation)
+        # `max_worlds` caps the submissions at one task, which the deadline abandons
+        search.run(0.001, max_worlds=1)
+        assert generation.value == 1
+        assert len(search.evaluated) == search.worlds
+    finally:
+        pool.terminate()
+
+
+def test_only_evaluated_worlds_are_kept():
+    hands, sampler = _position(3)
+    candidates = engine.mask_to_cards(hands[0])
+    search = pimc.PIMCSearch(sampler, 0, [], 0, candidates, random.Random(0), rollouts=1)
+    task = search._task(3)
+    search._add(task, ([1.0] * len(candidates), 2))
+    assert search.evaluated == task[0][:2] and search.worlds == 2
+
+
+def test_agent_plays_a_full_deal():
+    rng = random.Random(2)
+    with pimc.PIMCAgent(budget=None, max_worlds=2, seed=0) as agent:
+        result = engine.play_game(rng, agent)
+    assert sum(result.scores) == 152
@@ -0,0 +1,156 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from belot import encoding, engine, mlp
+from belot.pipeline import STALL_NS, Pipeline, SharedRing, WeightStore
+
+
+def transitions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    states = encoding.new_buffer(n)
+    states[:, :encoding.BINARY_SIZE] = rng.random((n, encoding.BINARY_SIZE)) < 0.2
+    states[:, encoding.SCORES] = rng.integers(0, 153, (n, 2)) / encoding.MAX_POINTS
+    masks = rng.integers(1, 1 << 32, n, dtype=np.uint64).astype(np.uint32)
+    actions = rng.integers(0, engine.NUM_CARDS, n)
+    rewards = rng.standard_normal(n).astype(np.float32)
+    return states, masks, actions, rewards
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRing.create(8)
+    yield ring
+    ring.close()
+
+
+def take(ring, max_items):
+    views = ring.peek(max_items)
+    taken = {name: view.copy() for name, view in views.items()}
+    ring.release(len(taken["actions"]))
+    return taken
+
+
+def test_ring_wraps_around(ring):
+    states, masks, actions, rewards = transitions(11)
+    assert ring.put_batch(states[:5], masks[:5], actions[:5], rewards[:5], version=1)
+    assert len(take(ring, 5)["actions"]) == 5
+
+    # Six more rows: three at the end of the ring, three from its start
+    assert ring.put_batch(states[5:], masks[5:], actions[5:], rewards[5:], version=2)
+    assert len(ring) == 6
+    tail = take(ring, 100)
+    assert len(tail["actions"]) == 3  # peek stops at the end of the ring
+    head = take(ring, 100)
+    assert len(head["actions"]) == 3 and len(ring) == 0
+
+    got = {name: np.concatenate([tail[name], head[name]]) for name in tail}
+    np.testing.assert_array_equal(encoding.unpack_states(got["states"], got["scores"]), states[5:])
+    np.testing.assert_array_equal(got["masks"], masks[5:])
+    np.testing.assert_array_equal(got["actions"], actions[5:])
+    np.testing.assert_array_equal(got["rewards"], rewards[5:])
+    assert (got["versions"] == 2).all()
+
+
+def test_boolean_masks_are_packed(ring):
+    states, masks, actions, rewards = transitions(4, seed=1)
+    bool_masks = np.array([engine.action_mask(int(mask)) for mask in masks])
+    ring.put_batch(states, bool_masks, actions, rewards, version=0)
+    np.testing.assert_array_equal(take(ring, 4)["masks"], masks)
+
+
+def test_full_and_empty_ring(ring):
+    assert len(ring.peek(4)["actions"]) == 0
+    states, masks, actions, rewards = transitions(8, seed=2)
+    assert ring.put_batch(states, masks, actions, rewards, version=0)
+    assert len(ring) == ring.capacity
+
+    # No room: the put times out without writing, and the wait is counted
+    assert not ring.put_batch(states[:1], masks[:1], actions[:1], rewards[:1], version=0, timeout=0.01)
+    assert len(ring) == ring.capacity
+    assert ring.header[STALL_NS] > 0
+    with pytest.raises(ValueError):
+        ring.put_batch(*transitions(9), version=0)
+
+    # Releasing one row makes room for exactly one
+    take(ring, 1)
+    assert ring.put_batch(states[:1], masks[:1], actions[:1], rewards[:1], version=0, timeout=0)
+    assert not ring.put_batch(states[:1], masks[:1], actions[:1], rewards[:1], version=0, timeout=0)
+
+
+def test_attached_ring_sees_the_writes(ring):
+    reader = SharedRing.attach(ring.name)
+    try:
+        states, masks, actions, rewards = transitions(3, seed=3)
+        ring.put_batch(states, masks, actions, rewards, version=7)
+        assert len(reader) == 3
+        np.testing.assert_array_equal(take(reader, 3)["actions"], actions)
+        assert len(ring) == 0
+    finally:
+        reader.close()
+
+
+# Version `v` of the test blob: up to BLOB_SIZE bytes, all equal to v % 251, its length depending on v.
+BLOB_SIZE = 1 << 20
+
+
+def blob(version):
+    return bytes([version % 251]) * (BLOB_SIZE - version % 1000)
+
+
+def publish_versions(name, versions, started):
+    store = WeightStore.attach(name)
+    started.set()
+    for version in range(1, versions + 1):
+        store.publish(blob(version))
+    store.close()
+
+
+def test_weight_store_reader_never_sees_a_torn_blob():
+    store = WeightStore.create(BLOB_SIZE)
+    assert store.read() == (0, b"")
+    started = multiprocessing.Event()
+    writer = multiprocessing.Process(target=publish_versions, args=(store.name, 300, started))
+    writer.start()
+    try:
+        started.wait(10)
+        versions = []
+        while True:
+            alive = writer.is_alive()
+            version, data = store.read()
+            if version:
+                assert data == blob(version)
+            versions.append(version)
+            if version == 300 or not alive:
+                break
+        assert versions[-1] == 300
+        assert versions == sorted(versions)
+        assert len(set(versions)) > 1
+    finally:
+        writer.join(10)
+        store.close()
+    assert writer.exitcode == 0
+
+
+def test_weight_store_rejects_oversized_blobs():
+    store = WeightStore.create(16)
+    try:
+        assert store.publish(b"x" * 16) == 1
+        with pytest.raises(ValueError):
+            store.publish(b"x" * 17)
+        assert store.read() == (1, b"x" * 16)
+    finally:
+        store.close()
+
+
+def test_pipeline_delivers_actor_transitions():
+    with Pipeline(actors=1, capacity=1024, weights_capacity=1 << 20, seed=0) as pipeline:
+        version = pipeline.publish(mlp.init_layers([encoding.STATE_SIZE, 16, engine.NUM_CARDS], seed=0))
+        with pipeline.batch(64, timeout=30) as batch:
+            assert batch is not None and len(batch["actions"]) > 0
+            masks = batch["masks"].astype(np.uint64)
+            assert ((masks >> batch["actions"].astype(np.uint64)) & 1).all()
+            assert (batch["versions"] <= version).all()
+        metrics = pipeline.metrics()
+    assert metrics["weights_version"] == version
@@ -0,0 +1,148 @@
+import random
+
+import numpy as np
+import pytest
+
+from belot import encoding, engine, mlp
+from belot.policycache import ENTRY_OVERHEAD, PolicyCache, state_key
+
+
+ENTRY_BYTES = engine.NUM_CARDS * 4 + ENTRY_OVERHEAD
+
+
+@pytest.fixture
+def weights(tmp_path):
+    path = str(tmp_path / "policy.bin")
+    mlp.save_weights(path, mlp.init_layers([encoding.STATE_SIZE, 64, engine.NUM_CARDS], seed=0))
+    return path
+
+
+# `n` encoded mid-deal states with at least two legal cards each.
+def random_states(n, seed):
+    rng = random.Random(seed)
+    states = encoding.new_buffer(n)
+    masks = np.zeros((n, engine.NUM_CARDS), dtype=bool)
+    for i in range(n):
+        deck = engine.generate_deck()
+        rng.shuffle(deck)
+        hand = engine.cards_to_mask(deck[:8])
+        played = engine.cards_to_mask(deck[8:8 + rng.randrange(16)])
+        encoding.encode_state(states[i], hand, played, [], 0, 0, rng.randrange(4))
+        masks[i] = engine.action_mask(hand)
+    return states, masks
+
+
+@pytest.mark.parametrize("capacity", [1, 15, 100])
+def test_batch_larger_than_capacity_matches_policy(weights, capacity):
+    policy = mlp.MLPPolicy(weights)
+    cache = PolicyCache(mlp.MLPPolicy(weights), max_bytes=capacity * ENTRY_BYTES)
+    assert cache.capacity == capacity
+    states, masks = random_states(300, seed=capacity)
+    expected = policy.act_batch(states, masks)
+
+    assert (cache.act_batch(states, masks) == expected).all()
+    # A warm cache, then a batch mixing cached and new positions
+    mixed_states, mixed_masks = random_states(200, seed=capacity + 1)
+    mixed_states = np.concatenate([states[-capacity:], mixed_states, states[:50]])
+    mixed_masks = np.concatenate([masks[-capacity:], mixed_masks, masks[:50]])
+    assert (cache.act_batch(mixed_states, mixed_masks) == policy.act_batch(mixed_states, mixed_masks)).all()
+    assert len(cache) <= capacity
+    assert cache.stats()["evictions"] > 0
+
+
+def test_repeated_rows_hit_and_forced_rows_skip(weights):
+    cache = PolicyCache(mlp.MLPPolicy(weights))
+    states, masks = random_states(20, seed=0)
+    masks[0] = False
+    masks[0, 3] = True
+    cache.act_batch(states, masks)
+    cache.act_batch(states, masks)
+    stats = cache.stats()
+    assert stats["forced"] == 2
+    assert stats["misses"] == 19 and stats["hits"] == 19
+
+
+def test_lru_evicts_least_recently_used(weights):
+    cache = PolicyCache(mlp.MLPPolicy(weights), max_bytes=2 * ENTRY_BYTES)
+    states, masks = random_states(3, seed=1)
+    a, b, c = ((states[i:i + 1], masks[i:i + 1]) for i in range(3))
+    cache.act_batch(*a)
+    cache.act_batch(*b)
+    cache.act_batch(*a)  # a is now the most recently used
+    cache.act_batch(*c)  # evicts b
+    hits = cache.hits
+    cache.act_batch(*a)
+    assert cache.hits == hits + 1
+    cache.act_batch(*b)
+    assert cache.hits == hits + 1
+    assert cache.evictions == 2
+
+
+def test_weights_version_change_invalidates(weights):
+    cache = PolicyCache(mlp.MLPPolicy(weights))
+    states, masks = random_states(10, seed=2)
+    cache.act_batch(states, masks)
+    cache.policy.model.version += 1
+    cache.act_batch(states, masks)
+    assert cache.invalidations == 1 and cache.hits == 0
+    cache.policy = mlp.MLPPolicy(weights)
+    cache.act_batch(states, masks)
+    assert cache.invalidations == 2 and cache.hits == 0
+
+
+def test_select_matches_uncached_play(weights):
+    from belot import inference
+
+    policy = mlp.MLPPolicy(weights)
+    cache = PolicyCache(mlp.MLPPolicy(weights), max_bytes=50 * ENTRY_BYTES)
+    info = engine.DealInfo()
+    for seed in range(30):
+        expected = engine.play_game(random.Random(seed), inference.policy_select(policy, info), info)
+        assert engine.play_game(random.Random(seed), cache.select(info), info).tricks == expected.tricks
+    assert cache.evictions > 0
+
+
+def test_state_key_distinguishes_trick_order():
+    assert state_key(0b11, 0, [5, 9], 0) != state_key(0b11, 0, [9, 5], 0)
+    assert state_key(0b11, 0, [5], 0) != state_key(0b11, 0, [5], 1)
+    assert state_key(0b11, 0, [5], 0, 1, (20, 0)) != state_key(0b11, 0, [5], 0, 1, (0, 20))
+    assert state_key(0b11, 0, [5], 0, 0) != state_key(0b11, 0, [5], 0)
+
+
+@pytest.mark.parametrize("entries", [1, 7, 64])
+def test_memory_stays_within_the_byte_cap(weights, entries):
+    max_bytes = entries * ENTRY_BYTES + ENTRY_BYTES // 2
+    cache = PolicyCache(mlp.MLPPolicy(weights), max_bytes=max_bytes)
+    states, masks = random_states(3 * entries + 5, seed=entries)
+    for i in range(len(states)):
+        cache.act_batch(states[i:i + 1], masks[i:i + 1])
+        assert len(cache) <= entries
+        assert cache.stats()["bytes"] <= max_bytes
+    assert cache.evictions == len(states) - entries
+    # Only the most recent `entries` positions are still cached
+    hits = cache.hits
+    cache.act_batch(states[-entries:], masks[-entries:])
+    assert cache.hits == hits + entries
+    cache.act_batch(states[:1], masks[:1])
+    assert cache.hits == hits + entries
+
+
+def test_select_evicts_least_recently_used(weights):
+    cache = PolicyCache(mlp.MLPPolicy(weights), max_bytes=2 * ENTRY_BYTES)
+    select = cache.select()
+    hand = engine.cards_to_mask([0, 9, 18, 27])
+    players_hands = [0, hand, 0, 0]
+
+    def play(trick, trump_suit):
+        return select(hand, 1, players_hands, trick, trump_suit, engine.CARD_SUIT[trick[0]])
+
+    play([1], 0)
+    play([2], 0)
+    play([1], 0)   # refreshes the first position
+    play([3], 0)   # evicts the second
+    assert cache.evictions == 1 and len(cache) == 2
+    hits = cache.hits
+    play([1], 0)
+    assert cache.hits == hits + 1
+    play([2], 0)
+    assert cache.hits == hits + 1 and cache.evictions == 2
@@ -0,0 +1,117 @@
+import os
+import random
+
+import pytest
+
+from belot import engine, records
+from belot.records import BLOCK_HEADER, FILE_HEADER, RecordWriter, iter_records, read_game, record_from_result
+from belot.scoring import deal_hands
+
+
+def play(n, seed=0):
+    rng = random.Random(seed)
+    return [record_from_result(engine.play_game(rng)) for _ in range(n)]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_write_read_round_trip(tmp_path, compress):
+    path = str(tmp_path / "games.bin")
+    games = play(50)
+    with RecordWriter(path, block_records=16, compress=compress) as writer:
+        writer.extend(games)
+    assert list(iter_records(path)) == games
+    assert records.count_records(path) == 50
+    assert len(records.read_index(path)) == 4
+    if not compress:
+        assert os.path.getsize(path) == FILE_HEADER.size + 4 * BLOCK_HEADER.size + 50 * records.RECORD_SIZE
+
+
+def test_records_replay_to_the_played_games():
+    rng = random.Random(3)
+    for _ in range(20):
+        result = engine.play_game(rng)
+        record = record_from_result(result)
+        assert records.decode_records(records.encode_records([record]).tobytes()) == [record]
+        replayed = records.replay_record(record)
+        assert replayed.scores == result.scores and replayed.tricks == result.tricks
+
+
+def test_replay_rejects_an_illegal_card():
+    rng = random.Random(0)
+    while True:
+        record = record_from_result(engine.play_game(rng))
+        # A card the second player holds but may not play to the first trick
+        lead = record.plays[0]
+        hand = deal_hands(record.deck)[1]
+        legal = engine.legal_moves(hand, [lead], engine.CARD_SUIT[lead], record.trump)
+        if hand & ~legal:
+            break
+    illegal = engine.mask_to_cards(hand & ~legal)[0]
+    plays = list(record.plays)
+    swap = plays.index(illegal)
+    plays[1], plays[swap] = plays[swap], plays[1]
+    with pytest.raises(ValueError, match="illegal"):
+        records.replay_record(record._replace(plays=tuple(plays)))
+
+
+def test_append_after_reopen(tmp_path):
+    path = str(tmp_path / "games.bin")
+    games = play(30, seed=1)
+    with RecordWriter(path, block_records=8) as writer:
+        writer.extend(games[:13])
+    with RecordWriter(path, block_records=8) as writer:
+        assert writer.count == 13
+        writer.extend(games[13:])
+    assert writer.count == 30
+    assert list(iter_records(path)) == games
+    first_games = records.read_index(path)[:, 0].tolist()
+    assert first_games == [0, 8, 13, 21, 29]
+
+
+def test_random_access_through_the_index(tmp_path):
+    path = str(tmp_path / "games.bin")
+    games = play(40, seed=2)
+    with RecordWriter(path, block_records=7) as writer:
+        writer.extend(games)
+    for game in (0, 6, 7, 20, 39):
+        assert read_game(path, game) == games[game]
+        assert next(iter_records(path, start=game)) == games[game]
+    assert list(iter_records(path, start=33)) == games[33:]
+    with pytest.raises(IndexError):
+        read_game(path, 40)
+
+
+def test_truncated_block_raises(tmp_path):
+    path = str(tmp_path / "games.bin")
+    with RecordWriter(path, block_records=10) as writer:
+        writer.extend(play(20, seed=4))
+    size = os.path.getsize(path)
+    with open(path, "r+b") as file:
+        file.truncate(size - 5)
+    with pytest.raises(ValueError, match="truncated"):
+        list(iter_records(path))
+    # The first block is still readable on its own
+    assert read_game(path, 3) == play(20, seed=4)[3]
+    with pytest.raises(ValueError, match="truncated"):
+        read_game(path, 15)
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_corrupted_block_raises(tmp_path, compress):
+    path = str(tmp_path / "games.bin")
+    with RecordWriter(path, block_records=10, compress=compress) as writer:
+        writer.extend(play(10, seed=5))
+    # Overwrite the block's record count (raw) or the start of its zlib stream
+    position = FILE_HEADER.size + (BLOCK_HEADER.size if compress else 0)
+    with open(path, "r+b") as file:
+        file.seek(position)
+        file.write(b"\xff\xff")
+    with pytest.raises(ValueError):
+        list(iter_records(path))
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"NOTBELOT\x01")
+    with pytest.raises(ValueError):
+        list(iter_records(str(path)))
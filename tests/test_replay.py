@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+
+from belot import encoding, replay
+from belot.replay import ReplayBuffer
+
+
+def transitions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    states = encoding.new_buffer(n)
+    states[:, :encoding.BINARY_SIZE] = rng.random((n, encoding.BINARY_SIZE)) < 0.2
+    states[:, encoding.SCORES] = rng.integers(0, 153, (n, 2)) / encoding.MAX_POINTS
+    masks = rng.integers(1, 1 << 32, n, dtype=np.uint64).astype(np.uint32)
+    actions = rng.integers(0, 32, n)
+    rewards = rng.standard_normal(n).astype(np.float32)
+    return states, masks, actions, rewards
+
+
+def test_roundtrip_and_ring(tmp_path):
+    buffer = ReplayBuffer(str(tmp_path), capacity=150, seed=0)
+    states, masks, actions, rewards = transitions(200)
+    buffer.add_batch(states[:120], masks[:120], actions[:120], rewards[:120])
+    buffer.add_batch(states[120:], masks[120:], actions[120:], rewards[120:])
+    assert len(buffer) == 150
+
+    batch = buffer.sample(64)
+    stored = np.where(batch["indices"] < 50, batch["indices"] + 150, batch["indices"])
+    assert np.array_equal(batch["states"], states[stored])
+    assert np.array_equal(batch["actions"], actions[stored])
+
+
+def test_reopen_keeps_alpha_and_rejects_another(tmp_path):
+    path = str(tmp_path)
+    buffer = ReplayBuffer(path, capacity=100, alpha=0.5)
+    buffer.add_batch(*transitions(10))
+    buffer.update_priorities(np.arange(10), np.arange(10) + 1.0)
+    buffer.flush()
+
+    reopened = ReplayBuffer(path)
+    assert reopened.alpha == 0.5 and len(reopened) == 10
+    assert reopened._max_priority == pytest.approx(10 + 1e-6)
+    assert ReplayBuffer(path, alpha=0.5).alpha == 0.5
+    with pytest.raises(ValueError, match="alpha"):
+        ReplayBuffer(path, alpha=0.6)
+    with pytest.raises(ValueError, match="capacity"):
+        ReplayBuffer(path, capacity=200)
+
+
+def test_prioritized_sampling_follows_priorities(tmp_path):
+    buffer = ReplayBuffer(str(tmp_path), capacity=1000, alpha=1.0, seed=1)
+    buffer.add_batch(*transitions(1000))
+    priorities = np.full(1000, 1e-3)
+    priorities[[3, 500, 999]] = [1.0, 2.0, 1.0]
+    buffer.update_priorities(np.arange(1000), priorities, eps=0)
+
+    counts = np.bincount(buffer.sample(40000, prioritized=True)["indices"], minlength=1000)
+    share = counts / counts.sum()
+    expected = priorities / priorities.sum()
+    assert share[[3, 500, 999]] == pytest.approx(expected[[3, 500, 999]], abs=0.01)
+    assert buffer.tree[1] == pytest.approx(priorities.sum())
+
+
+def test_priority_storage_is_small(tmp_path):
+    capacity = 100_000
+    ReplayBuffer(str(tmp_path), capacity=capacity)
+    sizes = {name: os.path.getsize(tmp_path / f"{name}.npy") for name in ("priorities", "tree")}
+    assert sizes["tree"] <= capacity * 32 / replay.BLOCK + 256
+    assert sizes["priorities"] <= capacity * 4 + replay.BLOCK * 4 + 256
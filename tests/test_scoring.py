@@ -0,0 +1,112 @@
+import random
+
+import numpy as np
+import pytest
+
+from belot import engine, scoring
+from belot.scoring import FAILED, HANGING, MADE, NO_TEAM, game_points, match_winner, score_round
+
+
+# Team 1 (seats 0, 2) takes the first four tricks, team 2 the last four: 81 points each with the last trick
+TIED_WINNERS = [0, 2, 0, 2, 1, 3, 1, 3]
+TIED_POINTS = [20, 20, 20, 21, 20, 20, 20, 11]
+
+
+def test_last_trick_bonus_goes_to_its_winner():
+    winners = [0, 1, 0, 1, 0, 1, 0, 1]
+    score = score_round(0, winners, [19] * 8)
+    assert score.points == [76, 86]
+    assert score.outcome == FAILED and score.capot == NO_TEAM
+    score = score_round(0, winners[::-1], [19] * 8)
+    assert score.points == [86, 76] and score.outcome == MADE
+
+
+@pytest.mark.parametrize("team", [0, 1])
+def test_capot(team):
+    score = score_round(0, [team, team + 2] * 4, [19] * 8)
+    assert score.capot == team
+    assert score.points[team] == engine.DEAL_POINTS + scoring.LAST_TRICK_BONUS + scoring.CAPOT_BONUS
+    assert score.points[1 - team] == 0
+    assert score.outcome == (MADE if team == 0 else FAILED)
+    assert sum(score.game_points) == 25
+
+
+@pytest.mark.parametrize(("points", "expected"), [(80, 8), (84, 8), (85, 8), (86, 9), (89, 9), (162, 16), (0, 0)])
+def test_game_points_round_up_from_six(points, expected):
+    assert game_points(points) == expected
+
+
+def test_declarations_count_towards_the_contract():
+    score = score_round(0, TIED_WINNERS, TIED_POINTS, declared=(20, 0))
+    assert score.points == [101, 81] and score.outcome == MADE
+    assert score.game_points == [10, 8]
+
+
+def test_hanging_points_carry_to_the_next_winner():
+    hanging = score_round(0, TIED_WINNERS, TIED_POINTS)
+    assert hanging.outcome == HANGING and hanging.points == [81, 81]
+    assert hanging.game_points == [0, 8] and hanging.hanging == 8
+
+    # A second hanging round adds its points to those already held over
+    again = score_round(1, TIED_WINNERS, TIED_POINTS, carried=hanging.hanging)
+    assert again.outcome == HANGING and again.game_points == [8, 0] and again.hanging == 16
+
+    # The next round that is not hanging: the carry goes to whichever team wins it
+    made = score_round(0, [0, 1, 0, 1, 0, 1, 0, 1][::-1], [19] * 8, carried=again.hanging)
+    assert made.outcome == MADE and made.game_points == [9 + 16, 8] and made.hanging == 0
+    failed = score_round(0, [0, 1, 0, 1, 0, 1, 0, 1], [19] * 8, carried=again.hanging)
+    assert failed.outcome == FAILED and failed.game_points == [0, 16 + 16] and failed.hanging == 0
+
+
+def test_match_winner_at_the_target():
+    assert match_winner((150, 149)) is None
+    assert match_winner((151, 120)) == 0
+    assert match_winner((155, 160)) == 1
+    # Both teams at the target with equal totals: the match plays on
+    assert match_winner((151, 151)) is None
+    assert match_winner((170, 170)) is None
+
+
+def test_score_rounds_matches_score_round():
+    rng = random.Random(0)
+    rounds = []
+    for _ in range(300):
+        result = engine.play_game(rng)
+        declared = (rng.choice([0, 0, 20, 50]), rng.choice([0, 0, 20, 100]))
+        carried = rng.choice([0, 0, 8, 16])
+        rounds.append((result, declared, carried))
+    # Forced ties and capots as well
+    rounds.append((engine.GameResult(0, 0, None, [engine.Trick(0, (), w, p) for w, p in zip(TIED_WINNERS, TIED_POINTS)],
+                                     None), (0, 0), 8))
+    rounds.append((engine.GameResult(1, 0, None, [engine.Trick(0, (), 3, 19)] * 8, None), (0, 20), 0))
+
+    batch = scoring.score_rounds(
+        [result.bidder for result, _, _ in rounds],
+        [[trick.winner for trick in result.tricks] for result, _, _ in rounds],
+        [[trick.points for trick in result.tricks] for result, _, _ in rounds],
+        [declared for _, declared, _ in rounds],
+        [carried for _, _, carried in rounds],
+    )
+    for i, (result, declared, carried) in enumerate(rounds):
+        expected = scoring.score_game(result, declared, carried)
+        assert list(batch.points[i]) == expected.points
+        assert list(batch.game_points[i]) == expected.game_points
+        assert (batch.outcome[i], batch.capot[i], batch.hanging[i]) == (
+            expected.outcome, expected.capot, expected.hanging)
+
+
+def test_match_passes_deal_info_to_every_round():
+    info = engine.DealInfo()
+    seen = []
+
+    def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+        seen.append(info.bidder)
+        return engine.random_card(valid_mask)
+
+    match = scoring.play_match(random.Random(3), select, info=info)
+    assert match.winner in (0, 1) and max(match.totals) >= scoring.TARGET
+    assert len(seen) == 32 * len(match.rounds)
+    bidders = [played.result.bidder for played in match.rounds for _ in range(32)]
+    assert seen == bidders
+    # Rounds add up to the match totals
+    assert tuple(np.sum([played.score.game_points for played in match.rounds], axis=0)) == match.totals
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from belot import server
+
+
+# Starts a server on a Unix socket under `tmp_path`, runs `client(path, game_server)` and closes it.
+def run_with_server(tmp_path, client, **kwargs):
+    path = str(tmp_path / "belot.sock")
+
+    async def main():
+        game_server = server.GameServer(seed=0, **kwargs)
+        await game_server.start(path=path)
+        try:
+            return await client(path, game_server)
+        finally:
+            await game_server.close()
+
+    return asyncio.run(main())
+
+
+async def exchange(path, line):
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(line + b"\n")
+    reply = json.loads(await reader.readline())
+    writer.close()
+    return reply
+
+
+@pytest.mark.parametrize("hello", [b"[1]", b"3", b'"join"', b'{"type": "join", "games": "5"}',
+                                   b'{"type": "join", "games": -1}', b'{"type": "join", "seat": 4}', b"{"])
+def test_malformed_hello_gets_an_error(tmp_path, hello):
+    reply = run_with_server(tmp_path, lambda path, _: exchange(path, hello))
+    assert reply["type"] == "error"
+
+
+def test_client_plays_games_against_bots(tmp_path):
+    async def client(path, game_server):
+        played = await server.load_client(2, random.Random(0), path=path, seat=1)
+        return played, await server.fetch_stats(path=path)
+
+    played, stats = run_with_server(tmp_path, client)
+    assert played == 2
+    assert stats["games"] >= 2 and stats["timeouts"] == 0
+
+
+def test_non_object_reply_ends_the_table_with_an_error(tmp_path):
+    async def client(path, _):
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b'{"type": "join", "seat": 0, "games": 1}\n')
+        while True:
+            message = json.loads(await reader.readline())
+            if message["type"] in ("bid", "play"):
+                writer.write(b"[1]\n")
+            elif message["type"] in ("error", "done"):
+                writer.close()
+                return message
+
+    assert run_with_server(tmp_path, client)["type"] == "error"
+
+
+def test_silent_client_times_out(tmp_path):
+    async def client(path, game_server):
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b'{"type": "join", "seat": 0, "games": 1}\n')
+        while True:
+            message = json.loads(await reader.readline())
+            if message["type"] == "done":
+                writer.close()
+                return game_server.stats.timeouts
+
+    assert run_with_server(tmp_path, client, move_timeout=0.01) > 0
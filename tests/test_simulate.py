@@ -0,0 +1,18 @@
+import numpy as np
+
+from belot import simulate
+
+
+def test_zero_games_summarize_without_percentiles():
+    summary, results = simulate.simulate(0, seed=1)
+    assert len(results) == 0
+    assert summary["games"] == 0
+    assert summary["team1_points_percentiles"] == {}
+    assert summary["team_points_mean"] == [0.0, 0.0]
+
+
+def test_results_do_not_depend_on_workers():
+    _, one = simulate.simulate(300, workers=1, seed=7, chunk_size=100)
+    _, two = simulate.simulate(300, workers=2, seed=7, chunk_size=100)
+    assert np.array_equal(one, two)
+    assert (one[:, simulate.TEAM1_POINTS] + one[:, simulate.TEAM2_POINTS] == 152).all()
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from belot import engine
+from belot.engine import CARD_BIT, CARD_POINTS, CARD_SUIT, NO_SUIT
+from belot.solver import Solver, solve
+
+
+# Plain minimax over every legal card: team 1's points from here on with best play.
+def minimax(hands, leader, trick, trump_suit):
+    if len(trick) == engine.NUM_PLAYERS:
+        winner = (leader + engine.trick_winner(trick, CARD_SUIT[trick[0]], trump_suit)) & 3
+        gained = 0 if winner & 1 else sum(CARD_POINTS[trump_suit][card] for card in trick)
+        if not any(hands):
+            return gained
+        return gained + minimax(hands, winner, [], trump_suit)
+    seat = (leader + len(trick)) & 3
+    lead_suit = CARD_SUIT[trick[0]] if trick else NO_SUIT
+    values = []
+    for card in engine.mask_to_cards(engine.legal_moves(hands[seat], trick, lead_suit, trump_suit)):
+        after = list(hands)
+        after[seat] &= ~CARD_BIT[card]
+        values.append(minimax(after, leader, trick + [card], trump_suit))
+    return min(values) if seat & 1 else max(values)
+
+
+# A random endgame with `cards` per hand, and `played` legal cards already in the current trick.
+def endgame(seed, cards, played=0):
+    rng = random.Random(seed)
+    deck = engine.generate_deck()
+    rng.shuffle(deck)
+    hands = [engine.cards_to_mask(deck[8 * seat:8 * seat + cards]) for seat in range(4)]
+    trump_suit, leader = rng.randrange(4), rng.randrange(4)
+    trick = []
+    for k in range(played):
+        seat = (leader + k) & 3
+        lead_suit = CARD_SUIT[trick[0]] if trick else NO_SUIT
+        card = engine.random_card(engine.legal_moves(hands[seat], trick, lead_suit, trump_suit), rng)
+        hands[seat] &= ~CARD_BIT[card]
+        trick.append(card)
+    return hands, trump_suit, leader, trick
+
+
+@pytest.mark.parametrize("cards", [1, 2, 3])
+@pytest.mark.parametrize("played", [0, 1, 3])
+def test_solver_matches_minimax(cards, played):
+    for seed in range(40):
+        hands, trump_suit, leader, trick = endgame(seed, cards, played)
+        result = solve(hands, trump_suit, leader, trick)
+        expected = minimax(hands, leader, trick, trump_suit)
+        assert result.points[0] == expected
+        live = hands[0] | hands[1] | hands[2] | hands[3]
+        total = sum(CARD_POINTS[trump_suit][card] for card in engine.mask_to_cards(live) + trick)
+        assert sum(result.points) == total
+
+
+def test_shared_table_gives_the_same_values():
+    solvers = [Solver(trump_suit) for trump_suit in range(4)]
+    for seed in range(60):
+        hands, trump_suit, leader, trick = endgame(seed, 4, seed % 4)
+        fresh = solve(hands, trump_suit, leader, trick)
+        assert solvers[trump_suit].solve(hands, leader, trick).points == fresh.points
+    assert any(solver.table for solver in solvers)
+
+
+def test_best_move_and_move_values_agree():
+    for seed in range(30):
+        hands, trump_suit, leader, trick = endgame(seed, 3, seed % 3)
+        solver = Solver(trump_suit)
+        result = solver.solve(hands, leader, trick)
+        values = solver.move_values(hands, leader, trick)
+        seat = (leader + len(trick)) & 3
+        best = min(values.values()) if seat & 1 else max(values.values())
+        assert values[result.best_move] == best == result.points[0]
+
+
+def test_principal_variation_reaches_the_value():
+    start, trump_suit, start_leader, _ = endgame(7, 4)
+    solver = Solver(trump_suit)
+    line = solver.principal_variation(start, start_leader)
+    assert len(line) == 16
+
+    team1, trick, hands, leader = 0, [], list(start), start_leader
+    for seat, card in line:
+        assert seat == (leader + len(trick)) & 3
+        hands[seat] &= ~CARD_BIT[card]
+        trick.append(card)
+        if len(trick) == engine.NUM_PLAYERS:
+            winner = (leader + engine.trick_winner(trick, CARD_SUIT[trick[0]], trump_suit)) & 3
+            if not winner & 1:
+                team1 += sum(CARD_POINTS[trump_suit][card] for card in trick)
+            leader, trick = winner, []
+    assert team1 == solver.solve(start, start_leader).points[0]
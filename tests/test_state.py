@@ -0,0 +1,106 @@
+import random
+
+import numpy as np
+import pytest
+
+from belot import encoding, engine
+from belot.scoring import deal_hands
+from belot.state import Z_HAND, Z_TO_PLAY, Z_TRICK, Z_TRUMP, GameState
+
+
+FIELDS = ("hands", "played", "trick", "leader", "trump", "bidder", "lead_suit", "win_seat", "win_card",
+          "scores", "tricks_played", "key")
+
+
+def _state(seed, trump_suit=0, bidder=1):
+    deck = engine.generate_deck()
+    random.Random(seed).shuffle(deck)
+    return GameState.from_deal(deal_hands(deck), trump_suit, leader=0, bidder=bidder)
+
+
+def _snapshot(state):
+    snapshot = {name: getattr(state, name) for name in FIELDS}
+    snapshot["hands"] = list(state.hands)
+    snapshot["trick"] = list(state.trick)
+    snapshot["scores"] = list(state.scores)
+    snapshot["features"] = state.features.copy()
+    return snapshot
+
+
+def _full_key(state):
+    key = Z_TO_PLAY[state.to_play] ^ Z_TRUMP[state.trump]
+    for seat in range(4):
+        for card in engine.mask_to_cards(state.hands[seat]):
+            key ^= Z_HAND[seat][card]
+    for k, card in enumerate(state.trick):
+        key ^= Z_TRICK[(state.leader + k) & 3][card]
+    return key
+
+
+def _check_views(state):
+    assert state.key == _full_key(state)
+    expected = encoding.new_buffer(4)
+    for view in range(4):
+        encoding.encode_state(expected[view], state.hands[view], state.played, state.trick, state.leader, view,
+                              state.trump, state.lead_suit, state.bidder, state.scores)
+    np.testing.assert_array_equal(state.features, expected)
+
+
+# Plays `state` to the end with random legal cards, returning the snapshot taken before each card.
+def _play_out(state, rng):
+    snapshots = []
+    while not state.is_over():
+        snapshots.append(_snapshot(state))
+        state.play(rng.choice(engine.mask_to_cards(state.legal_moves())))
+    return snapshots
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_play_undo_round_trip_restores_every_field(seed):
+    state = _state(seed, trump_suit=seed % 4)
+    snapshots = _play_out(state, random.Random(seed))
+    assert len(snapshots) == engine.NUM_CARDS and sum(state.scores) == 152
+    for expected in reversed(snapshots):
+        state.undo()
+        for name in FIELDS:
+            assert getattr(state, name) == expected[name], name
+        np.testing.assert_array_equal(state.features, expected["features"])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_key_and_features_match_a_full_recompute_at_each_ply(seed):
+    state = _state(seed, trump_suit=(seed + 1) % 4, bidder=seed % 4)
+    rng = random.Random(seed)
+    _check_views(state)
+    while not state.is_over():
+        state.play(rng.choice(engine.mask_to_cards(state.legal_moves())))
+        _check_views(state)
+        assert (state.state_vector() == state.features[state.to_play]).all()
+
+
+def test_scores_match_engine_play():
+    deck = engine.generate_deck()
+    random.Random(7).shuffle(deck)
+    trump_suit = 2
+    hands = deal_hands(deck)
+    result = engine.play_deal(list(deck), 0, trump_suit, random.Random(0))
+    state = GameState.from_deal(hands, trump_suit)
+    for trick in result.tricks:
+        for card in trick.cards:
+            state.play_checked(card)
+        assert state.leader == trick.winner
+    assert state.scores == result.scores
+
+
+def test_undo_past_the_start_raises():
+    state = _state(0)
+    state.play(engine.mask_to_cards(state.legal_moves())[0])
+    state.undo()
+    with pytest.raises(IndexError):
+        state.undo()
+
+
+def test_play_checked_rejects_an_illegal_card():
+    state = _state(0)
+    with pytest.raises(ValueError):
+        state.play_checked(engine.mask_to_cards(state.hands[1])[0])
@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from belot import engine
+from belot.vecenv import DEAL_POSITIONS, NO_CARD, BelotVecEnv
+
+
+# A deck that `engine.play_deal` deals into the same 8-card hands as the environment row.
+def deck_for(hands):
+    deck = [0] * engine.NUM_CARDS
+    for seat in range(4):
+        for position, card in zip(DEAL_POSITIONS[seat], np.flatnonzero(hands[seat])):
+            deck[position] = int(card)
+    return deck
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_lockstep_deals_match_engine_play_deal(seed):
+    n = 64
+    env = BelotVecEnv(n, seed=seed)
+    obs = env.reset()
+    hands, bidder, trump = env.hands.copy(), env.bidder.copy(), env.trump.copy()
+    assert (hands.sum(axis=2) == 8).all() and (hands.sum(axis=1) == 1).all()
+
+    moves = [[] for _ in range(n)]      # (seat, legal mask, card) per card played
+    winners = [[] for _ in range(n)]    # (winning seat, team rewards) per trick
+    for step in range(engine.NUM_CARDS):
+        actions = env.sample_actions()
+        for row in range(n):
+            legal = engine.cards_to_mask(np.flatnonzero(obs["legal"][row]).tolist())
+            moves[row].append((int(obs["player"][row]), legal, int(actions[row])))
+        obs, rewards, dones, info = env.step(actions)
+        assert (info["trick_complete"] == (step % 4 == 3)).all()
+        if step % 4 == 3:
+            for row in range(n):
+                winners[row].append((int(env.win_seat[row]), tuple(rewards[row].tolist())))
+        else:
+            assert not rewards.any()
+    assert dones.all()
+
+    for row in range(n):
+        replay = iter(moves[row])
+
+        def select(valid_mask, seat, players_hands, trick, trump_suit, lead_suit):
+            expected_seat, expected_legal, card = next(replay)
+            assert (seat, valid_mask) == (expected_seat, expected_legal)
+            return card
+
+        result = engine.play_deal(deck_for(hands[row]), int(bidder[row]), int(trump[row]), random.Random(0), select)
+        expected = []
+        for trick in result.tricks:
+            team_points = [0, 0]
+            team_points[trick.winner & 1] = trick.points
+            expected.append((trick.winner, tuple(team_points)))
+        assert expected == winners[row]
+        assert list(info["final_scores"][row]) == result.scores
+        assert (info["bidder"][row], info["trump"][row]) == (bidder[row], trump[row])
+
+
+def test_finished_games_are_redealt():
+    env = BelotVecEnv(16, seed=5)
+    env.reset()
+    for _ in range(engine.NUM_CARDS):
+        obs, _, dones, _ = env.step(env.sample_actions())
+    assert dones.all()
+    assert (env.hands.sum(axis=(1, 2)) == engine.NUM_CARDS).all()
+    assert not obs["played"].any() and (obs["trick"] == NO_CARD).all() and not obs["scores"].any()
+    assert (obs["player"] == 0).all()
+
+
+def test_illegal_card_is_rejected():
+    env = BelotVecEnv(8, seed=0)
+    obs = env.reset()
+    actions = env.sample_actions()
+    actions[3] = np.flatnonzero(~obs["hand"][3])[0]
+    with pytest.raises(ValueError):
+        env.step(actions)